@@ -0,0 +1,59 @@
+"""Daily quiz broadcast checkpoints (quiz_broadcasts), one per day
+
+Revision ID: 3b7d9f2a6c15
+Revises: 8e2b6c4f1a93
+Create Date: 2026-10-17 19:20:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7d9f2a6c15'
+down_revision = '8e2b6c4f1a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    # init_db (create_all) may already have created the table without `day`
+    if inspector.has_table('quiz_broadcasts'):
+        if 'day' not in {c['name'] for c in inspector.get_columns('quiz_broadcasts')}:
+            op.add_column('quiz_broadcasts', sa.Column('day', sa.Date(), nullable=True))
+    else:
+        # quiz_questions itself is only created by init_db
+        question_fk = (
+            [sa.ForeignKeyConstraint(['question_id'], ['quiz_questions.id'])]
+            if inspector.has_table('quiz_questions') else []
+        )
+        op.create_table(
+            'quiz_broadcasts',
+            sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column('question_id', postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column('day', sa.Date(), nullable=True),
+            sa.Column('status', sa.String(), nullable=True),
+            sa.Column('last_recipient_id', postgresql.UUID(as_uuid=True), nullable=True),
+            sa.Column('sent_count', sa.Integer(), nullable=True),
+            sa.Column('failed_count', sa.Integer(), nullable=True),
+            sa.Column('blocked_count', sa.Integer(), nullable=True),
+            sa.Column('started_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.Column('finished_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            *question_fk
+        )
+        op.create_index('ix_quiz_broadcasts_status', 'quiz_broadcasts', ['status'])
+
+    indexes = {i['name'] for i in sa.inspect(op.get_bind()).get_indexes('quiz_broadcasts')}
+    if 'uq_quiz_broadcasts_day' not in indexes:
+        op.create_index('uq_quiz_broadcasts_day', 'quiz_broadcasts', ['day'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_quiz_broadcasts_day', table_name='quiz_broadcasts')
+    op.drop_index('ix_quiz_broadcasts_status', table_name='quiz_broadcasts')
+    op.drop_table('quiz_broadcasts')
@@ -0,0 +1,32 @@
+"""Participant counter on olympiads
+
+Revision ID: 5d8f3a1c7b42
+Revises: c41e7a9d2b10
+Create Date: 2026-10-17 16:05:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d8f3a1c7b42'
+down_revision = 'c41e7a9d2b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'olympiads',
+        sa.Column('participants_count', sa.Integer(), server_default='0', nullable=False)
+    )
+    op.execute(
+        "UPDATE olympiads SET participants_count = ("
+        "SELECT COUNT(*) FROM olympiad_participants "
+        "WHERE olympiad_participants.olympiad_id = olympiads.id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('olympiads', 'participants_count')
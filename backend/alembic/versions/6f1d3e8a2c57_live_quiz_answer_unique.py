@@ -0,0 +1,40 @@
+"""One live quiz answer per participant and question
+
+Revision ID: 6f1d3e8a2c57
+Revises: 3b7d9f2a6c15
+Create Date: 2026-10-17 21:40:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6f1d3e8a2c57'
+down_revision = '3b7d9f2a6c15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('live_quiz_answers'):
+        return  # created by init_db together with the index
+    if 'uq_live_quiz_answers_participant_question' in {i['name'] for i in inspector.get_indexes('live_quiz_answers')}:
+        return
+
+    # An answer sent to two workers could be written twice; keep the lowest id
+    op.execute(
+        "DELETE FROM live_quiz_answers WHERE CAST(id AS TEXT) NOT IN ("
+        "SELECT MIN(CAST(id AS TEXT)) FROM live_quiz_answers GROUP BY participant_id, question_id)"
+    )
+    op.create_index(
+        'uq_live_quiz_answers_participant_question',
+        'live_quiz_answers',
+        ['participant_id', 'question_id'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_live_quiz_answers_participant_question', table_name='live_quiz_answers')
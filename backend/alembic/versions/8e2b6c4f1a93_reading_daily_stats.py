@@ -0,0 +1,54 @@
+"""Daily reading rollups (reading_daily_stats), backfilled from reading_analyses
+
+Revision ID: 8e2b6c4f1a93
+Revises: 5d8f3a1c7b42
+Create Date: 2026-10-17 17:10:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '8e2b6c4f1a93'
+down_revision = '5d8f3a1c7b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'reading_daily_stats',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('sessions', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_words', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('reading_time_seconds', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('speech_errors', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('pronunciation_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('fluency_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('comprehension_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('answer_quality_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'day', name='uq_reading_daily_stats_user_day')
+    )
+    op.create_index('ix_reading_daily_stats_user_id', 'reading_daily_stats', ['user_id'])
+
+    op.execute(
+        "INSERT INTO reading_daily_stats (id, user_id, day, sessions, total_words, reading_time_seconds, "
+        "speech_errors, pronunciation_sum, fluency_sum, comprehension_sum, answer_quality_sum) "
+        "SELECT gen_random_uuid(), user_id, CAST(session_date AS DATE), COUNT(*), "
+        "COALESCE(SUM(total_words_read), 0), COALESCE(SUM(reading_time_seconds), 0), "
+        "COALESCE(SUM(speech_errors), 0), COALESCE(SUM(pronunciation_score), 0), "
+        "COALESCE(SUM(fluency_score), 0), COALESCE(SUM(comprehension_score), 0), "
+        "COALESCE(SUM(answer_quality_score), 0) "
+        "FROM reading_analyses GROUP BY user_id, CAST(session_date AS DATE)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reading_daily_stats_user_id', table_name='reading_daily_stats')
+    op.drop_table('reading_daily_stats')
@@ -0,0 +1,41 @@
+"""Unique credit reference on coin_transactions (coin ledger idempotency)
+
+Revision ID: c41e7a9d2b10
+Revises: 0bad82a259a2
+Create Date: 2026-10-17 15:20:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41e7a9d2b10'
+down_revision = '0bad82a259a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Older code could credit the same reference more than once; keep the
+    # lowest id per key so the unique index can be built
+    op.execute(
+        "DELETE FROM coin_transactions "
+        "WHERE amount > 0 AND reference_id IS NOT NULL AND reference_type IS NOT NULL "
+        "AND CAST(id AS TEXT) NOT IN ("
+        "SELECT MIN(CAST(id AS TEXT)) FROM coin_transactions "
+        "WHERE amount > 0 AND reference_id IS NOT NULL AND reference_type IS NOT NULL "
+        "GROUP BY student_coin_id, reference_type, reference_id)"
+    )
+    op.create_index(
+        'uq_coin_transactions_credit_reference',
+        'coin_transactions',
+        ['student_coin_id', 'reference_type', 'reference_id'],
+        unique=True,
+        postgresql_where=sa.text('amount > 0 AND reference_id IS NOT NULL'),
+        sqlite_where=sa.text('amount > 0 AND reference_id IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_coin_transactions_credit_reference', table_name='coin_transactions')
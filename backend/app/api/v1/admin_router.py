@@ -188,3 +188,16 @@ async def list_pending_teachers(
         "count": len(result),
         "teachers": result
     }
+
+
+@router.post("/letter-audio/build")
+async def build_letter_audio(
+    _: bool = Depends(verify_admin_secret)
+):
+    """
+    Re-render the letter/phoneme audio bundle (letters, harf, rharf)
+    and switch the TTS endpoints to the new version.
+    """
+    from app.services.letter_audio import letter_audio_bundle
+
+    return await letter_audio_bundle.build()
@@ -8,10 +8,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import AsyncSession, get_db, get_async_db
 from app.middleware.auth import get_current_user
 from app.models import User, UserRole, PrizeCategory
-from app.services.coin_service import CoinService
+from app.services.coin_service import CoinService, AsyncCoinService
 
 
 router = APIRouter(prefix="/coins", tags=["Coins"])
@@ -62,22 +62,22 @@ class CoinBalanceResponse(BaseModel):
 @router.get("/balance", response_model=CoinBalanceResponse, summary="Get Coin Balance")
 async def get_balance(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get student's coin balance."""
-    service = CoinService(db)
-    return service.get_balance(current_user.id)
+    service = AsyncCoinService(db)
+    return await service.get_balance(current_user.id)
 
 
 @router.get("/transactions", summary="Get Transaction History")
 async def get_transactions(
     limit: int = 50,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get coin transaction history."""
-    service = CoinService(db)
-    return service.get_transactions(current_user.id, limit)
+    service = AsyncCoinService(db)
+    return await service.get_transactions(current_user.id, limit)
 
 
 @router.post("/daily-bonus", summary="Claim Daily Bonus")
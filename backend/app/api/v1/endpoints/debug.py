@@ -85,3 +85,51 @@ if DEBUG_ENABLED:
             # - server_ip (inet_server_addr)
             # - Raw env var values
         }
+
+    @router.get("/db-pool")
+    def get_db_pool_stats(_: bool = Depends(verify_debug_access)):
+        """
+        DEBUG ENDPOINT: Connection pool mode and counters (connects, connect time,
+        checkouts, open connections). Counters are per worker process.
+        """
+        from app.core.database import POOL_MODE, pool_metrics, async_pool_metrics
+
+        return {
+            "mode": POOL_MODE,
+            "sync": pool_metrics.stats(),
+            "async": async_pool_metrics.stats()
+        }
+
+    @router.get("/document-pool")
+    def get_document_pool_stats(_: bool = Depends(verify_debug_access)):
+        """
+        DEBUG ENDPOINT: Document/OCR pool counters (pending jobs, timeouts,
+        rejections, restarts). Counters are per worker process.
+        """
+        from app.core.process_pool import document_pool
+
+        return document_pool.stats()
+
+    @router.get("/cache-stats")
+    def get_cache_stats(_: bool = Depends(verify_debug_access)):
+        """
+        DEBUG ENDPOINT: In-process cache counters (hits, misses, evictions).
+        Counters are per worker process.
+        """
+        from app.services.ai_cache_service import AICacheService
+        from app.services.speech_service import speech_service
+        from app.services.letter_audio import letter_audio_bundle
+        from app.services.olympiad_paper import olympiad_papers
+        from app.services.leaderboard import leaderboards
+        from app.services.upload_cache import upload_cache
+        from app.services.text_store import text_store
+
+        return {
+            "ai_cache": AICacheService.stats(),
+            "tts": speech_service.stats(),
+            "letter_audio": letter_audio_bundle.stats(),
+            "olympiad_papers": olympiad_papers.stats(),
+            "leaderboards": leaderboards.stats(),
+            "uploads": upload_cache.stats(),
+            "file_texts": text_store.stats()
+        }
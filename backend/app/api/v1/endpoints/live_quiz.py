@@ -3,16 +3,20 @@ Live Quiz API Endpoints
 Kahoot/Quizizz style real-time quiz routes.
 Maximum 40 students per session.
 """
+import asyncio
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.middleware.auth import get_current_user
+from app.core.config import settings
+from app.core.database import AsyncSession, get_async_db, get_db, SessionLocal
+from app.core.errors import AppError
+from app.middleware.auth import get_current_user, verify_token
 from app.models import User, UserRole
 from app.services.live_quiz_service import LiveQuizService
+from app.services.live_quiz_events import live_quiz_hub
 
 
 router = APIRouter(prefix="/live-quiz", tags=["Live Quiz"])
@@ -166,12 +170,13 @@ async def get_question_results(
 @router.get("/{quiz_id}/leaderboard", summary="Get Leaderboard (Teacher)")
 async def get_leaderboard(
     quiz_id: UUID,
+    limit: Optional[int] = Query(None, ge=1, le=100),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get current leaderboard."""
+    """Get current leaderboard (optionally only the top `limit`)."""
     service = LiveQuizService(db)
-    return service.get_leaderboard(current_user.id, quiz_id)
+    return service.get_leaderboard(current_user.id, quiz_id, limit)
 
 
 @router.post("/{quiz_id}/end", summary="End Quiz (Teacher)")
@@ -212,11 +217,14 @@ async def join_quiz(
 async def get_student_question(
     quiz_id: UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get current question (without correct answer)."""
-    service = LiveQuizService(db)
-    return service.get_student_question(current_user.id, quiz_id)
+    # Student routes are polled by the whole class: the state engine's
+    # occasional queries run on the async connection instead of blocking the loop
+    return await db.run_sync(
+        lambda session: LiveQuizService(session).get_student_question(current_user.id, quiz_id)
+    )
 
 
 @router.post("/{quiz_id}/student/answer", summary="Submit Answer (Student)")
@@ -224,16 +232,27 @@ async def submit_student_answer(
     quiz_id: UUID,
     request: SubmitAnswerRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Submit answer for current question."""
-    service = LiveQuizService(db)
-    return service.submit_answer(
+    return await db.run_sync(lambda session: LiveQuizService(session).submit_answer(
         student_user_id=current_user.id,
         quiz_id=quiz_id,
         question_id=request.question_id,
         selected_answer=request.selected_answer,
         time_to_answer_ms=request.time_to_answer_ms
+    ))
+
+
+@router.get("/{quiz_id}/student/rank", summary="Get My Rank (Student)")
+async def get_student_rank(
+    quiz_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the student's current place on the leaderboard."""
+    return await db.run_sync(
+        lambda session: LiveQuizService(session).get_student_rank(current_user.id, quiz_id)
     )
 
 
@@ -246,3 +265,72 @@ async def get_student_results(
     """Get final results for student."""
     service = LiveQuizService(db)
     return service.get_student_results(current_user.id, quiz_id)
+
+
+# ============================================================
+# REAL-TIME PUSH CHANNEL
+# ============================================================
+
+@router.websocket("/ws/{join_code}")
+async def live_quiz_events(
+    websocket: WebSocket,
+    join_code: str,
+    token: str = Query(...)
+):
+    """
+    Push channel for teacher screen and students (replaces polling).
+    Connect with ?token=<access token>; only the quiz's teacher and joined
+    students are accepted. First message is a state snapshot, then events:
+    participant_joined, question_start, answer_count, leaderboard, quiz_end.
+    """
+    try:
+        user_id = UUID(verify_token(token, settings.JWT_SECRET).get("userId"))
+    except (AppError, TypeError, ValueError):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    join_code = join_code.upper()
+    
+    # Subscribe first so events raised while the snapshot is built are queued
+    queue = live_quiz_hub.subscribe(join_code)
+    
+    # Short-lived session: do not hold a pooled connection for the socket lifetime
+    db = SessionLocal()
+    try:
+        snapshot = LiveQuizService(db).get_snapshot(join_code, user_id)
+    except AppError:
+        live_quiz_hub.unsubscribe(join_code, queue)
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    finally:
+        db.close()
+    
+    await websocket.accept()
+    receiver = asyncio.ensure_future(websocket.receive_text())
+    sender = None
+    try:
+        await websocket.send_json({"event": "snapshot", "data": snapshot})
+        while True:
+            sender = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                {sender, receiver}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if receiver in done:
+                sender.cancel()
+                # Client messages are only keep-alive pings
+                receiver.result()
+                receiver = asyncio.ensure_future(websocket.receive_text())
+                continue
+            
+            message = sender.result()
+            await websocket.send_json(message)
+            if message["event"] == "quiz_end":
+                await websocket.close()
+                break
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        if sender is not None:
+            sender.cancel()
+        live_quiz_hub.unsubscribe(join_code, queue)
@@ -4,6 +4,8 @@ from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.config import settings
 from app.services.notification_service import NotificationService
+from app.services.notification_queue import notification_queue
+from app.models.notification import NotificationType
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -21,23 +23,19 @@ class EmailRequest(BaseModel):
     subject: str
     content: str
 
-@router.post("/send-sms")
-async def send_sms(request: SMSRequest, db: Session = Depends(get_db)):
-    service = NotificationService(db)
-    success = await service.send_sms(request.phone, request.message)
-    if not success:
-        raise HTTPException(status_code=500, detail="Failed to send SMS")
-    return {"status": "success", "message": "SMS sent"}
+@router.post("/send-sms", status_code=202)
+async def send_sms(request: SMSRequest):
+    """Queue an SMS; delivery status is written to notification_logs under log_id."""
+    log_id = await notification_queue.enqueue(NotificationType.SMS, request.phone, request.message)
+    return {"status": "queued", "message": "SMS queued", "log_id": log_id}
 
-@router.post("/send-telegram")
-async def send_telegram(request: TelegramRequest = None, db: Session = Depends(get_db)):
+@router.post("/send-telegram", status_code=202)
+async def send_telegram(request: TelegramRequest = None):
     """
-    Send Telegram message.
+    Queue a Telegram message.
     If request body is provided, uses that.
     If not, uses hardcoded default Chat ID from settings.
     """
-    service = NotificationService(db)
-    
     # Defaults
     chat_id = settings.TELEGRAM_CHAT_ID
     message = "Test message from Alif24 Platform"
@@ -49,10 +47,8 @@ async def send_telegram(request: TelegramRequest = None, db: Session = Depends(g
     if not chat_id:
          raise HTTPException(status_code=400, detail="Chat ID not provided and no default set")
 
-    success = await service.send_telegram(chat_id, message)
-    if not success:
-        raise HTTPException(status_code=500, detail="Failed to send Telegram message")
-    return {"status": "success", "message": "Telegram message sent", "recipient": chat_id}
+    log_id = await notification_queue.enqueue(NotificationType.TELEGRAM, chat_id, message)
+    return {"status": "queued", "message": "Telegram message queued", "recipient": chat_id, "log_id": log_id}
 
 @router.post("/send-email")
 def send_email(request: EmailRequest, db: Session = Depends(get_db)):
@@ -5,14 +5,15 @@ Routes for olympiad management and participation.
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import AsyncSession, get_db, get_async_db
 from app.middleware.auth import get_current_user
 from app.models import User, UserRole, OlympiadSubject
-from app.services.olympiad_service import OlympiadService
+from app.services.olympiad_paper import OlympiadPaper
+from app.services.olympiad_service import OlympiadService, AsyncOlympiadService
 
 
 router = APIRouter(prefix="/olympiad", tags=["Olympiad"])
@@ -54,6 +55,10 @@ class SubmitAnswerRequest(BaseModel):
     selected_answer: int = Field(..., ge=0, le=5)
 
 
+class SubmitAnswerSheetRequest(BaseModel):
+    answers: List[SubmitAnswerRequest] = Field(..., min_items=1, max_items=100)
+
+
 class OlympiadResponse(BaseModel):
     id: str
     title: str
@@ -77,6 +82,15 @@ class LeaderboardEntry(BaseModel):
     coins_earned: int
 
 
+def _paper_response(paper: OlympiadPaper, request: Request, headers: Optional[dict] = None) -> Response:
+    """Precompiled paper bytes with a strong ETag (304 if the client has it)."""
+    headers = {"ETag": paper.etag, "Cache-Control": "private, no-cache", **(headers or {})}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and paper.etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=paper.body, media_type="application/json", headers=headers)
+
+
 # ============================================================
 # MODERATOR ENDPOINTS
 # ============================================================
@@ -183,13 +197,13 @@ async def finish_olympiad(
 # ============================================================
 
 @router.get("/list", response_model=List[OlympiadResponse], summary="List Upcoming Olympiads")
-async def list_olympiads(db: Session = Depends(get_db)):
+async def list_olympiads(db: AsyncSession = Depends(get_async_db)):
     """
     Get all upcoming and active olympiads.
     Public endpoint.
     """
-    service = OlympiadService(db)
-    return service.get_upcoming_olympiads()
+    service = AsyncOlympiadService(db)
+    return await service.get_upcoming_olympiads()
 
 
 @router.post("/{olympiad_id}/register", summary="Register for Olympiad (Student)")
@@ -209,15 +223,32 @@ async def register_for_olympiad(
 @router.post("/{olympiad_id}/begin", summary="Start Taking Olympiad (Student)")
 async def begin_olympiad(
     olympiad_id: UUID,
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Start taking the olympiad exam.
-    Returns questions without correct answers.
+    Returns questions without correct answers (the same precompiled paper
+    for every participant); the student's start time is in X-Started-At.
+    """
+    service = OlympiadService(db)
+    paper, started_at = service.start_olympiad_for_student(current_user.id, olympiad_id)
+    return _paper_response(paper, request, {"X-Started-At": started_at.isoformat()})
+
+
+@router.get("/{olympiad_id}/paper", summary="Get Olympiad Paper (Student)")
+async def get_paper(
+    olympiad_id: UUID,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Re-fetch the paper after a reload. Supports If-None-Match.
     """
     service = OlympiadService(db)
-    return service.start_olympiad_for_student(current_user.id, olympiad_id)
+    return _paper_response(service.get_paper_for_student(current_user.id, olympiad_id), request)
 
 
 @router.post("/{olympiad_id}/answer", summary="Submit Answer (Student)")
@@ -239,6 +270,25 @@ async def submit_answer(
     )
 
 
+@router.post("/{olympiad_id}/answers", summary="Submit Answer Sheet (Student)")
+async def submit_answer_sheet(
+    olympiad_id: UUID,
+    request: SubmitAnswerSheetRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Submit several answers in one request.
+    Already answered questions are skipped, so the sheet can be resent.
+    """
+    service = OlympiadService(db)
+    return service.submit_answer_sheet(
+        current_user.id,
+        olympiad_id,
+        [a.model_dump() for a in request.answers]
+    )
+
+
 @router.post("/{olympiad_id}/complete", summary="Complete Olympiad (Student)")
 async def complete_olympiad(
     olympiad_id: UUID,
@@ -255,6 +305,8 @@ async def complete_olympiad(
 @router.get("/{olympiad_id}/results", response_model=List[LeaderboardEntry], summary="Get Results (Public)")
 async def get_results(
     olympiad_id: UUID,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
     db: Session = Depends(get_db)
 ):
     """
@@ -262,7 +314,33 @@ async def get_results(
     Public endpoint after olympiad is finished.
     """
     service = OlympiadService(db)
-    return service.get_olympiad_results(olympiad_id)
+    return service.get_olympiad_results(olympiad_id, limit, offset)
+
+
+@router.get("/{olympiad_id}/leaderboard", summary="Get Live Leaderboard (Public)")
+async def get_live_leaderboard(
+    olympiad_id: UUID,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Top participants while the olympiad is running (final results once finished).
+    """
+    service = OlympiadService(db)
+    return service.get_live_leaderboard(olympiad_id, limit)
+
+
+@router.get("/{olympiad_id}/my-rank", summary="Get My Rank (Student)")
+async def get_my_rank(
+    olympiad_id: UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Student's current place in the olympiad.
+    """
+    service = OlympiadService(db)
+    return service.get_my_rank(current_user.id, olympiad_id)
 
 
 @router.get("/my-history", summary="Get My Olympiad History (Student)")
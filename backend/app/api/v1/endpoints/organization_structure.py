@@ -7,11 +7,13 @@ import secrets
 import string
 
 from app.core.database import get_db
+from app.core.errors import ServiceUnavailableError
 from app.middleware.deps import only_organization
 from app.models.rbac_models import (
     User, TeacherProfile, StudentProfile, OrganizationProfile, OrganizationMaterial, OrganizationSubscription, UserRole, AccountStatus
 )
-from app.services.notification_service import NotificationService
+from app.services.notification_queue import notification_queue
+from app.models.notification import NotificationType
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -61,7 +63,11 @@ async def invite_student_to_organization(
     
     # 1. Check if user exists
     existing_user = db.query(User).filter(User.phone == request.phone).first()
-    if existing_user:
+    pending_invite = existing_user is not None and existing_user.last_login_at is None and db.query(StudentProfile).filter(
+        StudentProfile.user_id == existing_user.id,
+        StudentProfile.organization_id == org_profile.id
+    ).first() is not None
+    if existing_user and not pending_invite:
         # If exists, just check/add profile link
         # For simplicity in this logic: if user exists but isn't a student of this org, we link them.
         # But if they are already a student elsewhere, we might need a pivot table or allow multiple orgs.
@@ -72,39 +78,50 @@ async def invite_student_to_organization(
     # 2. Generate Credentials
     password = ''.join(secrets.choice(string.digits) for _ in range(6)) # 6 digit numeric password for ease
     
-    # 3. Create User
-    new_user = User(
-        first_name=request.name.split(" ")[0],
-        last_name=" ".join(request.name.split(" ")[1:]) if " " in request.name else "",
-        phone=request.phone,
-        email=request.email,
-        role=UserRole.student,
-        status=AccountStatus.active,
-        language="uz"
-    )
-    new_user.set_password(password)
-    db.add(new_user)
-    db.flush() # Get ID
+    if pending_invite:
+        # Invited here but never logged in (e.g. the invite SMS failed): re-send with a new password
+        new_user = existing_user
+        new_user.set_password(password)
+    else:
+        # 3. Create User
+        new_user = User(
+            first_name=request.name.split(" ")[0],
+            last_name=" ".join(request.name.split(" ")[1:]) if " " in request.name else "",
+            phone=request.phone,
+            email=request.email,
+            role=UserRole.student,
+            status=AccountStatus.active,
+            language="uz"
+        )
+        new_user.set_password(password)
+        db.add(new_user)
+        db.flush() # Get ID
+
+        # 4. Create Student Profile linked to Organization
+        student_profile = StudentProfile(
+            user_id=new_user.id,
+            organization_id=org_profile.id,
+            level=1
+        )
+        db.add(student_profile)
     
-    # 4. Create Student Profile linked to Organization
-    student_profile = StudentProfile(
-        user_id=new_user.id,
-        organization_id=org_profile.id,
-        level=1
-    )
-    db.add(student_profile)
+    db.commit()
     
-    # 5. Send Notification
-    notification_service = NotificationService(db)
+    # 5. Send credentials before responding: a queued job could be lost when the
+    # (serverless) process is frozen after the response. The user row must exist
+    # before its logs are written.
     message = f"Assalomu alaykum, {request.name}. Siz {org_profile.name} tomonidan Alif24 platformasiga taklif qilindingiz.\nLogin: {request.phone}\nParol: {password}\nIlova: https://alif24.uz"
     
     # Send SMS (priority)
-    await notification_service.send_sms(request.phone, message, user_id=new_user.id)
-    
+    sms_sent = await notification_queue.send_now(NotificationType.SMS, request.phone, message, user_id=new_user.id)
+    email_sent = False
     if request.email:
-        notification_service.send_email(request.email, "Alif24 Taklifnoma", message, user_id=new_user.id)
-        
-    db.commit()
+        email_sent = await notification_queue.send_now(
+            NotificationType.EMAIL, request.email, message, user_id=new_user.id, subject="Alif24 Taklifnoma"
+        )
+    if not (sms_sent or email_sent):
+        # Inviting the same phone again re-sends with a new password
+        raise ServiceUnavailableError("Login va parol yuborilmadi. Taklifni qayta yuboring")
     
     return {"message": "Student invited successfully", "user_id": new_user.id}
 
@@ -7,10 +7,12 @@ import json
 from pydantic import BaseModel
 
 from app.core.database import get_db
+from app.core.errors import AppError
 from app.models.teacher_test import TeacherTest, TestType, TestResult as DBTestResult
 from app.models.user import User
 from app.middleware.deps import get_current_user
-from app.services.testai.parsers import parse_tests, parse_pdf, parse_word, parse_image_tests
+from app.services.testai.parsers import PARSER_VERSION, parse_tests, parse_pdf, parse_word, parse_image_tests
+from app.services.upload_cache import upload_cache
 from app.services.testai.ai_generator import AITestGenerator
 
 router = APIRouter()
@@ -79,24 +81,33 @@ async def parse_text(
 @router.post("/parse/file")
 async def parse_file(
     file: UploadFile = File(...),
+    max_questions: Optional[int] = Form(None),
     current_user: User = Depends(get_current_user)
 ):
-    """Parse file (PDF, DOCX, IMG) to generate questions"""
+    """Parse file (PDF, DOCX, IMG) to generate questions.
+
+    With max_questions, PDFs are only parsed up to the page that completes
+    that many questions; later pages are only scanned for the answer key
+    while some of those questions have no answer yet.
+    """
     try:
         content = await file.read()
         filename = file.filename.lower()
         tests = []
 
         if filename.endswith('.pdf'):
-            tests = parse_pdf(content)
+            tests = await upload_cache.run(parse_pdf, content, max_questions, version=PARSER_VERSION)
         elif filename.endswith(('.docx', '.doc')):
-            tests = parse_word(content)
+            tests = await upload_cache.run(parse_word, content, version=PARSER_VERSION)
         elif filename.endswith(('.jpg', '.jpeg', '.png')):
-            tests = parse_image_tests(content)
+            tests = await upload_cache.run(parse_image_tests, content, version=PARSER_VERSION)
         elif filename.endswith('.txt'):
              tests = parse_tests(content.decode('utf-8', errors='ignore'))
+        tests = tests[:max_questions or None]
         
         return {"status": "success", "tests": tests, "count": len(tests)}
+    except AppError:
+        raise
     except Exception as e:
         print(f"Error parsing file: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -115,7 +126,7 @@ async def generate_ai_test(
     try:
         # Pass None or the key, but generator now uses env vars primarily for Azure
         generator = AITestGenerator(api_key=actual_api_key) 
-        questions = generator.generate_questions(topic, count)
+        questions = await generator.generate_questions(topic, count)
         return {"status": "success", "tests": questions, "count": len(questions)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI generation failed: {str(e)}")
@@ -2,36 +2,100 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
+from urllib.parse import urlparse
+import asyncio
 import os
+import uuid
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.db_metrics import PoolMetrics
+from app.core.postgres_config import PostgresConfig
+
+# Optional: async sessions need sqlalchemy[asyncio] (greenlet) plus asyncpg / aiosqlite
+try:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+except ImportError:
+    AsyncSession = async_sessionmaker = create_async_engine = None
 
 url = settings.get_database_url
+IS_SERVERLESS = bool(os.getenv("VERCEL") or os.getenv("SERVERLESS"))
+
+
+def _is_pooler_url(db_url: str) -> bool:
+    """Supabase Supavisor / PgBouncer transaction-mode endpoints."""
+    parsed = urlparse(db_url)
+    return parsed.port == 6543 or "pooler.supabase.com" in (parsed.hostname or "")
+
+
+def _pool_mode(db_url: str, serverless: bool) -> str:
+    """
+    DB_POOL_MODE:
+      direct      - the app keeps a QueuePool to Postgres (servers)
+      transaction - a transaction-mode pooler (PgBouncer / Supavisor) is in front:
+                    keep a few warm connections per container, reused across
+                    invocations, and never rely on server-side prepared statements
+      none        - NullPool, a new connection (TCP + TLS + auth) per session
+    Default: direct on servers; on serverless, transaction for pooler URLs, else none.
+    """
+    mode = os.getenv("DB_POOL_MODE")
+    if mode:
+        return mode
+    if not serverless:
+        return "direct"
+    return "transaction" if _is_pooler_url(db_url) else "none"
+
+
+POOL_MODE = "sqlite" if "sqlite" in url else _pool_mode(url, IS_SERVERLESS)
+
 connect_args = {}
+async_connect_args = {}
 engine_args = {
     "echo": False
 }
+# The async engine is a second pool in every worker (see get_async_engine),
+# so it gets its own, smaller sizes: per worker the database sees up to
+# pool_size + max_overflow of both engines together.
+async_pool_args = {}
 
-if "sqlite" in url:
+if POOL_MODE == "sqlite":
     connect_args = {"check_same_thread": False}
-elif os.getenv("VERCEL") or os.getenv("SERVERLESS"):
-    # Serverless optimization: Disable pooling to prevent "too many clients" error
-    # Supabase/Postgres has a hard limit on connections. Lambdas often exhaust this.
+elif POOL_MODE == "none":
+    # Supabase/Postgres has a hard limit on connections; Lambdas without a pooler exhaust it
     engine_args["poolclass"] = NullPool
-    # Remove pool settings that don't apply to NullPool
-    engine_args.pop("pool_size", None)
-    engine_args.pop("max_overflow", None)
-    engine_args.pop("pool_pre_ping", None)
+elif POOL_MODE == "transaction":
+    # The pooler owns the real server connections, so a small pool per container
+    # is enough; a warm container skips the connect + TLS handshake entirely
+    engine_args["pool_pre_ping"] = True
+    engine_args["pool_size"] = int(os.getenv("DB_POOL_SIZE", 2))
+    engine_args["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW", 3))
+    engine_args["pool_timeout"] = 10
+    engine_args["pool_recycle"] = 300  # poolers and NATs drop idle connections
+    async_pool_args = {
+        "pool_size": int(os.getenv("DB_ASYNC_POOL_SIZE", 1)),
+        "max_overflow": int(os.getenv("DB_ASYNC_MAX_OVERFLOW", 2))
+    }
+    # psycopg2 never prepares server-side; asyncpg does unless told not to, and
+    # a prepared statement does not survive being moved to another server connection
+    async_connect_args = {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__"
+    }
 else:
     engine_args["pool_pre_ping"] = True
     engine_args["pool_size"] = 10
     engine_args["max_overflow"] = 20
+    async_pool_args = {
+        "pool_size": int(os.getenv("DB_ASYNC_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv("DB_ASYNC_MAX_OVERFLOW", 5))
+    }
 
 engine = create_engine(
     url,
     connect_args=connect_args,
     **engine_args
 )
+pool_metrics = PoolMetrics("sync").attach(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -45,16 +109,112 @@ def get_db():
     finally:
         db.close()
 
+
+# ============================================================
+# ASYNC SESSIONS
+# Routes that await their queries (get_async_db) do not block the event
+# loop while the database works, so one worker overlaps many requests.
+# Same database and pool settings as the sync engine except the sizes
+# (async_pool_args); engine is created on first use.
+#
+# Ported so far: coins, olympiad, dashboard, the principal lookup in
+# get_current_user and the live quiz student routes (question / answer /
+# rank, via run_sync on the in-memory state engine). Still on sync
+# sessions: login / refresh and the teacher side of live quiz.
+#
+# asyncpg connections belong to the event loop they were opened on. A
+# warm serverless container may run each invocation on a new loop, so
+# the engine is keyed by the running loop and replaced when it changes
+# (as http_clients does).
+# ============================================================
+
+_async_engine = None
+_async_engine_loop = None
+AsyncSessionLocal = None
+async_pool_metrics = PoolMetrics("async")
+
+
+def _async_url(sync_url: str) -> str:
+    if sync_url.startswith("sqlite://"):
+        return sync_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return PostgresConfig(url=sync_url).async_database_url
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _retire_async_engine(old_engine, old_loop):
+    """Release an engine whose pool was opened on another event loop."""
+    if old_loop is not None and old_loop.is_running() and not old_loop.is_closed():
+        # Its loop is alive (another thread): close the connections there
+        asyncio.run_coroutine_threadsafe(old_engine.dispose(), old_loop)
+    else:
+        # Its loop is gone and so is any way to close them cleanly; drop the pool
+        old_engine.sync_engine.dispose(close=False)
+        logger.debug("Async engine replaced after an event loop change")
+
+
+def get_async_engine():
+    global _async_engine, _async_engine_loop, AsyncSessionLocal
+    loop = _running_loop()
+    if _async_engine is not None and _async_engine_loop is not loop:
+        _retire_async_engine(_async_engine, _async_engine_loop)
+        _async_engine = None
+    if _async_engine is None:
+        if create_async_engine is None:
+            raise RuntimeError("Async database support is not installed (pip install sqlalchemy[asyncio] asyncpg)")
+        _async_engine = create_async_engine(
+            _async_url(url), connect_args=async_connect_args, **{**engine_args, **async_pool_args}
+        )
+        _async_engine_loop = loop
+        async_pool_metrics.attach(_async_engine.sync_engine)
+        AsyncSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+def async_session():
+    """New AsyncSession outside a request dependency (use as `async with async_session() as db`)"""
+    get_async_engine()
+    return AsyncSessionLocal()
+
+
+async def get_async_db():
+    """Dependency for getting an async database session"""
+    async with async_session() as db:
+        yield db
+
+
+async def close_async_db():
+    """Dispose the async pool (app shutdown)"""
+    global _async_engine
+    if _async_engine is not None:
+        engine, _async_engine = _async_engine, None
+        await engine.dispose()
+
 async def init_db():
     """Initialize database"""
     try:
         # Import models to ensure they are registered with Base.metadata
         # Local import to avoid circular dependency
         from app import models  # noqa
+        from sqlalchemy import inspect
+        
+        # Rollup tables created here (not by alembic) start empty
+        new_reading_rollups = not inspect(engine).has_table("reading_daily_stats")
         
         # Create tables if they don't exist
         Base.metadata.create_all(bind=engine)
         logger.info("✅ Database tables created/verified")
+        
+        if new_reading_rollups:
+            from app.services.reading_stats_service import ReadingStatsService
+            with engine.begin() as conn:
+                rows = ReadingStatsService.backfill(conn)
+            logger.info(f"✅ reading_daily_stats backfilled from reading_analyses ({rows} rows)")
 
         # Auto-migrate: add missing columns to existing tables
         # SQLAlchemy create_all() does NOT add new columns to existing tables
@@ -86,6 +246,59 @@ def _auto_migrate_columns():
         "users": [
             ("refresh_token", "TEXT"),
         ],
+        "olympiads": [
+            ("participants_count", "INTEGER NOT NULL DEFAULT 0"),
+        ],
+        "quiz_broadcasts": [
+            ("day", "DATE"),
+        ],
+    }
+    
+    # Fill columns added above from existing rows, in the same transaction as the ALTER
+    column_backfills = {
+        "olympiads.participants_count": (
+            "UPDATE olympiads SET participants_count = ("
+            "SELECT COUNT(*) FROM olympiad_participants WHERE olympiad_id = olympiads.id)"
+        ),
+    }
+    
+    # Indexes create_all() does not add to existing tables (table -> [(index_name, DDL)])
+    required_indexes = {
+        "coin_transactions": [
+            # CoinLedger credits rely on it for ON CONFLICT DO NOTHING
+            ("uq_coin_transactions_credit_reference",
+             "CREATE UNIQUE INDEX IF NOT EXISTS uq_coin_transactions_credit_reference "
+             "ON coin_transactions (student_coin_id, reference_type, reference_id) "
+             "WHERE amount > 0 AND reference_id IS NOT NULL"),
+        ],
+        "quiz_broadcasts": [
+            ("uq_quiz_broadcasts_day", "CREATE UNIQUE INDEX IF NOT EXISTS uq_quiz_broadcasts_day ON quiz_broadcasts (day)"),
+        ],
+        "live_quiz_answers": [
+            # Live quiz flushes rely on it for ON CONFLICT DO NOTHING
+            ("uq_live_quiz_answers_participant_question",
+             "CREATE UNIQUE INDEX IF NOT EXISTS uq_live_quiz_answers_participant_question "
+             "ON live_quiz_answers (participant_id, question_id)"),
+        ],
+    }
+    
+    # Rows that would violate a unique index above, removed in the same transaction
+    # before it is created (keeps the lowest id per key)
+    index_dedupes = {
+        # Older code could credit the same reference more than once
+        "uq_coin_transactions_credit_reference": (
+            "DELETE FROM coin_transactions "
+            "WHERE amount > 0 AND reference_id IS NOT NULL AND reference_type IS NOT NULL "
+            "AND CAST(id AS TEXT) NOT IN ("
+            "SELECT MIN(CAST(id AS TEXT)) FROM coin_transactions "
+            "WHERE amount > 0 AND reference_id IS NOT NULL AND reference_type IS NOT NULL "
+            "GROUP BY student_coin_id, reference_type, reference_id)"
+        ),
+        # An answer sent to two workers could be written twice
+        "uq_live_quiz_answers_participant_question": (
+            "DELETE FROM live_quiz_answers WHERE CAST(id AS TEXT) NOT IN ("
+            "SELECT MIN(CAST(id AS TEXT)) FROM live_quiz_answers GROUP BY participant_id, question_id)"
+        ),
     }
     
     is_postgres = "postgresql" in str(engine.url) or "postgres" in str(engine.url)
@@ -103,8 +316,32 @@ def _auto_migrate_columns():
                         sql = f'ALTER TABLE {table_name} ADD COLUMN {col_name} {col_type}'
                     try:
                         conn.execute(text(sql))
+                        backfill = column_backfills.get(f"{table_name}.{col_name}")
+                        if backfill:
+                            conn.execute(text(backfill))
                         conn.commit()
                         logger.info(f"✅ Auto-migrated: {table_name}.{col_name} ({col_type})")
                     except Exception as e:
+                        conn.rollback()
                         logger.warning(f"⚠️ Column migration skipped ({table_name}.{col_name}): {e}")
+        
+        for table_name, indexes in required_indexes.items():
+            if not inspector.has_table(table_name):
+                continue
+            existing_indexes = {i["name"] for i in inspector.get_indexes(table_name)}
+            for index_name, ddl in indexes:
+                if index_name in existing_indexes:
+                    continue
+                try:
+                    dedupe = index_dedupes.get(index_name)
+                    if dedupe:
+                        removed = conn.execute(text(dedupe)).rowcount
+                        if removed:
+                            logger.warning(f"⚠️ Removed {removed} duplicate row(s) from {table_name} for {index_name}")
+                    conn.execute(text(ddl))
+                    conn.commit()
+                    logger.info(f"✅ Auto-migrated: index {index_name}")
+                except Exception as e:
+                    conn.rollback()
+                    logger.warning(f"⚠️ Index migration skipped ({index_name}): {e}")
 
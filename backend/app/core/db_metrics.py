@@ -0,0 +1,94 @@
+"""
+Database pool metrics - connection counts and connect latency per engine
+
+Pool events feed a few counters so the effect of DB_POOL_MODE is
+visible (debug /db-pool):
+
+- connects / connect_ms: new physical connections and time to open them
+  (TCP + TLS + auth). With a warm pool this stays flat under load.
+- checkouts / in_use: sessions taking a connection from the pool and
+  connections currently held
+- open: physical connections this process holds
+- invalidated: connections dropped after errors (pre-ping, server restart)
+"""
+
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class PoolMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.connect_ms_total = 0.0
+        self.connect_ms_max = 0.0
+        self.checkouts = 0
+        self.in_use = 0
+        self.open = 0
+        self.invalidated = 0
+        self._pool = None
+
+    def attach(self, engine: Engine) -> "PoolMetrics":
+        """Listen to engine / pool events (pass async_engine.sync_engine for async engines)."""
+        self._pool = engine.pool
+        with self._lock:
+            # Re-attached to a replacement engine (get_async_engine): its pool starts empty
+            self.open = self.in_use = 0
+
+        @event.listens_for(engine, "do_connect")
+        def on_do_connect(dialect, connection_record, cargs, cparams):
+            connection_record.info["connect_started"] = time.perf_counter()
+
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            started = connection_record.info.pop("connect_started", None)
+            elapsed = (time.perf_counter() - started) * 1000 if started else 0.0
+            with self._lock:
+                self.connects += 1
+                self.open += 1
+                self.connect_ms_total += elapsed
+                self.connect_ms_max = max(self.connect_ms_max, elapsed)
+
+        @event.listens_for(engine, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            with self._lock:
+                self.checkouts += 1
+                self.in_use += 1
+
+        @event.listens_for(engine, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            with self._lock:
+                self.in_use = max(self.in_use - 1, 0)
+
+        @event.listens_for(engine, "close")
+        def on_close(dbapi_connection, connection_record):
+            with self._lock:
+                self.open = max(self.open - 1, 0)
+
+        @event.listens_for(engine, "invalidate")
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.invalidated += 1
+
+        return self
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "engine": self.name,
+                "pool": type(self._pool).__name__ if self._pool is not None else None,
+                "pool_status": self._pool.status() if self._pool is not None else None,
+                "connects": self.connects,
+                "connect_ms_avg": round(self.connect_ms_total / self.connects, 2) if self.connects else 0.0,
+                "connect_ms_max": round(self.connect_ms_max, 2),
+                "checkouts": self.checkouts,
+                "reuse_ratio": round(1 - self.connects / self.checkouts, 3) if self.checkouts else 0.0,
+                "in_use": self.in_use,
+                "open": self.open,
+                "invalidated": self.invalidated
+            }
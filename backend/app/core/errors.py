@@ -31,6 +31,14 @@ class ConflictError(AppError):
     def __init__(self, message: str = "Conflict"):
         super().__init__(message, status_code=409, error_code="CONFLICT")
 
+class ServiceUnavailableError(AppError):
+    def __init__(self, message: str = "Service Unavailable"):
+        super().__init__(message, status_code=503, error_code="SERVICE_UNAVAILABLE")
+
+class ProcessingTimeoutError(AppError):
+    def __init__(self, message: str = "Processing timed out"):
+        super().__init__(message, status_code=504, error_code="PROCESSING_TIMEOUT")
+
 class TokenExpiredError(UnauthorizedError):
     def __init__(self, message: str = "Token has expired"):
         super().__init__(message)
@@ -0,0 +1,109 @@
+"""
+Shared outbound HTTP clients
+
+One pooled httpx.AsyncClient per integration (host), created on first use
+and closed in the app lifespan. Keep-alive connections mean a message to
+Telegram/Eskiz/Azure no longer pays a TCP+TLS handshake every time.
+
+HTTP/2 is enabled when the optional `h2` package is installed.
+
+Usage:
+    from app.core.http_clients import http_clients
+    client = http_clients.get("telegram")
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional, Set, Tuple
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+# name -> (max_connections, max_keepalive_connections, timeout seconds)
+CLIENT_PROFILES: Dict[str, Tuple[int, int, float]] = {
+    "telegram": (30, 20, 30.0),
+    "eskiz": (10, 5, 20.0),
+    "azure_speech": (32, 16, 15.0),
+    "default": (20, 10, 30.0),
+}
+
+
+class HTTPClientRegistry:
+    """Lazily created, per-integration AsyncClients with their own connection limits."""
+
+    def __init__(self):
+        self._clients: Dict[str, Tuple[httpx.AsyncClient, Optional[asyncio.AbstractEventLoop]]] = {}
+        self._closing: Set[asyncio.Future] = set()
+
+    def get(self, name: str = "default") -> httpx.AsyncClient:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        entry = self._clients.get(name)
+        # A client is bound to the loop it was first used on (scripts, tests)
+        if entry is not None and not entry[0].is_closed and entry[1] is loop:
+            return entry[0]
+        if entry is not None and not entry[0].is_closed:
+            self._retire(name, *entry, current_loop=loop)
+
+        max_connections, max_keepalive, timeout = CLIENT_PROFILES.get(name, CLIENT_PROFILES["default"])
+        client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive
+            )
+        )
+        self._clients[name] = (client, loop)
+        return client
+
+    def _retire(
+        self,
+        name: str,
+        client: httpx.AsyncClient,
+        client_loop: Optional[asyncio.AbstractEventLoop],
+        current_loop: Optional[asyncio.AbstractEventLoop]
+    ):
+        """Close a client replaced by one for another loop, so its pool is not leaked."""
+        if client_loop is not None and client_loop.is_running() and not client_loop.is_closed():
+            # Its own loop is alive (another thread): close it there
+            future = asyncio.run_coroutine_threadsafe(self._aclose(name, client), client_loop)
+        elif current_loop is not None:
+            # Its loop is gone; release the sockets from the current one
+            future = current_loop.create_task(self._aclose(name, client))
+        else:
+            logger.debug(f"HTTP client {name} replaced outside an event loop; left to GC")
+            return
+        self._closing.add(future)
+        future.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _aclose(name: str, client: httpx.AsyncClient):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.debug(f"Closing replaced HTTP client {name} failed: {e}")
+
+    async def close(self):
+        """Close every client (app shutdown)."""
+        clients, self._clients = self._clients, {}
+        for name, (client, _) in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Closing HTTP client {name} failed: {e}")
+
+
+# Global registry instance (one per worker process)
+http_clients = HTTPClientRegistry()
@@ -97,8 +97,9 @@ class PostgresConfig:
     @property
     def async_database_url(self) -> str:
         """Get async PostgreSQL connection URL (for asyncpg)"""
-        url = self.database_url
-        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+        url = self.database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+        # asyncpg takes ssl=<mode> instead of libpq's sslmode=<mode>
+        return url.replace("sslmode=", "ssl=")
     
     def get_engine_kwargs(self) -> Dict[str, Any]:
         """Get SQLAlchemy engine configuration"""
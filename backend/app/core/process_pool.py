@@ -0,0 +1,200 @@
+"""
+Document processing pool - PDF/DOCX extraction and OCR off the event loop
+
+pdfplumber/pypdf, python-docx and pytesseract are CPU-bound and
+synchronous. Called inside an `async def` handler they freeze the whole
+worker: one 50 MB PDF or a photographed page stalls every other request.
+Upload handlers submit that work here and await the result instead.
+
+- Bounded: DOC_POOL_WORKERS worker processes, and at most
+  DOC_POOL_MAX_QUEUE jobs running or waiting. Past that, uploads get
+  a 503 straight away instead of piling up.
+- Timeouts: a job that runs longer than DOC_POOL_TIMEOUT seconds gets
+  a 504. A process pool cannot stop a single job, so the pool is retired:
+  new jobs go to a fresh pool, while the other jobs already in the old
+  one get up to DOC_POOL_TIMEOUT more seconds to finish. Then its
+  workers are killed. Jobs still unfinished at that point fail with a
+  503, and stats() counts them as "lost".
+- Cancellation: a job that is still queued when its request times out
+  or disconnects is dropped before it starts.
+
+On serverless (VERCEL / SERVERLESS) there are no process pools, so a
+thread pool is used instead. It is still off the event loop and still
+bounded, but a timed-out job keeps running until it finishes. The
+default timeout there is 25s, below the function's maxDuration (30s in
+vercel.json), so the client gets the 504 instead of a platform kill.
+
+Jobs must be picklable: module-level functions with bytes/str arguments.
+
+Usage:
+    from app.core.process_pool import document_pool
+    tests = await document_pool.run(parse_pdf, content)
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Set
+
+from app.core.errors import ProcessingTimeoutError, ServiceUnavailableError
+
+logger = logging.getLogger(__name__)
+
+IS_SERVERLESS = bool(os.getenv("VERCEL") or os.getenv("SERVERLESS"))
+
+
+class DocumentPool:
+    """Bounded executor for blocking document jobs, awaited from async handlers."""
+
+    def __init__(self, workers: int = 2, max_queue: int = 8, timeout: float = 60.0, use_processes: bool = True):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+        self._jobs: Dict[Executor, Set[Future]] = {}  # unfinished jobs per pool
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.submitted = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.restarts = 0
+        self.lost = 0  # other jobs killed by a restart
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.use_processes:
+                    # spawn: forking a process that runs an event loop and
+                    # DB pool threads can deadlock the child
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="doc-pool")
+                self._jobs[self._executor] = set()
+            return self._executor
+
+    def _release(self, executor: Executor, future: Optional[Future]):
+        with self._lock:
+            self.pending -= 1
+            self._jobs.get(executor, set()).discard(future)
+
+    def _restart(self, executor: Executor, stuck: Optional[Future] = None):
+        """Retire a stuck or broken pool; the next submit starts a new one."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self.restarts += 1
+
+        if stuck is not None and isinstance(executor, ProcessPoolExecutor):
+            threading.Thread(target=self._drain_and_kill, args=(executor, stuck), daemon=True).start()
+        else:
+            self._kill(executor, stuck)
+
+    def _drain_and_kill(self, executor: Executor, stuck: Future):
+        """Give the other jobs of a retired pool time to finish, then stop it."""
+        with self._lock:
+            others = [f for f in self._jobs.get(executor, ()) if f is not stuck]
+        wait(others, timeout=self.timeout)
+        self._kill(executor, stuck)
+
+    def _kill(self, executor: Executor, stuck: Optional[Future] = None):
+        with self._lock:
+            jobs = self._jobs.pop(executor, set())
+        if isinstance(executor, ProcessPoolExecutor):
+            # Killing the workers is the only way to stop a running job.
+            # Jobs still queued or running fail with BrokenProcessPool (503).
+            lost = sum(1 for f in jobs if f is not stuck and not f.done())
+            if lost:
+                with self._lock:
+                    self.lost += lost
+                logger.warning(f"Document pool restart dropped {lost} job(s)")
+            for process in list((executor._processes or {}).values()):
+                process.terminate()
+        # Threads cannot be stopped: a thread pool's jobs run to completion
+        executor.shutdown(wait=False)
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """Run fn(*args) in the pool and await its result."""
+        with self._lock:
+            if self.pending >= self.max_queue:
+                self.rejected += 1
+                raise ServiceUnavailableError("Server band, birozdan so'ng qayta urinib ko'ring")
+            self.pending += 1
+            self.submitted += 1
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            self._release(executor, None)
+            raise
+        with self._lock:
+            self._jobs.get(executor, set()).add(future)
+        future.add_done_callback(partial(self._release, executor))
+
+        try:
+            # wait_for cancels the wrapper on timeout, which also cancels
+            # the job if it has not started yet
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            if not future.cancelled():
+                logger.warning(f"Document job {getattr(fn, '__name__', fn)} timed out, restarting pool")
+                self._restart(executor, future)
+            raise ProcessingTimeoutError("Faylni qayta ishlash juda uzoq davom etdi")
+        except BrokenProcessPool:
+            with self._lock:
+                self.failed += 1
+            self._restart(executor)
+            raise ServiceUnavailableError("Faylni qayta ishlab bo'lmadi, qayta urinib ko'ring")
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+
+    def close(self):
+        """Stop the workers (app shutdown)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._jobs.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "kind": "process" if self.use_processes else "thread",
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "timeout": self.timeout,
+                "pending": self.pending,
+                "submitted": self.submitted,
+                "failed": self.failed,
+                "timeouts": self.timeouts,
+                "rejected": self.rejected,
+                "restarts": self.restarts,
+                "lost": self.lost
+            }
+
+
+_workers = int(os.getenv("DOC_POOL_WORKERS", min(2, os.cpu_count() or 1)))
+
+# Global document pool (one per worker process)
+document_pool = DocumentPool(
+    workers=_workers,
+    max_queue=int(os.getenv("DOC_POOL_MAX_QUEUE", _workers * 4)),
+    # Serverless: stay under the function's maxDuration (vercel.json: 30s)
+    timeout=float(os.getenv("DOC_POOL_TIMEOUT", 25 if IS_SERVERLESS else 60)),
+    use_processes=not IS_SERVERLESS
+)
@@ -1,11 +1,12 @@
 """
 Uzbek Letters Learning Router
 """
-from fastapi import APIRouter, HTTPException, Response, UploadFile, File
+from fastapi import APIRouter, HTTPException, Request, Response, UploadFile, File
 from pydantic import BaseModel
 import os
 from urllib.parse import quote
 from app.services.speech_service import speech_service
+from app.services.letter_audio import letter_audio_bundle
 
 router = APIRouter()
 
@@ -30,16 +31,23 @@ async def text_to_speech_options():
     """Handle CORS preflight for text-to-speech"""
     return Response(status_code=200)
 
-@router.post("/text-to-speech")
-async def text_to_speech(request: TextToSpeechRequest):
-    """Convert Uzbek text to speech using Azure REST API (Lightweight)"""
-    if not request.text:
+def build_tts_ssml(text: str, language: str = "uz-UZ") -> str:
+    """SSML sent to Azure (also used to render the letter audio bundle)"""
+    return speech_service.build_ssml(normalize_uz(text), language)
+
+async def _speak(text: str, http_request: Request) -> Response:
+    if not text:
         raise HTTPException(status_code=400, detail="Matn kiritilmadi")
     
-    norm_text = normalize_uz(request.text)
+    ssml = build_tts_ssml(text)
+    
+    # Pre-rendered letters are served from the bundle (ETag + Range)
+    bundled = letter_audio_bundle.response(ssml, http_request)
+    if bundled is not None:
+        return bundled
     
     try:
-        audio_data = speech_service.generate_speech(norm_text)
+        audio_data = await speech_service.synthesize(ssml)
         return Response(
             content=audio_data,
             media_type="audio/mpeg"
@@ -50,6 +58,16 @@ async def text_to_speech(request: TextToSpeechRequest):
             detail=f"Nutq sintezida xatolik: {str(e)}"
         )
 
+@router.post("/text-to-speech")
+async def text_to_speech(request: TextToSpeechRequest, http_request: Request):
+    """Convert Uzbek text to speech using Azure REST API (Lightweight)"""
+    return await _speak(request.text, http_request)
+
+@router.get("/text-to-speech")
+async def text_to_speech_get(http_request: Request, text: str = ""):
+    """Same as POST, but cacheable by the browser/CDN (ETag, Range)"""
+    return await _speak(text, http_request)
+
 @router.get("/")
 async def harf_home():
     """Harf moduli bosh sahifasi"""
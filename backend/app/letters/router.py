@@ -1,12 +1,12 @@
 """
 Unified Letters Learning Router - Supports Uzbek and Russian
 """
-from fastapi import APIRouter, HTTPException, Response
+from fastapi import APIRouter, HTTPException, Request, Response
 from pydantic import BaseModel
 import os
-import requests as http_requests
-from xml.sax.saxutils import escape
 from app.core.config import settings
+from app.services.speech_service import speech_service
+from app.services.letter_audio import letter_audio_bundle
 
 router = APIRouter()
 
@@ -95,33 +95,51 @@ def get_voice_name(language: str) -> str:
     return voices.get(language, "uz-UZ-MadinaNeural")
 
 
-@router.post("/text-to-speech")
-async def text_to_speech(request: TextToSpeechRequest):
+def build_tts_ssml(text: str, language: str = "uz-UZ") -> str:
     """
-    Convert text to speech for any supported language
-    Supported languages: uz-UZ (Uzbek), ru-RU (Russian)
+    Normalize text and build the SSML sent to Azure.
+    Also used to render the pre-built letter audio bundle.
     """
-    if not request.text:
+    # Normalize text based on language
+    if language == "uz-UZ":
+        norm_text = normalize_uzbek(text)
+    elif language == "ru-RU":
+        norm_text = normalize_russian(text)
+    else:
+        norm_text = text
+    
+    # Check if we need special SSML (only for Uzbek special characters)
+    ssml = None
+    if language == "uz-UZ":
+        ssml = build_uzbek_ssml(norm_text)
+    
+    # If no special SSML, build a standard one with prosody for children
+    if not ssml:
+        lang = language or "uz-UZ"
+        ssml = speech_service.build_ssml(norm_text, lang, get_voice_name(language), rate="-20%")
+    return ssml
+
+
+async def _speak(text: str, language: str, http_request: Request) -> Response:
+    if not text:
         error_messages = {
             "uz-UZ": "Matn kiritilmagan.",
             "ru-RU": "Текст не введен."
         }
         raise HTTPException(
             status_code=400, 
-            detail=error_messages.get(request.language, "Text not provided.")
+            detail=error_messages.get(language, "Text not provided.")
         )
     
-    # Normalize text based on language
-    if request.language == "uz-UZ":
-        norm_text = normalize_uzbek(request.text)
-    elif request.language == "ru-RU":
-        norm_text = normalize_russian(request.text)
-    else:
-        norm_text = request.text
+    ssml = build_tts_ssml(text, language)
+    
+    # Pre-rendered letters are served from the bundle (ETag + Range)
+    bundled = letter_audio_bundle.response(ssml, http_request)
+    if bundled is not None:
+        return bundled
     
     # Configure Azure Speech via REST API
     speech_key = settings.AZURE_SPEECH_KEY
-    speech_region = settings.AZURE_SPEECH_REGION
     
     if not speech_key:
         raise HTTPException(
@@ -129,40 +147,9 @@ async def text_to_speech(request: TextToSpeechRequest):
             detail="Azure Speech key not configured"
         )
     
-    voice_name = get_voice_name(request.language)
-    
-    # Check if we need special SSML (only for Uzbek special characters)
-    ssml = None
-    if request.language == "uz-UZ":
-        ssml = build_uzbek_ssml(norm_text)
-    
-    # If no special SSML, build a standard one with prosody for children
-    if not ssml:
-        escaped = escape(norm_text)
-        lang = request.language or "uz-UZ"
-        ssml = f"""<speak version='1.0' xml:lang='{lang}'>
-            <voice name='{voice_name}'>
-                <prosody rate='-20%'>{escaped}</prosody>
-            </voice>
-        </speak>"""
-    
     try:
-        # Get token
-        token_url = f"https://{speech_region}.api.cognitive.microsoft.com/sts/v1.0/issueToken"
-        token_resp = http_requests.post(token_url, headers={"Ocp-Apim-Subscription-Key": speech_key})
-        token_resp.raise_for_status()
-        
-        # TTS via REST
-        tts_url = f"https://{speech_region}.tts.speech.microsoft.com/cognitiveservices/v1"
-        tts_resp = http_requests.post(tts_url, headers={
-            "Authorization": f"Bearer {token_resp.text}",
-            "Content-Type": "application/ssml+xml",
-            "X-Microsoft-OutputFormat": "audio-16khz-128kbitrate-mono-mp3",
-            "User-Agent": "Alif24-Backend"
-        }, data=ssml.encode('utf-8'))
-        tts_resp.raise_for_status()
-        
-        return Response(content=tts_resp.content, media_type="audio/mpeg")
+        audio = await speech_service.synthesize(ssml)
+        return Response(content=audio, media_type="audio/mpeg")
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -170,6 +157,23 @@ async def text_to_speech(request: TextToSpeechRequest):
         )
 
 
+@router.post("/text-to-speech")
+async def text_to_speech(request: TextToSpeechRequest, http_request: Request):
+    """
+    Convert text to speech for any supported language
+    Supported languages: uz-UZ (Uzbek), ru-RU (Russian)
+    """
+    return await _speak(request.text, request.language, http_request)
+
+
+@router.get("/text-to-speech")
+async def text_to_speech_get(http_request: Request, text: str = "", language: str = "uz-UZ"):
+    """
+    Same as POST, but cacheable by the browser/CDN (ETag, Range)
+    """
+    return await _speak(text, language, http_request)
+
+
 @router.get("/")
 async def letters_home():
     """Letters module home"""
@@ -178,6 +182,7 @@ async def letters_home():
         "status": "active",
         "supported_languages": ["uz-UZ", "ru-RU"],
         "endpoints": [
-            {"path": "/text-to-speech", "method": "POST", "description": "Convert text to speech"}
+            {"path": "/text-to-speech", "method": "POST", "description": "Convert text to speech"},
+            {"path": "/text-to-speech", "method": "GET", "description": "Convert text to speech (cacheable)"}
         ]
     }
@@ -2,10 +2,10 @@
 MathKids Image Reader - Matematik masalalarni rasmdan o'qish
 """
 from fastapi import APIRouter, UploadFile, File, HTTPException
-from openai import AzureOpenAI
 import base64
 import os
 from app.core.config import settings
+from app.services.ai_gateway import ai_gateway
 
 router = APIRouter()
 
@@ -67,11 +67,6 @@ async def read_math_image(image: UploadFile = File(...)):
     Rasmdan matematik masalani o'qish
     """
     try:
-        client = AzureOpenAI(
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT", AZURE_ENDPOINT),
-            api_key=os.getenv("AZURE_OPENAI_KEY", AZURE_KEY),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION", AZURE_VERSION)
-        )
         model = os.getenv("AZURE_OPENAI_MODEL", AZURE_MODEL)
         
         # Rasmni base64 ga encode qilish
@@ -86,7 +81,7 @@ async def read_math_image(image: UploadFile = File(...)):
             "Faqat masala matnini qaytaring, boshqa izoh yozmang."
         )
         
-        response = client.chat.completions.create(
+        response = await ai_gateway.chat(
             model=model,
             messages=[{
                 "role": "user",
@@ -1,13 +1,16 @@
 """
 MathKids Solver - Matematik masalalarni yechish va o'rgatish
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional, Dict
-from openai import AzureOpenAI
 import os
 import json
 from app.core.config import settings
+from app.core.database import get_db
+from app.services.ai_cache_service import AICacheService
+from app.services.ai_gateway import ai_gateway
 
 router = APIRouter()
 
@@ -47,22 +50,12 @@ class InteractiveSolveRequest(BaseModel):
     conversation_history: Optional[List[Dict]] = None
 
 
-def get_azure_client():
-    """Azure OpenAI client yaratish"""
-    return AzureOpenAI(
-        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT", AZURE_ENDPOINT),
-        api_key=os.getenv("AZURE_OPENAI_KEY", AZURE_KEY),
-        api_version=os.getenv("AZURE_OPENAI_API_VERSION", AZURE_VERSION)
-    )
-
-
 @router.post("/solve")
-async def solve_math_problem(request: SolveProblemRequest):
+async def solve_math_problem(request: SolveProblemRequest, db: Session = Depends(get_db)):
     """
     Matematik masalani qadam-baqadam yechish va tushuntirish
     """
     try:
-        client = get_azure_client()
         model = os.getenv("AZURE_OPENAI_MODEL", AZURE_MODEL)
         
         system_prompt = (
@@ -101,18 +94,24 @@ async def solve_math_problem(request: SolveProblemRequest):
             f"juda oson va qiziqarli qilib tushuntir. JSON formatida javob ber."
         )
         
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=2000,
-            temperature=0.7,
-            response_format={"type": "json_object"}
-        )
+        async def generate():
+            response = await ai_gateway.chat(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                max_tokens=2000,
+                temperature=0.7,
+                response_format={"type": "json_object"}
+            )
+            return json.loads(response.choices[0].message.content.strip())
         
-        solution = json.loads(response.choices[0].message.content.strip())
+        # Same problem + grade -> one completion (cached, concurrent calls coalesced)
+        prompt_hash = AICacheService.generate_hash(user_prompt, system_prompt, model=model)
+        solution = await AICacheService.get_or_generate(
+            db, prompt_hash, generate, prompt_text=user_prompt, model=model
+        )
         return {"solution": solution}
         
     except Exception as e:
@@ -125,7 +124,6 @@ async def explain_step(request: ExplainStepRequest):
     Konkret qadamni batafsil tushuntirish
     """
     try:
-        client = get_azure_client()
         model = os.getenv("AZURE_OPENAI_MODEL", AZURE_MODEL)
         
         system_prompt = (
@@ -140,7 +138,7 @@ async def explain_step(request: ExplainStepRequest):
             f"Bu qadamni batafsil tushuntiring."
         )
         
-        response = client.chat.completions.create(
+        response = await ai_gateway.chat(
             model=model,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -163,7 +161,6 @@ async def generate_similar(request: GenerateSimilarRequest):
     O'xshash masala yaratish
     """
     try:
-        client = get_azure_client()
         model = os.getenv("AZURE_OPENAI_MODEL", AZURE_MODEL)
         
         system_prompt = (
@@ -180,7 +177,7 @@ async def generate_similar(request: GenerateSimilarRequest):
             f"Bu masalaga o'xshash yangi masala yarating. Faqat masala matnini yozing."
         )
         
-        response = client.chat.completions.create(
+        response = await ai_gateway.chat(
             model=model,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -203,7 +200,6 @@ async def chat_about_solution(request: ChatRequest):
     Yechim haqida savolga javob berish
     """
     try:
-        client = get_azure_client()
         model = os.getenv("AZURE_OPENAI_MODEL", AZURE_MODEL)
         
         system_prompt = (
@@ -220,7 +216,7 @@ async def chat_about_solution(request: ChatRequest):
             f"Javob bering:"
         )
         
-        response = client.chat.completions.create(
+        response = await ai_gateway.chat(
             model=model,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -244,7 +240,6 @@ async def interactive_solve(request: InteractiveSolveRequest):
     qadam-baqadam savol berib, o'zi yechishga yordam beradi
     """
     try:
-        client = get_azure_client()
         model = os.getenv("AZURE_OPENAI_MODEL", AZURE_MODEL)
         
         system_prompt = (
@@ -300,7 +295,7 @@ async def interactive_solve(request: InteractiveSolveRequest):
         
         messages.append({"role": "user", "content": user_prompt})
         
-        response = client.chat.completions.create(
+        response = await ai_gateway.chat(
             model=model,
             messages=messages,
             max_tokens=800,
@@ -1,15 +1,70 @@
+import copy
+import hashlib
+import os
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.core.database import get_db
-from app.models.user import User
+from app.core.database import async_session, get_db
+from app.models.user import User, TeacherProfile
 from app.core.errors import UnauthorizedError, TokenExpiredError
 
 security = HTTPBearer()
 
+# ============================================================
+# PRINCIPAL CACHE
+# (user_id, token sha256) -> User column values
+# (user_id, "teacher")    -> TeacherProfile.verification_status
+# Short TTL bounds staleness for edits made outside the ORM (e.g. Supabase);
+# any flushed change to a User or TeacherProfile invalidates its entries.
+# ============================================================
+PRINCIPAL_TTL = int(os.getenv("AUTH_PRINCIPAL_TTL", 30))  # seconds
+principal_cache = TTLCache(maxsize=10000, ttl=PRINCIPAL_TTL)
+
+# Secrets are not kept in memory; they lazy-load if an endpoint reads them
+_UNCACHED_COLUMNS = {"password_hash", "pin_code", "refresh_token"}
+
+
+def invalidate_principal(user_id) -> None:
+    """Drop every cached principal entry for this user (all tokens)."""
+    user_key = str(user_id)
+    principal_cache.delete_where(lambda key: key[0] == user_key)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed_principals(session, flush_context):
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            invalidate_principal(obj.id)
+        elif isinstance(obj, TeacherProfile):
+            invalidate_principal(obj.user_id)
+    for obj in session.new:
+        if isinstance(obj, TeacherProfile):
+            invalidate_principal(obj.user_id)
+
+
+def _snapshot_user(user: User) -> dict:
+    return {
+        attr.key: getattr(user, attr.key)
+        for attr in inspect(User).column_attrs
+        if attr.key not in _UNCACHED_COLUMNS
+    }
+
+
+def _attach_user(db: Session, values: dict) -> User:
+    """
+    Rebuild a persistent User from cached values without a SELECT.
+    Uncached columns and relationships load on first access as usual.
+    """
+    user = User(**copy.deepcopy(values))
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+
 def create_access_token(user_id: str, email: str, role: str) -> str:
     """Create JWT access token"""
     expire = datetime.utcnow() + timedelta(days=7)  # 7 days
@@ -59,9 +114,18 @@ async def get_current_user(
     except (ValueError, TypeError):
         raise UnauthorizedError("Invalid user ID format")
     
-    user = db.query(User).filter(User.id == user_uuid).first()
-    if not user:
-        raise UnauthorizedError("User not found")
+    cache_key = (str(user_uuid), hashlib.sha256(token.encode()).hexdigest())
+    cached = principal_cache.get(cache_key)
+    if cached is None:
+        # Awaited on a short-lived session: the request's sync session
+        # never connects unless the endpoint itself queries
+        async with async_session() as adb:
+            found = await adb.get(User, user_uuid)
+            if not found:
+                raise UnauthorizedError("User not found")
+            cached = _snapshot_user(found)
+        principal_cache.set(cache_key, cached)
+    user = _attach_user(db, cached)
     
     # Check status field (rbac_models.User uses status instead of is_active)
     if hasattr(user, 'status') and user.status != AccountStatus.active:
@@ -26,7 +26,7 @@ from app.models.rbac_models import User, UserRole, StudentProfile, TeacherProfil
 
 # FIX: Import canonical get_current_user from auth.py instead of redefining it
 # This is the SINGLE SOURCE OF TRUTH for user authentication
-from app.middleware.auth import get_current_user
+from app.middleware.auth import get_current_user, principal_cache
 
 
 # Security scheme (kept for any direct usage in this module)
@@ -54,6 +54,26 @@ async def get_current_active_user(
     return current_user
 
 
+_NO_TEACHER_PROFILE = "missing"
+
+
+def _teacher_verification_status(db: Session, user_id):
+    """
+    TeacherProfile.verification_status for this user (None if no profile).
+    Cached with the principal for AUTH_PRINCIPAL_TTL seconds; approve/reject
+    through the API invalidates it immediately.
+    """
+    key = (str(user_id), "teacher")
+    cached = principal_cache.get(key)
+    if cached is None:
+        verification_status = db.query(TeacherProfile.verification_status).filter(
+            TeacherProfile.user_id == user_id
+        ).scalar()
+        cached = _NO_TEACHER_PROFILE if verification_status is None else verification_status
+        principal_cache.set(key, cached)
+    return None if cached == _NO_TEACHER_PROFILE else cached
+
+
 async def require_verified_teacher(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -69,23 +89,18 @@ async def require_verified_teacher(
             detail="Only teachers can access this resource"
         )
 
-    # 2. Check Teacher Profile Status
-    # Note: Using joinedload or simple query since user.teacher_profile might not be loaded
-    # But usually relationship is lazy loaded on access if session is active.
-    # Safe approach: Query profile directly to be sure.
-    from app.models.rbac_models import TeacherProfile, TeacherStatus
+    # 2. Check Teacher Profile Status (status column only, short-lived cache)
+    from app.models.rbac_models import TeacherStatus
     
-    teacher_profile = db.query(TeacherProfile).filter(
-        TeacherProfile.user_id == current_user.id
-    ).first()
+    verification_status = _teacher_verification_status(db, current_user.id)
 
-    if not teacher_profile:
+    if verification_status is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail="Teacher profile not found"
         )
 
-    if teacher_profile.verification_status != TeacherStatus.approved:
+    if verification_status != TeacherStatus.approved:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, 
             detail="Teacher account is pending approval. You cannot create content yet."
@@ -163,9 +178,10 @@ async def only_teacher(
 ) -> User:
     """
     Dependency: Only verified teacher can access.
-    Uses direct DB query (not lazy relationship) to always get fresh status.
+    Reads the status column directly (not the lazy relationship); the value
+    is cached for AUTH_PRINCIPAL_TTL seconds, so Supabase edits apply within that window.
     """
-    from app.models.rbac_models import TeacherProfile, TeacherStatus
+    from app.models.rbac_models import TeacherStatus
     
     if current_user.role != UserRole.teacher:
         raise HTTPException(
@@ -173,18 +189,15 @@ async def only_teacher(
             detail="Teacher access required"
         )
     
-    # Direct DB query — always reads latest status (important for Supabase edits)
-    teacher_profile = db.query(TeacherProfile).filter(
-        TeacherProfile.user_id == current_user.id
-    ).first()
+    verification_status = _teacher_verification_status(db, current_user.id)
     
-    if not teacher_profile:
+    if verification_status is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Teacher profile not found. Please contact support."
         )
     
-    if teacher_profile.verification_status != TeacherStatus.approved:
+    if verification_status != TeacherStatus.approved:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Teacher account not verified yet. Please wait for approval."
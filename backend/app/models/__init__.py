@@ -43,7 +43,7 @@ from app.models.avatar import Avatar
 from app.models.guest_session import GuestSession
 from app.models.teacher_lesson import TeacherLesson, TeacherLessonStudent, TeacherLessonType
 from app.models.teacher_test import TeacherTest, TestResult, TestType
-from app.models.reading_analysis import ReadingAnalysis
+from app.models.reading_analysis import ReadingAnalysis, ReadingDailyStat
 from app.crm.models import Lead, Activity, LeadStatus, ActivityType
 
 # NEW: Olympiad Models
@@ -86,7 +86,7 @@ from app.models.live_quiz import (
 from app.models.user import Language
 
 # Daily Quiz Models
-from app.models.quiz import QuizQuestion, QuizAttempt
+from app.models.quiz import QuizQuestion, QuizAttempt, QuizBroadcast
 
 # AI Cache Model
 from app.models.ai_cache import AICache
@@ -138,6 +138,7 @@ __all__ = [
     "TestResult",
     "TestType",
     "ReadingAnalysis",
+    "ReadingDailyStat",
     "OrganizationProfile",
     "ModeratorProfile",
     "ModeratorRoleType",
@@ -190,6 +191,7 @@ __all__ = [
     # NEW: Daily Quiz Models
     "QuizQuestion",
     "QuizAttempt",
+    "QuizBroadcast",
     
     # AI Cache
     "AICache",
@@ -4,7 +4,7 @@ Coin Models - Reward system for ALIF24 Platform
 Coins can be earned through lessons, games, quizzes, and olympiads.
 Coins can be converted to real money or redeemed for prizes.
 """
-from sqlalchemy import Column, String, Boolean, Integer, Float, DateTime, Text, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Boolean, Integer, Float, DateTime, Text, ForeignKey, Index, Enum as SQLEnum, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -122,6 +122,17 @@ class CoinTransaction(Base):
     # Relationships
     student_coin = relationship("StudentCoin", back_populates="transactions")
     
+    # Idempotency: a credit for the same reference is recorded only once per balance
+    __table_args__ = (
+        Index(
+            "uq_coin_transactions_credit_reference",
+            "student_coin_id", "reference_type", "reference_id",
+            unique=True,
+            postgresql_where=text("amount > 0 AND reference_id IS NOT NULL"),
+            sqlite_where=text("amount > 0 AND reference_id IS NOT NULL")
+        ),
+    )
+    
     def __repr__(self):
         return f"<CoinTransaction {self.type.value} {self.amount:+d}>"
 
@@ -2,7 +2,7 @@
 Live Quiz Models - Kahoot/Quizizz style real-time quiz system
 Maximum 40 students per quiz session (one classroom).
 """
-from sqlalchemy import Column, String, Boolean, Integer, Float, DateTime, Text, ForeignKey, Enum as SQLEnum, JSON
+from sqlalchemy import Column, String, Boolean, Integer, Float, DateTime, Text, ForeignKey, Enum as SQLEnum, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -183,6 +183,10 @@ class LiveQuizAnswer(Base):
     Live Quiz answer - Qatnashchining javoblari
     """
     __tablename__ = "live_quiz_answers"
+    # One answer per question: workers flush with ON CONFLICT DO NOTHING
+    __table_args__ = (
+        Index("uq_live_quiz_answers_participant_question", "participant_id", "question_id", unique=True),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     participant_id = Column(UUID(as_uuid=True), ForeignKey("live_quiz_participants.id"), nullable=False)
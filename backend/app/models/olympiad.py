@@ -74,6 +74,7 @@ class Olympiad(Base):
     
     # Sozlamalar
     max_participants = Column(Integer, default=500)
+    participants_count = Column(Integer, default=0, server_default="0", nullable=False)  # register_student yangilaydi
     questions_count = Column(Integer, default=20)
     status = Column(SQLEnum(OlympiadStatus), default=OlympiadStatus.draft)
     results_public = Column(Boolean, default=True)  # Natijalar ochiq
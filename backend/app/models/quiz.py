@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, String, Integer, Date, DateTime, Boolean, ForeignKey, Index, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from datetime import datetime
@@ -32,3 +32,29 @@ class QuizAttempt(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     question = relationship("QuizQuestion", back_populates="attempts")
+
+class QuizBroadcast(Base):
+    """
+    Progress of a daily quiz broadcast to Telegram users.
+    Recipients are sent in TelegramUser.id order; last_recipient_id is the
+    checkpoint an interrupted broadcast resumes from. One broadcast per
+    day: the unique `day` lets concurrent runs race on INSERT safely.
+    """
+    __tablename__ = "quiz_broadcasts"
+    __table_args__ = (
+        Index("uq_quiz_broadcasts_day", "day", unique=True),
+    )
+
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    question_id = Column(PG_UUID(as_uuid=True), ForeignKey("quiz_questions.id"), nullable=False)
+    day = Column(Date, nullable=True)  # NULL only for rows created before the column existed
+    status = Column(String, default="running", index=True)  # running, completed
+    last_recipient_id = Column(PG_UUID(as_uuid=True), nullable=True)
+    sent_count = Column(Integer, default=0)
+    failed_count = Column(Integer, default=0)
+    blocked_count = Column(Integer, default=0)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+    question = relationship("QuizQuestion")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, JSON, Text
+from sqlalchemy import Column, String, Integer, Float, Date, DateTime, JSON, Text, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy import ForeignKey
@@ -52,3 +52,36 @@ class ReadingAnalysis(Base):
     
     def __repr__(self):
         return f"<ReadingAnalysis(id={self.id}, user_id={self.user_id}, date={self.session_date})>"
+
+
+class ReadingDailyStat(Base):
+    """
+    Foydalanuvchining kunlik o'qish statistikasi (ReadingAnalysis yig'indisi)
+    save_analysis har bir tahlil bilan bir tranzaksiyada yangilaydi; tarix va
+    dashboard so'rovlari xom tahlillar o'rniga shu qatorlarni o'qiydi.
+    O'rtacha ball = *_sum / sessions
+    """
+    __tablename__ = "reading_daily_stats"
+    __table_args__ = (
+        UniqueConstraint('user_id', 'day', name='uq_reading_daily_stats_user_day'),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    day = Column(Date, nullable=False)
+    
+    sessions = Column(Integer, default=0, nullable=False)
+    total_words = Column(Integer, default=0, nullable=False)
+    reading_time_seconds = Column(Integer, default=0, nullable=False)
+    speech_errors = Column(Integer, default=0, nullable=False)
+    
+    # Ballar yig'indisi (o'rtacha uchun)
+    pronunciation_sum = Column(Float, default=0.0, nullable=False)
+    fluency_sum = Column(Float, default=0.0, nullable=False)
+    comprehension_sum = Column(Float, default=0.0, nullable=False)
+    answer_quality_sum = Column(Float, default=0.0, nullable=False)
+    
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<ReadingDailyStat(user_id={self.user_id}, day={self.day}, sessions={self.sessions})>"
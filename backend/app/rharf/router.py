@@ -1,11 +1,12 @@
 """
 Russian Letters Learning Router
 """
-from fastapi import APIRouter, HTTPException, Response, UploadFile, File
+from fastapi import APIRouter, HTTPException, Request, Response, UploadFile, File
 from pydantic import BaseModel
 import os
-import requests
 from app.core.config import settings
+from app.services.speech_service import speech_service
+from app.services.letter_audio import letter_audio_bundle
 
 router = APIRouter()
 
@@ -35,51 +36,46 @@ async def text_to_speech_options():
     """Handle CORS preflight for text-to-speech"""
     return Response(status_code=200)
 
-@router.post("/text-to-speech")
-async def text_to_speech(request: TextToSpeechRequest):
-    """Convert Russian text to speech"""
-    if not request.text:
+def build_tts_ssml(text: str, language: str = "ru-RU") -> str:
+    """SSML sent to Azure (also used to render the letter audio bundle)"""
+    return speech_service.build_ssml(
+        normalize_russian(text), "ru-RU", "ru-RU-DariyaNeural", rate="-20%"
+    )
+
+async def _speak(text: str, http_request: Request) -> Response:
+    if not text:
         raise HTTPException(status_code=400, detail="Текст не введен.")
     
-    norm_text = normalize_russian(request.text)
+    ssml = build_tts_ssml(text)
+    
+    # Pre-rendered letters are served from the bundle (ETag + Range)
+    bundled = letter_audio_bundle.response(ssml, http_request)
+    if bundled is not None:
+        return bundled
     
     # Configure Azure Speech
     speech_key = settings.AZURE_SPEECH_KEY
-    speech_region = settings.AZURE_SPEECH_REGION
     
     if not speech_key:
         raise HTTPException(status_code=501, detail="Azure Speech key not configured")
     
-    # Use REST API instead of SDK
-    from xml.sax.saxutils import escape
-    escaped = escape(norm_text)
-    ssml = f"""<speak version='1.0' xml:lang='ru-RU'>
-        <voice name='ru-RU-DariyaNeural'>
-            <prosody rate='-20%'>{escaped}</prosody>
-        </voice>
-    </speak>"""
-    
     try:
-        # Get token
-        token_url = f"https://{speech_region}.api.cognitive.microsoft.com/sts/v1.0/issueToken"
-        token_resp = requests.post(token_url, headers={"Ocp-Apim-Subscription-Key": speech_key})
-        token_resp.raise_for_status()
-        token = token_resp.text
-        
-        # TTS
-        tts_url = f"https://{speech_region}.tts.speech.microsoft.com/cognitiveservices/v1"
-        tts_resp = requests.post(tts_url, headers={
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/ssml+xml",
-            "X-Microsoft-OutputFormat": "audio-16khz-128kbitrate-mono-mp3",
-            "User-Agent": "Alif24-Backend"
-        }, data=ssml.encode('utf-8'))
-        tts_resp.raise_for_status()
-        
-        return Response(content=tts_resp.content, media_type="audio/mpeg")
+        # Use REST API instead of SDK (cached token and audio)
+        audio = await speech_service.synthesize(ssml)
+        return Response(content=audio, media_type="audio/mpeg")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"TTS error: {str(e)}")
 
+@router.post("/text-to-speech")
+async def text_to_speech(request: TextToSpeechRequest, http_request: Request):
+    """Convert Russian text to speech"""
+    return await _speak(request.text, http_request)
+
+@router.get("/text-to-speech")
+async def text_to_speech_get(http_request: Request, text: str = ""):
+    """Same as POST, but cacheable by the browser/CDN (ETag, Range)"""
+    return await _speak(text, http_request)
+
 @router.get("/")
 async def rharf_home():
     """Russian harf module home"""
@@ -1,59 +1,139 @@
 import hashlib
 import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
+from app.core.cache import TTLCache, SingleFlight
 from app.models.ai_cache import AICache
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Awaitable
+
+logger = logging.getLogger(__name__)
+
 
 class AICacheService:
+    """
+    Two-tier cache for AI responses:
+    1. In-process LRU with TTL (no I/O)
+    2. ai_cache table (shared between workers), same TTL
+    Concurrent misses for the same prompt are coalesced into one upstream call.
+    """
+
+    TTL_SECONDS = int(os.getenv("AI_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+    MEMORY_MAXSIZE = int(os.getenv("AI_CACHE_MEMORY_SIZE", 2048))
+
+    _memory = TTLCache(maxsize=MEMORY_MAXSIZE, ttl=TTL_SECONDS)
+    _flight = SingleFlight()
+    _db_hits = 0
+    _db_misses = 0
+
     @staticmethod
     def generate_hash(prompt: str, context: str = "", model: str = "gpt-4") -> str:
         """Generate SHA256 hash for the prompt configuration"""
         content = f"{model}:{prompt}:{context}"
         return hashlib.sha256(content.encode()).hexdigest()
 
-    @staticmethod
-    def get_cached_response(db: Session, prompt_hash: str) -> Optional[Dict[str, Any]]:
-        """Retrieve cached response if exists"""
-        cache_entry = db.query(AICache).filter(AICache.prompt_hash == prompt_hash).first()
-        if cache_entry:
-            try:
-                return json.loads(cache_entry.response_json)
-            except json.JSONDecodeError:
+    @classmethod
+    def _expiry_cutoff(cls) -> datetime:
+        return datetime.now(timezone.utc) - timedelta(seconds=cls.TTL_SECONDS)
+
+    @classmethod
+    def get_cached_response(cls, db: Session, prompt_hash: str) -> Optional[Dict[str, Any]]:
+        """Retrieve cached response if exists and not expired"""
+        response_str = cls._memory.get(prompt_hash)
+
+        if response_str is None:
+            cache_entry = db.query(AICache.response_json).filter(
+                AICache.prompt_hash == prompt_hash,
+                func.coalesce(AICache.updated_at, AICache.created_at) >= cls._expiry_cutoff()
+            ).first()
+            if not cache_entry:
+                cls._db_misses += 1
                 return None
-        return None
+            cls._db_hits += 1
+            response_str = cache_entry.response_json
+            cls._memory.set(prompt_hash, response_str)
 
-    @staticmethod
+        try:
+            return json.loads(response_str)
+        except json.JSONDecodeError:
+            return None
+
+    @classmethod
     def set_cached_response(
-        db: Session, 
-        prompt_hash: str, 
-        response_data: Dict[str, Any], 
-        prompt_text: str = "", 
+        cls,
+        db: Session,
+        prompt_hash: str,
+        response_data: Dict[str, Any],
+        prompt_text: str = "",
         model: str = "gpt-4",
         tokens: int = 0
     ):
         """Save response to cache"""
         # Save as string
         response_str = json.dumps(response_data)
-        
-        # Check if exists (upsert logic if needed, but hash should be unique)
-        existing = db.query(AICache).filter(AICache.prompt_hash == prompt_hash).first()
-        
-        if existing:
-            existing.response_json = response_str
-            existing.updated_at = func.now()
-        else:
-            new_cache = AICache(
-                prompt_hash=prompt_hash,
-                prompt_text=prompt_text[:1000] if prompt_text else "", # Truncate for storage
-                response_json=response_str,
-                model_name=model,
-                tokens_used=tokens
-            )
-            db.add(new_cache)
-        
+        cls._memory.set(prompt_hash, response_str)
+
+        # Upsert without a prior SELECT: UPDATE first, INSERT if nothing matched
         try:
+            updated = db.query(AICache).filter(AICache.prompt_hash == prompt_hash).update(
+                {"response_json": response_str, "updated_at": func.now()},
+                synchronize_session=False
+            )
+            if not updated:
+                db.add(AICache(
+                    prompt_hash=prompt_hash,
+                    prompt_text=prompt_text[:1000] if prompt_text else "", # Truncate for storage
+                    response_json=response_str,
+                    model_name=model,
+                    tokens_used=tokens
+                ))
             db.commit()
         except Exception as e:
             db.rollback()
-            print(f"Cache Save Error: {e}")
+            logger.warning(f"Cache Save Error: {e}")
+
+    @classmethod
+    async def get_or_generate(
+        cls,
+        db: Session,
+        prompt_hash: str,
+        generate: Callable[[], Awaitable[Dict[str, Any]]],
+        prompt_text: str = "",
+        model: str = "gpt-4"
+    ) -> Dict[str, Any]:
+        """
+        Return cached response, or run generate() once for all concurrent
+        callers with the same hash and cache its result.
+        """
+        cached = cls.get_cached_response(db, prompt_hash)
+        if cached is not None:
+            return cached
+
+        async def produce():
+            result = await generate()
+            cls.set_cached_response(db, prompt_hash, result, prompt_text=prompt_text, model=model)
+            return result
+
+        return await cls._flight.do(prompt_hash, produce)
+
+    @classmethod
+    def purge_expired(cls, db: Session) -> int:
+        """Delete expired rows from the DB tier"""
+        deleted = db.query(AICache).filter(
+            func.coalesce(AICache.updated_at, AICache.created_at) < cls._expiry_cutoff()
+        ).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """Hit/miss/eviction counters for monitoring"""
+        return {
+            "memory": cls._memory.stats(),
+            "db_hits": cls._db_hits,
+            "db_misses": cls._db_misses,
+            "coalesced": cls._flight.coalesced,
+            "ttl_seconds": cls.TTL_SECONDS
+        }
@@ -0,0 +1,146 @@
+"""
+Azure OpenAI Gateway - shared async client for all AI routers
+
+One AsyncAzureOpenAI client per worker process with:
+- pooled keep-alive HTTP connections
+- per-deployment concurrency limit
+- request timeout
+- retry with exponential backoff and full jitter (429, 5xx, timeouts)
+
+Completions are awaited, so a slow call no longer blocks the event loop.
+"""
+
+import asyncio
+import logging
+import os
+import random
+from typing import Any, Dict, List, Optional
+
+import httpx
+from openai import (
+    AsyncAzureOpenAI,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+
+class AzureOpenAIGateway:
+    """Shared, rate-limited Azure OpenAI chat completion client."""
+
+    MAX_CONCURRENCY = int(os.getenv("AZURE_OPENAI_MAX_CONCURRENCY", 16))  # per deployment
+    TIMEOUT = float(os.getenv("AZURE_OPENAI_TIMEOUT", 60))  # seconds
+    MAX_RETRIES = 3
+    BACKOFF_BASE = 0.5  # seconds
+    BACKOFF_MAX = 8.0
+
+    def __init__(self):
+        self._client: Optional[AsyncAzureOpenAI] = None
+        self._limiters: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def default_model(self) -> str:
+        return os.getenv("AZURE_OPENAI_MODEL", settings.AZURE_OPENAI_DEPLOYMENT_NAME)
+
+    @property
+    def client(self) -> AsyncAzureOpenAI:
+        """Lazily created client (settings may be patched before first use)."""
+        if self._client is None:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.MAX_CONCURRENCY * 2,
+                    max_keepalive_connections=self.MAX_CONCURRENCY
+                ),
+                timeout=self.TIMEOUT
+            )
+            self._client = AsyncAzureOpenAI(
+                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT", settings.AZURE_OPENAI_ENDPOINT),
+                api_key=os.getenv("AZURE_OPENAI_KEY", settings.AZURE_OPENAI_KEY),
+                api_version=os.getenv("AZURE_OPENAI_API_VERSION", settings.AZURE_OPENAI_API_VERSION),
+                timeout=self.TIMEOUT,
+                max_retries=0,  # Retries are handled here, with jitter
+                http_client=http_client
+            )
+        return self._client
+
+    def _limiter(self, deployment: str) -> asyncio.Semaphore:
+        limiter = self._limiters.get(deployment)
+        if limiter is None:
+            limiter = self._limiters[deployment] = asyncio.Semaphore(self.MAX_CONCURRENCY)
+        return limiter
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Retry-After from the server if present, else full-jitter exponential backoff."""
+        response = getattr(error, "response", None)
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.BACKOFF_MAX)
+                except ValueError:
+                    pass
+        return random.uniform(0, min(self.BACKOFF_MAX, self.BACKOFF_BASE * (2 ** attempt)))
+
+    async def chat(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str] = None,
+        api_key: Optional[str] = None,
+        **kwargs
+    ):
+        """
+        Create a chat completion.
+
+        Args:
+            messages: Chat messages
+            model: Deployment name (defaults to AZURE_OPENAI_DEPLOYMENT_NAME)
+            api_key: Optional per-call key; reuses the same connection pool
+            **kwargs: Passed through to chat.completions.create
+
+        Returns:
+            ChatCompletion response
+        """
+        deployment = model or self.default_model
+        client = self.client
+        if api_key and api_key != client.api_key:
+            client = client.with_options(api_key=api_key)
+
+        async with self._limiter(deployment):
+            for attempt in range(self.MAX_RETRIES + 1):
+                try:
+                    return await client.chat.completions.create(
+                        model=deployment,
+                        messages=messages,
+                        **kwargs
+                    )
+                except RETRYABLE_ERRORS as e:
+                    if attempt == self.MAX_RETRIES:
+                        raise
+                    delay = self._backoff(attempt, e)
+                    logger.warning(
+                        f"Azure OpenAI {type(e).__name__} on {deployment}, "
+                        f"retry {attempt + 1}/{self.MAX_RETRIES} in {delay:.2f}s"
+                    )
+                    await asyncio.sleep(delay)
+
+    async def complete(self, messages: List[Dict[str, Any]], **kwargs) -> str:
+        """Chat completion returning the stripped message text."""
+        response = await self.chat(messages, **kwargs)
+        return (response.choices[0].message.content or "").strip()
+
+    async def close(self):
+        """Close pooled connections (app shutdown)."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+# Global gateway instance (one per worker process)
+ai_gateway = AzureOpenAIGateway()
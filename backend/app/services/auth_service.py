@@ -6,7 +6,7 @@ from app.models.rbac_models import (
     StudentProfile, TeacherProfile, ParentProfile, AccountStatus
 )
 from app.repositories.user_repository import UserRepository
-from app.middleware.auth import create_access_token, create_refresh_token, verify_token
+from app.middleware.auth import create_access_token, create_refresh_token, verify_token, invalidate_principal
 from app.core.errors import ConflictError, UnauthorizedError, NotFoundError, BadRequestError
 from app.core.config import settings
 from app.core.logging import logger
@@ -168,6 +168,7 @@ class AuthService:
         if user:
             user.refresh_token = None
             self.db.commit()
+        invalidate_principal(user_id)
     
     async def change_password(self, user_id: str, current_password: str, new_password: str):
         """Change password"""
@@ -0,0 +1,280 @@
+"""
+Coin Ledger - the single place where coin balances change
+
+Every balance change is an atomic SQL increment
+(SET current_balance = current_balance + :n ... RETURNING), never a
+read-modify-write in Python, so concurrent awards cannot overwrite each
+other.
+
+Credits are idempotent: a credit with a reference (reference_type +
+reference_id, e.g. "lesson" + lesson id) is recorded at most once per
+student, enforced by the uq_coin_transactions_credit_reference index.
+Repeating the same award is a no-op. Credits refuse to run (503) on a
+database without that index instead of failing inside ON CONFLICT.
+
+award_many() pays any number of students in three statements:
+ensure balances exist (upsert), insert the transactions (ON CONFLICT DO
+NOTHING), increment the balances of the rows actually inserted.
+refund() gives back coins taken by debit() the same way.
+
+The caller owns the transaction (commit/rollback).
+"""
+
+import logging
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+from weakref import WeakSet
+
+from sqlalchemy import case, func, inspect, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.errors import ServiceUnavailableError
+from app.models import StudentCoin, CoinTransaction, TransactionType
+
+logger = logging.getLogger(__name__)
+
+CREDIT_INDEX = "uq_coin_transactions_credit_reference"
+
+# Engines on which the credit index has been seen (checked once per worker)
+_indexed_engines = WeakSet()
+
+
+@dataclass
+class CoinAward:
+    student_id: UUID  # StudentProfile.id
+    amount: int
+    type: TransactionType
+    description: str
+    reference_id: Optional[UUID] = None
+    reference_type: Optional[str] = None
+
+
+class CoinLedger:
+    """Atomic, idempotent coin credits and debits for one DB session."""
+
+    CHUNK_SIZE = 1000  # rows per multi-VALUES statement
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ------------------------------------------------------------------
+    # Credits
+    # ------------------------------------------------------------------
+
+    def award(
+        self,
+        student_id: UUID,
+        amount: int,
+        transaction_type: TransactionType,
+        description: str,
+        reference_id: Optional[UUID] = None,
+        reference_type: Optional[str] = None
+    ) -> Optional[int]:
+        """Credit one student. Returns the new balance, or None if already awarded."""
+        balances = self.award_many([CoinAward(
+            student_id=student_id,
+            amount=amount,
+            type=transaction_type,
+            description=description,
+            reference_id=reference_id,
+            reference_type=reference_type
+        )])
+        return balances.get(student_id)
+
+    def award_many(self, awards: Iterable[CoinAward]) -> Dict[UUID, int]:
+        """
+        Credit many students at once.
+        Returns {student_id: new balance} for students whose balance changed;
+        awards already recorded for the same reference are skipped.
+        """
+        awards = [a for a in awards if a.amount > 0]
+        if not awards:
+            return {}
+
+        self._require_credit_index()
+        coin_ids = self._ensure_balances({a.student_id for a in awards})
+
+        deltas: Dict[UUID, int] = {}
+        for chunk in self._chunks(awards):
+            insert_stmt = self._insert_credits([
+                {
+                    "id": uuid.uuid4(),
+                    "student_coin_id": coin_ids[a.student_id],
+                    "type": a.type,
+                    "amount": a.amount,
+                    "description": a.description,
+                    "reference_id": a.reference_id,
+                    "reference_type": a.reference_type
+                }
+                for a in chunk
+            ])
+
+            for row in self.db.execute(insert_stmt):
+                deltas[row.student_coin_id] = deltas.get(row.student_coin_id, 0) + row.amount
+
+        if not deltas:
+            return {}
+
+        delta = case(deltas, value=StudentCoin.id)
+        rows = self.db.execute(
+            update(StudentCoin)
+            .where(StudentCoin.id.in_(list(deltas)))
+            .values(
+                total_earned=StudentCoin.total_earned + delta,
+                current_balance=StudentCoin.current_balance + delta,
+                updated_at=func.now()
+            )
+            .returning(StudentCoin.student_id, StudentCoin.current_balance),
+            execution_options={"synchronize_session": False}
+        )
+        return {row.student_id: row.current_balance for row in rows}
+
+    # ------------------------------------------------------------------
+    # Debits
+    # ------------------------------------------------------------------
+
+    def debit(
+        self,
+        student_id: UUID,
+        amount: int,
+        transaction_type: TransactionType,
+        description: str,
+        counter: str = "total_spent",
+        reference_id: Optional[UUID] = None,
+        reference_type: Optional[str] = None
+    ) -> Optional[int]:
+        """
+        Take coins if the balance covers them (checked in the UPDATE itself).
+        counter is the running total to increase: "total_spent" or "total_withdrawn".
+        Returns the new balance, or None if the balance is insufficient.
+        """
+        coin_id = self._ensure_balances({student_id})[student_id]
+        column = getattr(StudentCoin, counter)
+
+        new_balance = self.db.execute(
+            update(StudentCoin)
+            .where(StudentCoin.id == coin_id, StudentCoin.current_balance >= amount)
+            .values({
+                StudentCoin.current_balance: StudentCoin.current_balance - amount,
+                column: column + amount,
+                StudentCoin.updated_at: func.now()
+            })
+            .returning(StudentCoin.current_balance),
+            execution_options={"synchronize_session": False}
+        ).scalar()
+
+        if new_balance is None:
+            return None
+
+        self.db.add(CoinTransaction(
+            student_coin_id=coin_id,
+            type=transaction_type,
+            amount=-amount,
+            description=description,
+            reference_id=reference_id,
+            reference_type=reference_type
+        ))
+        return new_balance
+
+    def refund(
+        self,
+        student_id: UUID,
+        amount: int,
+        transaction_type: TransactionType,
+        description: str,
+        counter: str = "total_withdrawn",
+        reference_id: Optional[UUID] = None,
+        reference_type: Optional[str] = None
+    ) -> Optional[int]:
+        """
+        Give back coins taken by debit() and lower the running total it raised.
+        Like credits, a refund with a reference is recorded at most once.
+        Returns the new balance, or None if already refunded.
+        """
+        self._require_credit_index()
+        coin_id = self._ensure_balances({student_id})[student_id]
+        inserted = self.db.execute(self._insert_credits([{
+            "id": uuid.uuid4(),
+            "student_coin_id": coin_id,
+            "type": transaction_type,
+            "amount": amount,
+            "description": description,
+            "reference_id": reference_id,
+            "reference_type": reference_type
+        }])).first()
+        if inserted is None:
+            return None
+
+        column = getattr(StudentCoin, counter)
+        return self.db.execute(
+            update(StudentCoin)
+            .where(StudentCoin.id == coin_id)
+            .values({
+                StudentCoin.current_balance: StudentCoin.current_balance + amount,
+                column: column - amount,
+                StudentCoin.updated_at: func.now()
+            })
+            .returning(StudentCoin.current_balance),
+            execution_options={"synchronize_session": False}
+        ).scalar()
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def balance_id(self, student_id: UUID) -> UUID:
+        """StudentCoin.id for this student, creating the balance if needed."""
+        return self._ensure_balances({student_id})[student_id]
+
+    def _ensure_balances(self, student_ids: Iterable[UUID]) -> Dict[UUID, UUID]:
+        """StudentCoin.id per student, creating missing balances in the same statement."""
+        coin_ids: Dict[UUID, UUID] = {}
+        # Sorted so concurrent batches lock balance rows in the same order
+        ordered = sorted(student_ids, key=str)
+        for chunk in self._chunks(ordered):
+            upsert = self._insert(StudentCoin).values([
+                {
+                    "id": uuid.uuid4(),
+                    "student_id": student_id,
+                    "total_earned": 0,
+                    "total_spent": 0,
+                    "total_withdrawn": 0,
+                    "current_balance": 0
+                }
+                for student_id in chunk
+            ])
+            # No-op update so existing rows are returned too
+            upsert = upsert.on_conflict_do_update(
+                index_elements=[StudentCoin.student_id],
+                set_={"student_id": upsert.excluded.student_id}
+            ).returning(StudentCoin.id, StudentCoin.student_id)
+            coin_ids.update({row.student_id: row.id for row in self.db.execute(upsert)})
+        return coin_ids
+
+    def _require_credit_index(self):
+        """ON CONFLICT in _insert_credits needs the partial unique index."""
+        connection = self.db.connection()  # the session's own, not a second checkout
+        if connection.engine in _indexed_engines:
+            return
+        if CREDIT_INDEX not in {i["name"] for i in inspect(connection).get_indexes("coin_transactions")}:
+            logger.error(f"{CREDIT_INDEX} is missing; coin credits are disabled until it is created")
+            raise ServiceUnavailableError("Tangalar hisobi vaqtincha ishlamayapti")
+        _indexed_engines.add(connection.engine)
+
+    def _insert_credits(self, rows: List[Dict]):
+        """INSERT credit transactions, skipping references already credited."""
+        return self._insert(CoinTransaction).values(rows).on_conflict_do_nothing(
+            index_elements=["student_coin_id", "reference_type", "reference_id"],
+            index_where=(CoinTransaction.amount > 0) & CoinTransaction.reference_id.isnot(None)
+        ).returning(CoinTransaction.student_coin_id, CoinTransaction.amount)
+
+    def _insert(self, model):
+        dialect = self.db.get_bind().dialect.name
+        return (postgresql.insert if dialect == "postgresql" else sqlite.insert)(model)
+
+    def _chunks(self, items: List) -> Iterable[List]:
+        for i in range(0, len(items), self.CHUNK_SIZE):
+            yield items[i:i + self.CHUNK_SIZE]
@@ -4,11 +4,11 @@ Coin Service - Business logic for Coin system
 Coins can be earned through lessons, games, quizzes, and olympiads.
 Coins can be converted to real money or redeemed for prizes.
 """
-from typing import Optional, List, Dict
-from uuid import UUID
+from typing import Optional, List, Dict, TYPE_CHECKING
+from uuid import UUID, NAMESPACE_URL, uuid5
 from datetime import datetime
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
 
 from app.core.errors import BadRequestError, NotFoundError, ForbiddenError
 from app.models import (
@@ -16,6 +16,10 @@ from app.models import (
     StudentCoin, CoinTransaction, CoinWithdrawal, Prize, PrizeRedemption,
     TransactionType, WithdrawalStatus, PrizeCategory
 )
+from app.services.coin_ledger import CoinLedger
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class CoinService:
@@ -26,6 +30,7 @@ class CoinService:
     
     def __init__(self, db: Session):
         self.db = db
+        self.ledger = CoinLedger(db)
     
     # ============================================================
     # COIN BALANCE
@@ -91,8 +96,13 @@ class CoinService:
             "game"
         )
     
-    def add_coins_for_quiz(self, student_id: UUID, correct_count: int) -> Dict:
-        """Award coins for quiz. +2 coins per correct answer."""
+    def add_coins_for_quiz(
+        self,
+        student_id: UUID,
+        correct_count: int,
+        quiz_id: Optional[UUID] = None
+    ) -> Dict:
+        """Award coins for quiz. +2 coins per correct answer (once per quiz if quiz_id given)."""
         amount = correct_count * 2
         if amount == 0:
             return {"coins_earned": 0, "message": "To'g'ri javob yo'q"}
@@ -101,32 +111,27 @@ class CoinService:
             student_id, 
             amount, 
             TransactionType.quiz_correct,
-            f"{correct_count} ta to'g'ri javob uchun"
+            f"{correct_count} ta to'g'ri javob uchun",
+            quiz_id,
+            "quiz" if quiz_id else None
         )
     
     def add_daily_bonus(self, student_id: UUID) -> Dict:
         """Award daily login bonus. +5 coins."""
-        # Check if already received today
-        coin_balance = self._get_or_create_balance(student_id)
+        # One bonus per day: the date is the idempotency reference
         today = datetime.utcnow().date()
-        
-        existing = self.db.query(CoinTransaction).filter(
-            and_(
-                CoinTransaction.student_coin_id == coin_balance.id,
-                CoinTransaction.type == TransactionType.daily_bonus,
-                CoinTransaction.created_at >= datetime.combine(today, datetime.min.time())
-            )
-        ).first()
-        
-        if existing:
-            return {"coins_earned": 0, "message": "Bugun bonus allaqachon olingan"}
-        
-        return self._add_coins(
+        result = self._add_coins(
             student_id, 
             5, 
             TransactionType.daily_bonus,
-            "Kunlik bonus"
+            "Kunlik bonus",
+            uuid5(NAMESPACE_URL, f"daily_bonus:{today.isoformat()}"),
+            "daily_bonus"
         )
+        
+        if result["coins_earned"] == 0:
+            return {"coins_earned": 0, "message": "Bugun bonus allaqachon olingan"}
+        return result
     
     # ============================================================
     # WITHDRAWAL (COIN TO MONEY)
@@ -147,17 +152,25 @@ class CoinService:
         if coin_amount < self.MIN_WITHDRAWAL:
             raise BadRequestError(f"Minimal yechib olish: {self.MIN_WITHDRAWAL} coin")
         
-        coin_balance = self._get_or_create_balance(student_id)
-        
-        if coin_balance.current_balance < coin_amount:
-            raise BadRequestError("Yetarli coin mavjud emas")
+        student_profile_id = self._get_student_profile_id(student_id)
         
         # Calculate money
         money_amount = coin_amount * self.COIN_TO_UZS_RATE
         
+        # Deduct coins (balance checked atomically)
+        new_balance = self.ledger.debit(
+            student_profile_id,
+            coin_amount,
+            TransactionType.withdrawal,
+            f"Pul yechib olish so'rovi: {money_amount} so'm",
+            counter="total_withdrawn"
+        )
+        if new_balance is None:
+            raise BadRequestError("Yetarli coin mavjud emas")
+        
         # Create withdrawal request
         withdrawal = CoinWithdrawal(
-            student_coin_id=coin_balance.id,
+            student_coin_id=self.ledger.balance_id(student_profile_id),
             coin_amount=coin_amount,
             money_amount=money_amount,
             parent_id=parent_id,
@@ -166,20 +179,7 @@ class CoinService:
             status=WithdrawalStatus.pending
         )
         
-        # Deduct coins
-        coin_balance.current_balance -= coin_amount
-        coin_balance.total_withdrawn += coin_amount
-        
-        # Record transaction
-        transaction = CoinTransaction(
-            student_coin_id=coin_balance.id,
-            type=TransactionType.withdrawal,
-            amount=-coin_amount,
-            description=f"Pul yechib olish so'rovi: {money_amount} so'm"
-        )
-        
         self.db.add(withdrawal)
-        self.db.add(transaction)
         self.db.commit()
         
         return {
@@ -244,7 +244,7 @@ class CoinService:
         delivery_address: Optional[str] = None
     ) -> Dict:
         """Redeem a prize with coins."""
-        coin_balance = self._get_or_create_balance(student_id)
+        student_profile_id = self._get_student_profile_id(student_id)
         
         prize = self.db.query(Prize).filter(Prize.id == prize_id).first()
         if not prize:
@@ -256,40 +256,34 @@ class CoinService:
         if prize.stock_quantity <= 0:
             raise BadRequestError("Bu yutiq tugagan")
         
-        if coin_balance.current_balance < prize.coin_price:
-            raise BadRequestError("Yetarli coin mavjud emas")
-        
         # Check delivery address for physical prizes
         if not prize.is_digital and not delivery_address:
             raise BadRequestError("Jismoniy yutuqlar uchun manzil kerak")
         
-        # Deduct coins
-        coin_balance.current_balance -= prize.coin_price
-        coin_balance.total_spent += prize.coin_price
+        # Deduct coins (balance checked atomically)
+        remaining_balance = self.ledger.debit(
+            student_profile_id,
+            prize.coin_price,
+            TransactionType.prize_redemption,
+            f"Yutiq: {prize.name}",
+            reference_id=prize_id,
+            reference_type="prize"
+        )
+        if remaining_balance is None:
+            raise BadRequestError("Yetarli coin mavjud emas")
         
         # Reduce stock
-        prize.stock_quantity -= 1
+        prize.stock_quantity = Prize.stock_quantity - 1
         
         # Create redemption
         redemption = PrizeRedemption(
-            student_coin_id=coin_balance.id,
+            student_coin_id=self.ledger.balance_id(student_profile_id),
             prize_id=prize_id,
             coin_spent=prize.coin_price,
             delivery_address=delivery_address
         )
         
-        # Record transaction
-        transaction = CoinTransaction(
-            student_coin_id=coin_balance.id,
-            type=TransactionType.prize_redemption,
-            amount=-prize.coin_price,
-            description=f"Yutiq: {prize.name}",
-            reference_id=prize_id,
-            reference_type="prize"
-        )
-        
         self.db.add(redemption)
-        self.db.add(transaction)
         self.db.commit()
         
         return {
@@ -297,7 +291,7 @@ class CoinService:
             "prize_name": prize.name,
             "coins_spent": prize.coin_price,
             "is_digital": prize.is_digital,
-            "remaining_balance": coin_balance.current_balance
+            "remaining_balance": remaining_balance
         }
     
     def get_redemption_history(self, student_id: UUID) -> List[Dict]:
@@ -347,19 +341,16 @@ class CoinService:
             withdrawal.status = WithdrawalStatus.rejected
             withdrawal.rejection_reason = rejection_reason
             
-            # Refund coins
-            coin_balance = withdrawal.student_coin
-            coin_balance.current_balance += withdrawal.coin_amount
-            coin_balance.total_withdrawn -= withdrawal.coin_amount
-            
-            # Record refund transaction
-            transaction = CoinTransaction(
-                student_coin_id=coin_balance.id,
-                type=TransactionType.admin_adjustment,
-                amount=withdrawal.coin_amount,
-                description=f"Yechib olish rad etildi: {rejection_reason}"
+            # Refund coins (once per withdrawal)
+            CoinLedger(self.db).refund(
+                withdrawal.student_coin.student_id,
+                withdrawal.coin_amount,
+                TransactionType.admin_adjustment,
+                f"Yechib olish rad etildi: {rejection_reason}",
+                counter="total_withdrawn",
+                reference_id=withdrawal.id,
+                reference_type="withdrawal_refund"
             )
-            self.db.add(transaction)
         
         withdrawal.processed_by = admin_user_id
         withdrawal.processed_at = datetime.utcnow()
@@ -406,22 +397,27 @@ class CoinService:
     # HELPER METHODS
     # ============================================================
     
-    def _get_or_create_balance(self, student_id: UUID) -> StudentCoin:
-        """Get or create coin balance for student."""
-        # First find the student profile
-        student_profile = self.db.query(StudentProfile).filter(
+    def _get_student_profile_id(self, student_id: UUID) -> UUID:
+        """StudentProfile.id for a student user ID."""
+        student_profile_id = self.db.query(StudentProfile.id).filter(
             StudentProfile.user_id == student_id
-        ).first()
+        ).scalar()
         
-        if not student_profile:
+        if not student_profile_id:
             raise NotFoundError("O'quvchi profili topilmadi")
         
+        return student_profile_id
+    
+    def _get_or_create_balance(self, student_id: UUID) -> StudentCoin:
+        """Get or create coin balance for student."""
+        student_profile_id = self._get_student_profile_id(student_id)
+        
         coin_balance = self.db.query(StudentCoin).filter(
-            StudentCoin.student_id == student_profile.id
+            StudentCoin.student_id == student_profile_id
         ).first()
         
         if not coin_balance:
-            coin_balance = StudentCoin(student_id=student_profile.id)
+            coin_balance = StudentCoin(student_id=student_profile_id)
             self.db.add(coin_balance)
             self.db.commit()
             self.db.refresh(coin_balance)
@@ -437,26 +433,85 @@ class CoinService:
         reference_id: Optional[UUID] = None,
         reference_type: Optional[str] = None
     ) -> Dict:
-        """Add coins and record transaction."""
-        coin_balance = self._get_or_create_balance(student_id)
-        
-        coin_balance.total_earned += amount
-        coin_balance.current_balance += amount
-        
-        transaction = CoinTransaction(
-            student_coin_id=coin_balance.id,
-            type=transaction_type,
-            amount=amount,
-            description=description,
-            reference_id=reference_id,
-            reference_type=reference_type
+        """Add coins and record transaction (no-op if this reference was already paid)."""
+        new_balance = self.ledger.award(
+            self._get_student_profile_id(student_id),
+            amount,
+            transaction_type,
+            description,
+            reference_id,
+            reference_type
         )
-        
-        self.db.add(transaction)
         self.db.commit()
         
+        if new_balance is None:
+            return {"coins_earned": 0, "message": "Mukofot allaqachon berilgan"}
+        
         return {
             "coins_earned": amount,
-            "new_balance": coin_balance.current_balance,
+            "new_balance": new_balance,
             "message": f"+{amount} coin qo'shildi!"
         }
+
+
+class AsyncCoinService:
+    """Read-only coin queries on an AsyncSession (balance and history pages)."""
+    
+    def __init__(self, db: "AsyncSession"):
+        self.db = db
+    
+    async def get_balance(self, student_id: UUID) -> Dict:
+        """Get student's coin balance (zeros until the first coin is earned)."""
+        row = (await self.db.execute(
+            select(StudentProfile.id, StudentCoin)
+            .outerjoin(StudentCoin, StudentCoin.student_id == StudentProfile.id)
+            .where(StudentProfile.user_id == student_id)
+        )).first()
+        
+        if row is None:
+            raise NotFoundError("O'quvchi profili topilmadi")
+        
+        coin_balance = row.StudentCoin
+        if coin_balance is None:
+            return {
+                "current_balance": 0,
+                "total_earned": 0,
+                "total_spent": 0,
+                "total_withdrawn": 0,
+                "money_equivalent_uzs": 0
+            }
+        
+        return {
+            "current_balance": coin_balance.current_balance,
+            "total_earned": coin_balance.total_earned,
+            "total_spent": coin_balance.total_spent,
+            "total_withdrawn": coin_balance.total_withdrawn,
+            "money_equivalent_uzs": coin_balance.current_balance * CoinService.COIN_TO_UZS_RATE
+        }
+    
+    async def get_transactions(self, student_id: UUID, limit: int = 50) -> List[Dict]:
+        """Get transaction history."""
+        student_profile_id = await self.db.scalar(
+            select(StudentProfile.id).where(StudentProfile.user_id == student_id)
+        )
+        if not student_profile_id:
+            raise NotFoundError("O'quvchi profili topilmadi")
+        
+        transactions = (await self.db.scalars(
+            select(CoinTransaction)
+            .join(StudentCoin, CoinTransaction.student_coin_id == StudentCoin.id)
+            .where(StudentCoin.student_id == student_profile_id)
+            .order_by(CoinTransaction.created_at.desc())
+            .limit(limit)
+        )).all()
+        
+        return [
+            {
+                "id": str(t.id),
+                "type": t.type.value,
+                "amount": t.amount,
+                "description": t.description,
+                "created_at": t.created_at.isoformat()
+            }
+            for t in transactions
+        ]
@@ -0,0 +1,136 @@
+"""
+Dashboard Service - per-student dashboard read model
+
+The student dashboard (profile stats, reading aggregates, pending
+lessons) is the first screen every student opens. It is built with one
+statement: the reading totals row (from the daily rollup), outer-joined
+to the student's profile and to up to TASKS_LIMIT unfinished lessons
+from Progress, so 1-3 rows come back in a single round trip.
+
+Summaries are cached per user for a short TTL and dropped when their
+inputs change:
+- StudentProfile updates and new ReadingAnalysis rows (after_flush)
+- lesson progress (StudentService.complete_lesson -> invalidate_dashboard)
+"""
+
+import os
+from typing import Any, Dict, List, TYPE_CHECKING
+from uuid import UUID
+
+from sqlalchemy import event, func, select, true
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.models import Lesson, Progress, ProgressStatus, ReadingAnalysis, StudentProfile
+from app.services.reading_stats_service import ReadingStatsService
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+DASHBOARD_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", 60))
+TASKS_LIMIT = 3
+
+# Global dashboard cache (one per worker process)
+dashboard_cache = TTLCache(maxsize=10000, ttl=DASHBOARD_TTL)
+
+
+def invalidate_dashboard(user_id: UUID):
+    dashboard_cache.delete(str(user_id))
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed_dashboards(session, flush_context):
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, (StudentProfile, ReadingAnalysis)):
+            invalidate_dashboard(obj.user_id)
+
+
+class DashboardService:
+    """Student dashboard summary on an AsyncSession."""
+
+    def __init__(self, db: "AsyncSession"):
+        self.db = db
+
+    async def get_student_summary(self, user_id: UUID) -> Dict[str, Any]:
+        """Profile stats, reading stats and pending lessons (cached)."""
+        summary = dashboard_cache.get(str(user_id))
+        if summary is None:
+            rows = (await self.db.execute(self.summary_query(user_id))).all()
+            summary = self.summarize(rows)
+            dashboard_cache.set(str(user_id), summary)
+        return summary
+
+    @staticmethod
+    def summary_query(user_id: UUID):
+        reading = ReadingStatsService.totals_query(user_id).subquery("reading")
+
+        profile = select(
+            StudentProfile.level,
+            StudentProfile.total_points,
+            StudentProfile.total_coins,
+            StudentProfile.current_streak
+        ).where(
+            StudentProfile.user_id == user_id
+        ).limit(1).subquery("profile")
+
+        tasks = select(
+            Lesson.id.label("lesson_id"),
+            func.coalesce(Lesson.title_uz, Lesson.title).label("lesson_title"),
+            Lesson.duration.label("lesson_duration"),
+            Lesson.points_reward.label("lesson_points"),
+            Progress.status.label("progress_status")
+        ).join(
+            Lesson, Progress.lesson_id == Lesson.id
+        ).join(
+            StudentProfile, Progress.student_id == StudentProfile.id
+        ).where(
+            StudentProfile.user_id == user_id,
+            Progress.status != ProgressStatus.COMPLETED,
+            Lesson.is_active.is_(True),
+            Lesson.deleted_at.is_(None)
+        ).order_by(
+            func.coalesce(Progress.updated_at, Progress.created_at).desc()
+        ).limit(TASKS_LIMIT).subquery("tasks")
+
+        return select(reading, profile, tasks).select_from(
+            reading.outerjoin(profile, true()).outerjoin(tasks, true())
+        )
+
+    @staticmethod
+    def summarize(rows: List) -> Dict[str, Any]:
+        first = rows[0]
+
+        if first.level is None:
+            # No student profile yet
+            stats = {"level": 1, "points": 0, "coins": 0, "streak": 0, "xp": 0}
+        else:
+            stats = {
+                "level": first.level,
+                "points": first.total_points,
+                "coins": first.total_coins,
+                "streak": first.current_streak,
+                # Mocking XP as points for now, or calculate based on level
+                "xp": first.total_points
+            }
+
+        reading_stats = {
+            "total_sessions": first.total_sessions or 0,
+            "total_words": int(first.total_words or 0),
+            "avg_pronunciation": round(float(first.avg_pronunciation or 0), 1),
+            "avg_comprehension": round(float(first.avg_comprehension or 0), 1),
+            "total_errors": int(first.total_errors or 0)
+        }
+
+        tasks = [
+            {
+                "id": str(row.lesson_id),
+                "title": row.lesson_title,
+                "deadline": None,
+                "duration": row.lesson_duration,
+                "xp": row.lesson_points,
+                "status": ProgressStatus(row.progress_status).value
+            }
+            for row in rows if row.lesson_id is not None
+        ]
+
+        return {"profile": stats, "reading_stats": reading_stats, "tasks": tasks}
@@ -0,0 +1,35 @@
+"""
+Document Text - page-wise PDF text extraction for uploads
+
+iter_pdf_pages yields one page of text at a time, so a consumer that
+only needs the first N words or questions stops reading the PDF right
+there instead of extracting a whole textbook first. Callers collect
+pages in a list and join once, never `text += page`.
+
+pdfplumber is used when installed (better layout), pypdf otherwise.
+"""
+
+import io
+from typing import Iterator
+
+try:
+    import pdfplumber
+except ImportError:
+    pdfplumber = None
+
+from pypdf import PdfReader
+
+
+def iter_pdf_pages(content: bytes) -> Iterator[str]:
+    """Text of each page, extracted lazily ("" for pages without text)."""
+    if pdfplumber is not None:
+        with pdfplumber.open(io.BytesIO(content)) as pdf:
+            for page in pdf.pages:
+                yield page.extract_text() or ""
+                # Drop the page's parsed layout objects before the next one
+                page.close()
+        return
+
+    reader = PdfReader(io.BytesIO(content))
+    for page in reader.pages:
+        yield page.extract_text() or ""
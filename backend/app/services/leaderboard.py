@@ -0,0 +1,289 @@
+"""
+Leaderboards - score-ordered rankings maintained incrementally
+
+One board per event ("olympiad:<id>", "live_quiz:<id>"). Services update a
+member's score when an answer is scored, and pages read top-N or a single
+member's rank without re-querying and re-sorting all participants:
+
+- update / rank: O(log n)
+- top(limit, offset): O(log n + limit)
+
+Ordering is score descending, then tiebreak descending (callers encode
+"lower is better" values such as time spent as MAX - value). Rank is the
+1-based position in that order.
+
+Backends:
+- MemoryLeaderboardBackend (default): a SortedList per board in worker
+  memory. Each worker keeps its own copy, so callers re-sync it from the
+  database now and then (needs_sync(max_age)). Boards of finished events
+  are not always dropped on every worker, so boards unused for IDLE_TTL
+  (or beyond MAX_BOARDS, least recently used first) are evicted; a
+  caller that needs one again re-syncs it.
+- RedisLeaderboardBackend: set LEADERBOARD_REDIS_URL (and install `redis`)
+  to keep boards in sorted sets shared by all workers.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+TIEBREAK_LIMIT = 1_000_000  # tiebreak must be in [0, TIEBREAK_LIMIT)
+
+
+@dataclass
+class LeaderboardEntry:
+    rank: int
+    member: str
+    score: int
+    tiebreak: int = 0
+    info: Dict[str, Any] = field(default_factory=dict)
+
+
+# (member, score, tiebreak, info) rows for replace()
+BoardRow = Tuple[str, int, int, Dict[str, Any]]
+
+
+class _MemoryBoard:
+    __slots__ = ("keys", "members", "info", "synced_at", "used_at")
+
+    def __init__(self):
+        self.keys = SortedList()  # (-score, -tiebreak, member)
+        self.members: Dict[str, Tuple[int, int, str]] = {}
+        self.info: Dict[str, Dict[str, Any]] = {}
+        self.synced_at: Optional[float] = None
+        self.used_at = time.monotonic()
+
+    def entry(self, rank: int, key: Tuple[int, int, str]) -> LeaderboardEntry:
+        score, tiebreak, member = -key[0], -key[1], key[2]
+        return LeaderboardEntry(rank, member, score, tiebreak, self.info.get(member, {}))
+
+
+class MemoryLeaderboardBackend:
+    """Per-process sorted boards, least recently used first."""
+
+    IDLE_TTL = 6 * 3600  # Seconds a board may go unread / unwritten
+    MAX_BOARDS = 1000
+
+    def __init__(self):
+        self._boards: "OrderedDict[str, _MemoryBoard]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _find(self, board: str) -> Optional[_MemoryBoard]:
+        """Existing board, marked as used (caller holds the lock)."""
+        found = self._boards.get(board)
+        if found is not None:
+            found.used_at = time.monotonic()
+            self._boards.move_to_end(board)
+        return found
+
+    def _store(self, board: str, b: _MemoryBoard):
+        """Add or swap a board and evict idle / surplus ones (caller holds the lock)."""
+        self._boards[board] = b
+        self._boards.move_to_end(board)
+        idle_before = time.monotonic() - self.IDLE_TTL
+        while self._boards:
+            name, oldest = next(iter(self._boards.items()))
+            if len(self._boards) <= self.MAX_BOARDS and oldest.used_at >= idle_before:
+                break
+            del self._boards[name]
+
+    def update(
+        self,
+        board: str,
+        member: str,
+        score: int,
+        tiebreak: int = 0,
+        info: Optional[Dict[str, Any]] = None
+    ):
+        key = (-score, -tiebreak, member)
+        with self._lock:
+            b = self._find(board)
+            if b is None:
+                b = _MemoryBoard()
+                self._store(board, b)
+            old = b.members.get(member)
+            if old is not None:
+                b.keys.remove(old)
+            b.keys.add(key)
+            b.members[member] = key
+            if info is not None:
+                b.info[member] = {**b.info.get(member, {}), **info}
+
+    def replace(self, board: str, rows: Iterable[BoardRow]):
+        """Load a whole board at once (initial load or re-sync from the database)."""
+        b = _MemoryBoard()
+        for member, score, tiebreak, info in rows:
+            key = (-score, -tiebreak, member)
+            b.members[member] = key
+            b.info[member] = info
+        b.keys.update(b.members.values())
+        b.synced_at = time.monotonic()
+        with self._lock:
+            self._store(board, b)
+
+    def top(self, board: str, limit: int = 10, offset: int = 0) -> List[LeaderboardEntry]:
+        with self._lock:
+            b = self._find(board)
+            if b is None:
+                return []
+            keys = list(b.keys.islice(offset, offset + limit))
+        return [b.entry(offset + i + 1, key) for i, key in enumerate(keys)]
+
+    def rank(self, board: str, member: str) -> Optional[LeaderboardEntry]:
+        with self._lock:
+            b = self._find(board)
+            key = b.members.get(member) if b is not None else None
+            if key is None:
+                return None
+            return b.entry(b.keys.index(key) + 1, key)
+
+    def size(self, board: str) -> int:
+        with self._lock:
+            b = self._find(board)
+            return len(b.keys) if b is not None else 0
+
+    def needs_sync(self, board: str, max_age: Optional[float] = None) -> bool:
+        """True if never loaded in this worker (or evicted), or loaded more than max_age seconds ago."""
+        with self._lock:
+            b = self._boards.get(board)
+            synced_at = b.synced_at if b is not None else None
+        if synced_at is None:
+            return True
+        return max_age is not None and time.monotonic() - synced_at > max_age
+
+    def drop(self, board: str):
+        with self._lock:
+            self._boards.pop(board, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "boards": len(self._boards),
+            "members": sum(len(b.members) for b in self._boards.values())
+        }
+
+
+class RedisLeaderboardBackend:
+    """
+    Sorted set per board (score * TIEBREAK_LIMIT + tiebreak), plus a hash
+    of member display info. Shared by all workers; ties on the combined
+    score are ordered by member id.
+    """
+
+    KEY_PREFIX = "alif24:leaderboard:"
+    TTL = 7 * 24 * 3600  # boards of finished events expire on their own
+
+    def __init__(self, url: str):
+        self._redis = redis.Redis.from_url(url)
+
+    def _keys(self, board: str) -> Tuple[str, str]:
+        key = self.KEY_PREFIX + board
+        return key, key + ":info"
+
+    @staticmethod
+    def _combined(score: int, tiebreak: int) -> int:
+        return score * TIEBREAK_LIMIT + tiebreak
+
+    @staticmethod
+    def _split(combined: float) -> Tuple[int, int]:
+        score, tiebreak = divmod(int(combined), TIEBREAK_LIMIT)
+        return score, tiebreak
+
+    def _entry(self, rank: int, member, combined: float, info) -> LeaderboardEntry:
+        score, tiebreak = self._split(combined)
+        member = member.decode() if isinstance(member, bytes) else member
+        return LeaderboardEntry(rank, member, score, tiebreak, json.loads(info) if info else {})
+
+    def update(
+        self,
+        board: str,
+        member: str,
+        score: int,
+        tiebreak: int = 0,
+        info: Optional[Dict[str, Any]] = None
+    ):
+        zkey, hkey = self._keys(board)
+        pipe = self._redis.pipeline()
+        pipe.zadd(zkey, {member: self._combined(score, tiebreak)})
+        pipe.expire(zkey, self.TTL)
+        if info is not None:
+            pipe.hget(hkey, member)
+        results = pipe.execute()
+        if info is not None:
+            merged = {**(json.loads(results[-1]) if results[-1] else {}), **info}
+            self._redis.hset(hkey, member, json.dumps(merged))
+            self._redis.expire(hkey, self.TTL)
+
+    def replace(self, board: str, rows: Iterable[BoardRow]):
+        zkey, hkey = self._keys(board)
+        rows = list(rows)
+        pipe = self._redis.pipeline()
+        pipe.delete(zkey, hkey)
+        if rows:
+            pipe.zadd(zkey, {member: self._combined(score, tiebreak) for member, score, tiebreak, _ in rows})
+            pipe.hset(hkey, mapping={member: json.dumps(info) for member, _, _, info in rows})
+            pipe.expire(zkey, self.TTL)
+            pipe.expire(hkey, self.TTL)
+        pipe.execute()
+
+    def top(self, board: str, limit: int = 10, offset: int = 0) -> List[LeaderboardEntry]:
+        zkey, hkey = self._keys(board)
+        rows = self._redis.zrevrange(zkey, offset, offset + limit - 1, withscores=True)
+        if not rows:
+            return []
+        infos = self._redis.hmget(hkey, [member for member, _ in rows])
+        return [
+            self._entry(offset + i + 1, member, combined, info)
+            for i, ((member, combined), info) in enumerate(zip(rows, infos))
+        ]
+
+    def rank(self, board: str, member: str) -> Optional[LeaderboardEntry]:
+        zkey, hkey = self._keys(board)
+        pipe = self._redis.pipeline()
+        pipe.zrevrank(zkey, member)
+        pipe.zscore(zkey, member)
+        pipe.hget(hkey, member)
+        position, combined, info = pipe.execute()
+        if position is None:
+            return None
+        return self._entry(position + 1, member, combined, info)
+
+    def size(self, board: str) -> int:
+        return self._redis.zcard(self._keys(board)[0])
+
+    def needs_sync(self, board: str, max_age: Optional[float] = None) -> bool:
+        """Shared and kept current by every worker: only load if the board is missing."""
+        return not self._redis.exists(self._keys(board)[0])
+
+    def drop(self, board: str):
+        self._redis.delete(*self._keys(board))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis"}
+
+
+def _make_backend():
+    url = os.getenv("LEADERBOARD_REDIS_URL")
+    if url and redis is not None:
+        return RedisLeaderboardBackend(url)
+    if url:
+        logger.warning("LEADERBOARD_REDIS_URL set but redis is not installed; using in-memory leaderboards")
+    return MemoryLeaderboardBackend()
+
+
+# Global leaderboard store (memory: one per worker process; redis: shared)
+leaderboards = _make_backend()
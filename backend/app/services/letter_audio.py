@@ -0,0 +1,304 @@
+"""
+Letter Audio Bundle - pre-rendered TTS clips for the letters/harf/rharf modules
+
+The alphabets are small and fixed, so every letter, phoneme and "X harfi"
+variant is rendered once (build step or admin trigger) into a versioned
+directory:
+
+    <LETTER_AUDIO_DIR>/CURRENT              -> active version name
+    <LETTER_AUDIO_DIR>/<version>/manifest.json
+    <LETTER_AUDIO_DIR>/<version>/<key>.mp3
+
+Clips are keyed by the SSML hash (AzureSpeechService.cache_key), i.e. by
+exactly what the router would send to Azure, so a bundle hit is always
+the same audio a live call would produce. Routers look the SSML up here
+first and only fall back to Azure on a miss.
+
+Build from the command line:
+    python -m app.services.letter_audio
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.core.http_clients import http_clients
+from app.services.speech_service import speech_service
+
+logger = logging.getLogger(__name__)
+
+UZ_LETTERS = [
+    "A", "B", "D", "E", "F", "G", "H", "I", "J", "K", "L", "M", "N", "O", "P",
+    "Q", "R", "S", "T", "U", "V", "X", "Y", "Z", "Oʻ", "Gʻ", "Sh", "Ch", "Ng"
+]
+
+RU_LETTERS = list("АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ")
+
+
+def _variants(letter: str, language: str) -> List[str]:
+    texts = [letter, letter.lower()]
+    if language == "uz-UZ":
+        texts += [f"{t} harfi" for t in texts]
+    return texts
+
+
+def _sources():
+    """(source, language, letters, ssml builder) for every router that serves letters."""
+    from app.letters.router import build_tts_ssml as letters_ssml
+    from app.harf.router import build_tts_ssml as harf_ssml
+    from app.rharf.router import build_tts_ssml as rharf_ssml
+
+    return [
+        ("letters", "uz-UZ", UZ_LETTERS, letters_ssml),
+        ("letters", "ru-RU", RU_LETTERS, letters_ssml),
+        ("harf", "uz-UZ", UZ_LETTERS, harf_ssml),
+        ("rharf", "ru-RU", RU_LETTERS, rharf_ssml),
+    ]
+
+
+class LetterAudioBundle:
+    """Loads the active bundle and serves clips with strong ETags and byte ranges."""
+
+    RELOAD_INTERVAL = 60  # seconds between checks of the CURRENT pointer
+    KEEP_VERSIONS = 2
+    CACHE_CONTROL = "public, max-age=86400"
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._audio: Dict[str, bytes] = {}
+        self._checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _read_current(self) -> Optional[str]:
+        try:
+            return (self.root / "CURRENT").read_text(encoding="utf-8").strip() or None
+        except OSError:
+            return None
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.RELOAD_INTERVAL:
+            return
+        with self._lock:
+            self._checked_at = now
+            version = self._read_current()
+            if version == self._version:
+                return
+            entries: Dict[str, Dict[str, Any]] = {}
+            if version:
+                try:
+                    manifest = json.loads((self.root / version / "manifest.json").read_text(encoding="utf-8"))
+                    entries = manifest.get("entries", {})
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Letter audio manifest {version} unreadable: {e}")
+                    return
+            self._version = version
+            self._entries = entries
+            self._audio = {}
+            if version:
+                logger.info(f"Letter audio bundle {version} loaded ({len(entries)} clips)")
+
+    def lookup(self, ssml: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        """Manifest entry and audio for this SSML, or None if not bundled."""
+        self._maybe_reload()
+        key = speech_service.cache_key(ssml)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        audio = self._audio.get(key)
+        if audio is None:
+            try:
+                audio = (self.root / self._version / entry["file"]).read_bytes()
+            except OSError as e:
+                logger.warning(f"Letter audio clip {entry['file']} missing: {e}")
+                self.misses += 1
+                return None
+            self._audio[key] = audio
+        self.hits += 1
+        return entry, audio
+
+    # ------------------------------------------------------------------
+    # Serving
+    # ------------------------------------------------------------------
+
+    def response(self, ssml: str, request: Request) -> Optional[Response]:
+        """HTTP response for a bundled clip (200/206/304/416), or None on a miss."""
+        found = self.lookup(ssml)
+        if found is None:
+            return None
+        entry, audio = found
+        return self._audio_response(audio, f'"{entry["etag"]}"', request)
+
+    def _audio_response(self, audio: bytes, etag: str, request: Request) -> Response:
+        headers = {
+            "ETag": etag,
+            "Accept-Ranges": "bytes",
+            "Cache-Control": self.CACHE_CONTROL
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            tags = [t.strip() for t in if_none_match.split(",")]
+            if "*" in tags or etag in tags:
+                return Response(status_code=304, headers=headers)
+
+        range_header = request.headers.get("range")
+        if_range = request.headers.get("if-range")
+        if range_header and (not if_range or if_range == etag):
+            byte_range = self._parse_range(range_header, len(audio))
+            if byte_range is False:
+                headers["Content-Range"] = f"bytes */{len(audio)}"
+                return Response(status_code=416, headers=headers)
+            if byte_range is not None:
+                start, end = byte_range
+                headers["Content-Range"] = f"bytes {start}-{end}/{len(audio)}"
+                return Response(
+                    content=audio[start:end + 1],
+                    status_code=206,
+                    media_type="audio/mpeg",
+                    headers=headers
+                )
+
+        return Response(content=audio, media_type="audio/mpeg", headers=headers)
+
+    @staticmethod
+    def _parse_range(value: str, size: int):
+        """
+        Single "bytes=" range -> (start, end) inclusive.
+        None = ignore header (serve full body), False = unsatisfiable.
+        """
+        unit, _, spec = value.partition("=")
+        if unit.strip().lower() != "bytes" or "," in spec:
+            return None  # multipart ranges are not worth it for short clips
+        first, _, last = spec.strip().partition("-")
+        try:
+            if first == "":
+                length = int(last)
+                if length <= 0:
+                    return False
+                return max(size - length, 0), size - 1
+            start = int(first)
+            end = int(last) if last else size - 1
+        except ValueError:
+            return None
+        if start >= size or end < start:
+            return False
+        return start, min(end, size - 1)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    async def build(self, version: Optional[str] = None, concurrency: int = 4) -> Dict[str, Any]:
+        """
+        Render every variant into a new version directory, then switch
+        CURRENT to it. Existing clips are reused through the speech cache.
+        """
+        version = version or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        target = self.root / version
+        target.mkdir(parents=True, exist_ok=True)
+
+        jobs: Dict[str, Dict[str, Any]] = {}
+        for source, language, letters, build_ssml in _sources():
+            for letter in letters:
+                for text in _variants(letter, language):
+                    ssml = build_ssml(text, language)
+                    key = speech_service.cache_key(ssml)
+                    if key not in jobs:
+                        jobs[key] = {"ssml": ssml, "source": source, "language": language, "text": text}
+
+        limiter = asyncio.Semaphore(concurrency)
+        entries: Dict[str, Dict[str, Any]] = {}
+
+        async def render(key: str, job: Dict[str, Any]):
+            async with limiter:
+                audio = await speech_service.synthesize(job["ssml"])
+            file_name = f"{key}.mp3"
+            await asyncio.to_thread((target / file_name).write_bytes, audio)
+            entries[key] = {
+                "file": file_name,
+                "etag": hashlib.sha256(audio).hexdigest(),
+                "bytes": len(audio),
+                "source": job["source"],
+                "language": job["language"],
+                "text": job["text"]
+            }
+
+        await asyncio.gather(*(render(key, job) for key, job in jobs.items()))
+
+        manifest = {
+            "version": version,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "format": speech_service.OUTPUT_FORMAT,
+            "entries": entries
+        }
+        (target / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+
+        # Atomic switch: other workers pick it up on their next reload check
+        pointer_tmp = self.root / f"CURRENT.{os.getpid()}.tmp"
+        pointer_tmp.write_text(version, encoding="utf-8")
+        os.replace(pointer_tmp, self.root / "CURRENT")
+        self._checked_at = 0.0
+        self._maybe_reload()
+        self._prune(keep=version)
+
+        total = sum(e["bytes"] for e in entries.values())
+        logger.info(f"Letter audio bundle {version} built: {len(entries)} clips, {total} bytes")
+        return {"version": version, "clips": len(entries), "bytes": total}
+
+    def _prune(self, keep: str):
+        """Remove all but the newest KEEP_VERSIONS bundle directories."""
+        versions = sorted(p for p in self.root.iterdir() if p.is_dir())
+        for old in versions[:-self.KEEP_VERSIONS]:
+            if old.name != keep:
+                shutil.rmtree(old, ignore_errors=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self._version,
+            "clips": len(self._entries),
+            "loaded": len(self._audio),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+LETTER_AUDIO_DIR = os.getenv(
+    "LETTER_AUDIO_DIR",
+    str(Path(__file__).resolve().parents[2] / "static" / "letter_audio")
+)
+
+# Global bundle instance (one per worker process)
+letter_audio_bundle = LetterAudioBundle(LETTER_AUDIO_DIR)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    async def _main():
+        try:
+            print(await letter_audio_bundle.build())
+        finally:
+            await http_clients.close()
+
+    asyncio.run(_main())
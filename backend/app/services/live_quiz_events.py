@@ -0,0 +1,81 @@
+"""
+Live Quiz Event Hub - push channel for live quiz sessions
+
+Clients (teacher screen and students) subscribe by quiz join_code over a
+WebSocket and receive events instead of polling:
+- question_start: new question (without correct answer)
+- answer_count: how many participants answered the current question
+- leaderboard: current standings
+- quiz_end: quiz finished, final leaderboard
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class LiveQuizHub:
+    """
+    In-process pub/sub keyed by quiz join_code.
+    Every subscriber gets its own bounded queue, so a slow client
+    only loses its own oldest events and never blocks the publisher.
+    """
+
+    QUEUE_SIZE = 100
+
+    def __init__(self):
+        self._channels: Dict[str, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, join_code: str) -> asyncio.Queue:
+        """Register a subscriber for the quiz and return its event queue."""
+        self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        self._channels.setdefault(join_code, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, join_code: str, queue: asyncio.Queue):
+        """Remove a subscriber; drops the channel when it becomes empty."""
+        subscribers = self._channels.get(join_code)
+        if not subscribers:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            self._channels.pop(join_code, None)
+
+    def subscriber_count(self, join_code: str) -> int:
+        return len(self._channels.get(join_code, ()))
+
+    def publish(self, join_code: str, event: str, data: Dict[str, Any]):
+        """
+        Publish an event to every subscriber of the quiz.
+        Safe to call from sync service code, on or off the event loop thread.
+        """
+        subscribers = self._channels.get(join_code)
+        if not subscribers or self._loop is None or self._loop.is_closed():
+            return
+
+        message = {
+            "event": event,
+            "data": data,
+            "sent_at": datetime.utcnow().isoformat()
+        }
+        for queue in list(subscribers):
+            self._loop.call_soon_threadsafe(self._deliver, queue, message)
+
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, message: Dict[str, Any]):
+        if queue.full():
+            # Slow consumer: drop its oldest event
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        queue.put_nowait(message)
+
+
+# Global hub instance (one per worker process)
+live_quiz_hub = LiveQuizHub()
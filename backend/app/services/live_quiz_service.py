@@ -16,8 +16,11 @@ from app.models import (
     TeacherProfile, StudentProfile,
     LiveQuiz, LiveQuizQuestion, LiveQuizParticipant, LiveQuizAnswer,
     LiveQuizStatus, ParticipantState,
-    StudentCoin, CoinTransaction, TransactionType
+    TransactionType
 )
+from app.services.coin_ledger import CoinAward, CoinLedger
+from app.services.live_quiz_events import live_quiz_hub
+from app.services.live_quiz_state import live_quiz_state
 
 
 class LiveQuizService:
@@ -171,6 +174,10 @@ class LiveQuizService:
         
         self.db.commit()
         
+        # Keep session state in memory while the quiz is running
+        live_quiz_state.load(self.db, quiz)
+        self._publish_question(quiz)
+        
         return {
             "message": "Quiz boshlandi!",
             "total_questions": len(quiz.questions),
@@ -207,7 +214,13 @@ class LiveQuizService:
         if quiz.status != LiveQuizStatus.active:
             raise BadRequestError("Quiz faol emas")
         
+        # Persist answers of the closing question before moving on
+        self._flush_state(quiz.id)
+        
         quiz.current_question_index += 1
+        session = live_quiz_state.get(quiz.id)
+        if session is not None:
+            session.current_index = quiz.current_question_index
         
         if quiz.current_question_index >= len(quiz.questions):
             # Quiz finished
@@ -217,6 +230,13 @@ class LiveQuizService:
         
         self.db.commit()
         
+        if quiz.status == LiveQuizStatus.finished:
+            live_quiz_state.drop(quiz.id)
+            self._publish(quiz, "quiz_end", {"leaderboard": self._leaderboard_rows(quiz)})
+        else:
+            self._publish(quiz, "leaderboard", {"leaderboard": self._leaderboard_rows(quiz)})
+            self._publish_question(quiz)
+        
         return self.get_current_question(teacher_user_id, quiz_id)
     
     def get_question_results(self, teacher_user_id: UUID, quiz_id: UUID, question_id: UUID) -> Dict:
@@ -230,6 +250,9 @@ class LiveQuizService:
         if not question:
             raise NotFoundError("Savol topilmadi")
         
+        if self._flush_state(quiz.id):
+            self.db.commit()
+        
         answers = self.db.query(LiveQuizAnswer).filter(
             LiveQuizAnswer.question_id == question_id
         ).all()
@@ -251,40 +274,30 @@ class LiveQuizService:
             "total_answers": len(answers)
         }
     
-    def get_leaderboard(self, teacher_user_id: UUID, quiz_id: UUID) -> List[Dict]:
-        """Get current leaderboard."""
+    def get_leaderboard(self, teacher_user_id: UUID, quiz_id: UUID, limit: Optional[int] = None) -> List[Dict]:
+        """Get current leaderboard (top `limit`, default all)."""
         quiz = self._get_quiz_for_teacher(quiz_id, teacher_user_id)
-        
-        participants = sorted(
-            quiz.participants,
-            key=lambda p: (-p.total_score, -p.current_streak)
-        )
-        
-        return [
-            {
-                "rank": i + 1,
-                "display_name": p.display_name,
-                "avatar_emoji": p.avatar_emoji,
-                "total_score": p.total_score,
-                "correct_count": p.correct_count,
-                "current_streak": p.current_streak
-            }
-            for i, p in enumerate(participants)
-        ]
+        return self._leaderboard_rows(quiz, limit)
     
     def end_quiz(self, teacher_user_id: UUID, quiz_id: UUID) -> Dict:
         """End the quiz and finalize scores."""
         quiz = self._get_quiz_for_teacher(quiz_id, teacher_user_id)
         
+        self._flush_state(quiz.id)
+        
         quiz.status = LiveQuizStatus.finished
         quiz.ended_at = datetime.utcnow()
         
         self._calculate_rankings(quiz)
         self.db.commit()
+        live_quiz_state.drop(quiz.id)
+        
+        leaderboard = self._leaderboard_rows(quiz)
+        self._publish(quiz, "quiz_end", {"leaderboard": leaderboard})
         
         return {
             "message": "Quiz tugatildi!",
-            "leaderboard": self.get_leaderboard(teacher_user_id, quiz_id)
+            "leaderboard": leaderboard
         }
     
     # ============================================================
@@ -347,6 +360,12 @@ class LiveQuizService:
         self.db.add(participant)
         self.db.commit()
         
+        self._publish(quiz, "participant_joined", {
+            "display_name": participant.display_name,
+            "avatar_emoji": participant.avatar_emoji,
+            "participants_count": len(quiz.participants)
+        })
+        
         return {
             "message": "Muvaffaqiyatli qo'shildingiz!",
             "quiz_id": str(quiz.id),
@@ -356,6 +375,19 @@ class LiveQuizService:
     
     def get_student_question(self, student_user_id: UUID, quiz_id: UUID) -> Dict:
         """Get current question for student (without correct answer)."""
+        session = live_quiz_state.get_or_load(self.db, quiz_id)
+        if session is not None:
+            # Active quiz: answer from memory, no database reads
+            participant = session.participant_for(student_user_id)
+            if session.finished:
+                return {"status": "finished", "message": "Barcha savollar tugadi!"}
+            question_id = session.questions[session.current_index].id
+            return {
+                "status": "active",
+                **session.current_question_payload(),
+                "already_answered": session.has_answered(participant.id, question_id)
+            }
+        
         participant = self._get_participant(student_user_id, quiz_id)
         quiz = participant.quiz
         
@@ -380,13 +412,7 @@ class LiveQuizService:
         
         return {
             "status": "active",
-            "question_number": quiz.current_question_index + 1,
-            "total_questions": len(quiz.questions),
-            "question_id": str(question.id),
-            "text": question.question_text,
-            "image": question.question_image,
-            "options": question.options,
-            "time_limit": question.time_limit,
+            **self._student_question_payload(quiz),
             "already_answered": already_answered is not None
         }
     
@@ -398,68 +424,59 @@ class LiveQuizService:
         selected_answer: int,
         time_to_answer_ms: int
     ) -> Dict:
-        """Submit answer for current question."""
-        participant = self._get_participant(student_user_id, quiz_id)
-        quiz = participant.quiz
-        
-        if quiz.status != LiveQuizStatus.active:
+        """
+        Submit answer for current question.
+        Scored against in-memory session state; answers are written to the
+        database in batches (see LiveQuizStateEngine).
+        """
+        session = live_quiz_state.get_or_load(self.db, quiz_id)
+        if session is None:
+            # Raises if the student never joined
+            self._get_participant(student_user_id, quiz_id)
             raise BadRequestError("Quiz faol emas")
         
-        # Get question
-        question = self.db.query(LiveQuizQuestion).filter(
-            LiveQuizQuestion.id == question_id
-        ).first()
+        participant = session.participant_for(student_user_id)
+        result = session.record_answer(participant, question_id, selected_answer, time_to_answer_ms)
         
-        if not question or question.quiz_id != quiz.id:
-            raise NotFoundError("Savol topilmadi")
-        
-        # Check if already answered
-        existing = self.db.query(LiveQuizAnswer).filter(
-            and_(
-                LiveQuizAnswer.participant_id == participant.id,
-                LiveQuizAnswer.question_id == question_id
-            )
-        ).first()
+        if live_quiz_state.should_flush(session):
+            live_quiz_state.flush(self.db, session)
+            self.db.commit()
         
-        if existing:
-            raise BadRequestError("Bu savolga allaqachon javob berdingiz")
-        
-        # Calculate score (faster = more points)
-        is_correct = (selected_answer == question.correct_answer)
-        points = 0
+        live_quiz_hub.publish(session.join_code, "answer_count", {
+            "question_id": str(question_id),
+            "answered": session.answered_count(question_id),
+            "participants_count": len(session.participants)
+        })
         
-        if is_correct:
-            # Base points reduced by time taken (max 1000ms penalty)
-            time_penalty = min(time_to_answer_ms / (question.time_limit * 10), question.points * 0.5)
-            points = max(int(question.points - time_penalty), question.points // 2)
-            
-            participant.correct_count += 1
-            participant.current_streak += 1
-            participant.best_streak = max(participant.best_streak, participant.current_streak)
-        else:
-            participant.wrong_count += 1
-            participant.current_streak = 0
-        
-        participant.total_score += points
-        
-        # Save answer
-        answer = LiveQuizAnswer(
-            participant_id=participant.id,
-            question_id=question_id,
-            selected_answer=selected_answer,
-            is_correct=is_correct,
-            points_earned=points,
-            time_to_answer_ms=time_to_answer_ms
-        )
-        
-        self.db.add(answer)
-        self.db.commit()
+        return result
+    
+    def get_student_rank(self, student_user_id: UUID, quiz_id: UUID) -> Dict:
+        """Student's current place while the quiz runs (final place afterwards)."""
+        session = live_quiz_state.get_or_load(self.db, quiz_id)
+        if session is not None:
+            participant = session.participant_for(student_user_id)
+            row = session.rank_of(participant)
+            if row is None:
+                # Not on the board yet (e.g. joined after it was loaded)
+                row = {
+                    "rank": None,
+                    "display_name": participant.display_name,
+                    "avatar_emoji": participant.avatar_emoji,
+                    "total_score": participant.total_score,
+                    "correct_count": participant.correct_count,
+                    "current_streak": participant.current_streak
+                }
+            return {**row, "participants_count": len(session.participants)}
         
+        participant = self._get_participant(student_user_id, quiz_id)
         return {
-            "is_correct": is_correct,
-            "points_earned": points,
+            "rank": participant.rank,
+            "display_name": participant.display_name,
+            "avatar_emoji": participant.avatar_emoji,
             "total_score": participant.total_score,
-            "current_streak": participant.current_streak
+            "correct_count": participant.correct_count,
+            "current_streak": participant.current_streak,
+            "participants_count": len(participant.quiz.participants)
         }
     
     def get_student_results(self, student_user_id: UUID, quiz_id: UUID) -> Dict:
@@ -476,6 +493,35 @@ class LiveQuizService:
             "coins_earned": participant.coins_earned
         }
     
+    def get_snapshot(self, join_code: str, user_id: UUID) -> Dict:
+        """
+        Current quiz state for a freshly connected WebSocket client.
+        Only the quiz's teacher and its participants may watch.
+        Never includes correct answers.
+        """
+        quiz = self.db.query(LiveQuiz).filter(
+            LiveQuiz.join_code == join_code.upper()
+        ).first()
+        
+        if not quiz:
+            raise NotFoundError("Quiz topilmadi. Kodni tekshiring.")
+        
+        if not self._can_watch(quiz, user_id):
+            raise ForbiddenError("Siz bu quizga qo'shilmagansiz")
+        
+        snapshot = {
+            "quiz_id": str(quiz.id),
+            "status": quiz.status.value,
+            "participants_count": len(quiz.participants)
+        }
+        
+        if quiz.status == LiveQuizStatus.active and quiz.current_question_index < len(quiz.questions):
+            snapshot["question"] = self._student_question_payload(quiz)
+        elif quiz.status == LiveQuizStatus.finished:
+            snapshot["leaderboard"] = self._leaderboard_rows(quiz)
+        
+        return snapshot
+    
     # ============================================================
     # HELPER METHODS
     # ============================================================
@@ -511,6 +557,22 @@ class LiveQuizService:
         
         return quiz
     
+    def _can_watch(self, quiz: LiveQuiz, user_id: UUID) -> bool:
+        """Teacher who owns the quiz, or a student who joined it."""
+        is_teacher = self.db.query(TeacherProfile.id).filter(
+            TeacherProfile.id == quiz.teacher_id,
+            TeacherProfile.user_id == user_id
+        ).first() is not None
+        if is_teacher:
+            return True
+        
+        return self.db.query(LiveQuizParticipant.id).join(
+            StudentProfile, LiveQuizParticipant.student_id == StudentProfile.id
+        ).filter(
+            LiveQuizParticipant.quiz_id == quiz.id,
+            StudentProfile.user_id == user_id
+        ).first() is not None
+    
     def _get_participant(self, student_user_id: UUID, quiz_id: UUID) -> LiveQuizParticipant:
         """Get participant by student user ID."""
         student_profile = self.db.query(StudentProfile).filter(
@@ -532,6 +594,58 @@ class LiveQuizService:
         
         return participant
     
+    def _student_question_payload(self, quiz: LiveQuiz) -> Dict:
+        """Current question as students see it (without correct answer)."""
+        question = quiz.questions[quiz.current_question_index]
+        return {
+            "question_number": quiz.current_question_index + 1,
+            "total_questions": len(quiz.questions),
+            "question_id": str(question.id),
+            "text": question.question_text,
+            "image": question.question_image,
+            "options": question.options,
+            "time_limit": question.time_limit
+        }
+    
+    def _leaderboard_rows(self, quiz: LiveQuiz, limit: Optional[int] = None) -> List[Dict]:
+        """Build leaderboard rows ordered by score, then streak."""
+        session = live_quiz_state.get(quiz.id)
+        if session is not None and quiz.status == LiveQuizStatus.active:
+            return session.leaderboard(limit)
+        
+        participants = sorted(
+            quiz.participants,
+            key=lambda p: (-p.total_score, -p.current_streak)
+        )
+        
+        return [
+            {
+                "rank": i + 1,
+                "display_name": p.display_name,
+                "avatar_emoji": p.avatar_emoji,
+                "total_score": p.total_score,
+                "correct_count": p.correct_count,
+                "current_streak": p.current_streak
+            }
+            for i, p in enumerate(participants[:limit])
+        ]
+    
+    def _flush_state(self, quiz_id: UUID) -> int:
+        """Write pending in-memory answers for the quiz (caller commits)."""
+        session = live_quiz_state.get(quiz_id)
+        if session is None:
+            return 0
+        return live_quiz_state.flush(self.db, session)
+    
+    def _publish(self, quiz: LiveQuiz, event: str, data: Dict):
+        """Push event to WebSocket subscribers of this quiz."""
+        live_quiz_hub.publish(quiz.join_code, event, data)
+    
+    def _publish_question(self, quiz: LiveQuiz):
+        """Push the current question to subscribers."""
+        if quiz.current_question_index < len(quiz.questions):
+            self._publish(quiz, "question_start", self._student_question_payload(quiz))
+    
     def _calculate_rankings(self, quiz: LiveQuiz):
         """Calculate final rankings and award coins."""
         participants = sorted(
@@ -539,6 +653,7 @@ class LiveQuizService:
             key=lambda p: (-p.total_score, -p.best_streak)
         )
         
+        awards = []
         for rank, participant in enumerate(participants, 1):
             participant.rank = rank
             participant.state = ParticipantState.finished
@@ -546,30 +661,16 @@ class LiveQuizService:
             # Award coins for participation and performance
             base_coins = 2 * participant.correct_count  # 2 coins per correct answer
             participant.coins_earned = base_coins
-            
-            # Add coins to student balance
-            self._add_coins(participant.student_id, base_coins)
+            awards.append(CoinAward(
+                student_id=participant.student_id,
+                amount=base_coins,
+                type=TransactionType.quiz_correct,
+                description="Live Quiz mukofoti",
+                reference_id=quiz.id,
+                reference_type="live_quiz"
+            ))
+        
+        # Add coins to student balances (bulk, once per quiz)
+        CoinLedger(self.db).award_many(awards)
         
         self.db.commit()
-    
-    def _add_coins(self, student_id: UUID, amount: int):
-        """Add coins to student balance."""
-        coin_balance = self.db.query(StudentCoin).filter(
-            StudentCoin.student_id == student_id
-        ).first()
-        
-        if not coin_balance:
-            coin_balance = StudentCoin(student_id=student_id)
-            self.db.add(coin_balance)
-            self.db.flush()
-        
-        coin_balance.total_earned += amount
-        coin_balance.current_balance += amount
-        
-        transaction = CoinTransaction(
-            student_coin_id=coin_balance.id,
-            type=TransactionType.quiz_correct,
-            amount=amount,
-            description="Live Quiz mukofoti"
-        )
-        self.db.add(transaction)
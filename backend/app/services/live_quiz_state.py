@@ -0,0 +1,446 @@
+"""
+Live Quiz State Engine - in-memory session state with write-behind persistence
+
+While a quiz is active, the current question index, the question key,
+participant scores and answered-sets live in process memory. Answers are
+scored without touching the database; LiveQuizAnswer rows and participant
+totals are flushed in batches (by size or age) and always at question
+transitions and quiz end.
+
+Participant totals are written as deltas (total_score = total_score + n),
+so workers that score answers for the same quiz add up instead of
+overwriting each other. Each flush then reloads the quiz's totals from
+the database into memory (and the leaderboard), so every worker's view
+catches up within FLUSH_INTERVAL.
+
+Several workers (or serverless instances) may serve one quiz, while only
+the teacher's worker runs next_question / end_quiz:
+- get_or_load re-reads the quiz's status and current question from the
+  database when the cached copy is older than SYNC_INTERVAL. A worker
+  then serves the new question, and stops scoring once the quiz is no
+  longer active. Its unflushed answers are discarded at that point,
+  because rankings and coins were already settled without them.
+- Only answers to the current question are accepted.
+- live_quiz_answers has a unique (participant_id, question_id) index.
+  Answers are inserted with ON CONFLICT DO NOTHING, so an answer sent
+  to two workers is stored and scored once. current_streak is still
+  per worker.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import bindparam, case, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.errors import BadRequestError, NotFoundError
+from app.models import (
+    LiveQuiz, LiveQuizQuestion, LiveQuizParticipant, LiveQuizAnswer,
+    LiveQuizStatus, StudentProfile
+)
+from app.services.leaderboard import leaderboards
+
+logger = logging.getLogger(__name__)
+
+
+class QuestionState:
+    """Answer key and display data for one question."""
+
+    __slots__ = ("id", "text", "image", "options", "correct_answer", "points", "time_limit")
+
+    def __init__(self, question: LiveQuizQuestion):
+        self.id = question.id
+        self.text = question.question_text
+        self.image = question.question_image
+        self.options = question.options
+        self.correct_answer = question.correct_answer
+        self.points = question.points
+        self.time_limit = question.time_limit
+
+
+class ParticipantScore:
+    """Running totals for one participant."""
+
+    __slots__ = (
+        "id", "display_name", "avatar_emoji", "total_score", "correct_count",
+        "wrong_count", "current_streak", "best_streak",
+        "pending_score", "pending_correct", "pending_wrong"
+    )
+
+    def __init__(self, participant: LiveQuizParticipant):
+        self.id = participant.id
+        self.display_name = participant.display_name
+        self.avatar_emoji = participant.avatar_emoji
+        self.total_score = participant.total_score or 0
+        self.correct_count = participant.correct_count or 0
+        self.wrong_count = participant.wrong_count or 0
+        self.current_streak = participant.current_streak or 0
+        self.best_streak = participant.best_streak or 0
+        # Scored here but not yet written to the database
+        self.pending_score = 0
+        self.pending_correct = 0
+        self.pending_wrong = 0
+
+    def board_row(self):
+        """(member, score, tiebreak, info) for the leaderboard (ties: longer streak first)."""
+        return (str(self.id), self.total_score, self.current_streak, {
+            "display_name": self.display_name,
+            "avatar_emoji": self.avatar_emoji,
+            "correct_count": self.correct_count
+        })
+
+    def take_delta(self) -> Dict:
+        """Unwritten changes as UPDATE parameters; resets the pending counters."""
+        row = {
+            "pid": self.id,
+            "d_score": self.pending_score,
+            "d_correct": self.pending_correct,
+            "d_wrong": self.pending_wrong,
+            "streak": self.current_streak,
+            "best": self.best_streak
+        }
+        self.pending_score = self.pending_correct = self.pending_wrong = 0
+        return row
+
+    def restore_delta(self, row: Dict):
+        """Put back a delta whose write failed."""
+        self.pending_score += row["d_score"]
+        self.pending_correct += row["d_correct"]
+        self.pending_wrong += row["d_wrong"]
+
+
+class LiveQuizSession:
+    """In-memory state of one active live quiz."""
+
+    def __init__(
+        self,
+        quiz: LiveQuiz,
+        questions: List[LiveQuizQuestion],
+        participants: List,
+        answered: List = ()
+    ):
+        self.quiz_id = quiz.id
+        self.join_code = quiz.join_code
+        self.current_index = quiz.current_question_index or 0
+        self.questions = [QuestionState(q) for q in questions]
+        self.question_positions = {q.id: i for i, q in enumerate(self.questions)}
+
+        self.participants: Dict[UUID, ParticipantScore] = {}
+        self.by_user: Dict[UUID, UUID] = {}
+        for participant, user_id in participants:
+            self.participants[participant.id] = ParticipantScore(participant)
+            self.by_user[user_id] = participant.id
+
+        self.board = f"live_quiz:{quiz.id}"
+        leaderboards.replace(self.board, (p.board_row() for p in self.participants.values()))
+
+        self.answered: Dict[UUID, Set[UUID]] = {}
+        for participant_id, question_id in answered:
+            self.answered.setdefault(question_id, set()).add(participant_id)
+        self.pending_answers: List[Dict] = []
+        self.dirty: Set[UUID] = set()
+        self.last_flush = time.monotonic()
+        self.synced_at = time.monotonic()  # status / current question last read from the database
+        self.lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.current_index >= len(self.questions)
+
+    def participant_for(self, user_id: UUID) -> ParticipantScore:
+        participant_id = self.by_user.get(user_id)
+        if participant_id is None:
+            raise NotFoundError("Siz bu quizga qo'shilmagansiz")
+        return self.participants[participant_id]
+
+    def has_answered(self, participant_id: UUID, question_id: UUID) -> bool:
+        return participant_id in self.answered.get(question_id, ())
+
+    def answered_count(self, question_id: UUID) -> int:
+        return len(self.answered.get(question_id, ()))
+
+    def current_question_payload(self) -> Dict:
+        """Current question as students see it (without correct answer)."""
+        question = self.questions[self.current_index]
+        return {
+            "question_number": self.current_index + 1,
+            "total_questions": len(self.questions),
+            "question_id": str(question.id),
+            "text": question.text,
+            "image": question.image,
+            "options": question.options,
+            "time_limit": question.time_limit
+        }
+
+    def record_answer(
+        self,
+        participant: ParticipantScore,
+        question_id: UUID,
+        selected_answer: int,
+        time_to_answer_ms: int
+    ) -> Dict:
+        """Score an answer in memory and queue it for persistence."""
+        position = self.question_positions.get(question_id)
+        if position is None:
+            raise NotFoundError("Savol topilmadi")
+        question = self.questions[position]
+
+        with self.lock:
+            if position != self.current_index:
+                raise BadRequestError("Bu savolga javob berish vaqti tugagan")
+            answered = self.answered.setdefault(question_id, set())
+            if participant.id in answered:
+                raise BadRequestError("Bu savolga allaqachon javob berdingiz")
+            answered.add(participant.id)
+
+            # Calculate score (faster = more points)
+            is_correct = (selected_answer == question.correct_answer)
+            points = 0
+
+            if is_correct:
+                # Base points reduced by time taken (max 1000ms penalty)
+                time_penalty = min(time_to_answer_ms / (question.time_limit * 10), question.points * 0.5)
+                points = max(int(question.points - time_penalty), question.points // 2)
+
+                participant.correct_count += 1
+                participant.pending_correct += 1
+                participant.current_streak += 1
+                participant.best_streak = max(participant.best_streak, participant.current_streak)
+            else:
+                participant.wrong_count += 1
+                participant.pending_wrong += 1
+                participant.current_streak = 0
+
+            participant.total_score += points
+            participant.pending_score += points
+            leaderboards.update(self.board, *participant.board_row())
+
+            self.pending_answers.append({
+                "participant_id": participant.id,
+                "question_id": question_id,
+                "selected_answer": selected_answer,
+                "is_correct": is_correct,
+                "points_earned": points,
+                "time_to_answer_ms": time_to_answer_ms
+            })
+            self.dirty.add(participant.id)
+
+        return {
+            "is_correct": is_correct,
+            "points_earned": points,
+            "total_score": participant.total_score,
+            "current_streak": participant.current_streak
+        }
+
+    def leaderboard(self, limit: Optional[int] = None) -> List[Dict]:
+        """Leaderboard rows ordered by score, then streak (top `limit`, default all)."""
+        entries = leaderboards.top(self.board, limit or len(self.participants))
+        return [self._leaderboard_row(entry) for entry in entries]
+
+    def rank_of(self, participant: ParticipantScore) -> Optional[Dict]:
+        entry = leaderboards.rank(self.board, str(participant.id))
+        return self._leaderboard_row(entry) if entry else None
+
+    @staticmethod
+    def _leaderboard_row(entry) -> Dict:
+        return {
+            "rank": entry.rank,
+            "display_name": entry.info.get("display_name"),
+            "avatar_emoji": entry.info.get("avatar_emoji"),
+            "total_score": entry.score,
+            "correct_count": entry.info.get("correct_count", 0),
+            "current_streak": entry.tiebreak
+        }
+
+
+class LiveQuizStateEngine:
+    """Registry of active live quiz sessions keyed by quiz id."""
+
+    FLUSH_BATCH_SIZE = 40      # One classroom answering the same question
+    FLUSH_INTERVAL = 2.0       # Seconds
+    SYNC_INTERVAL = 2.0        # Seconds a cached status / current question is trusted
+
+    _table = LiveQuizParticipant.__table__
+    # Counters are added, never overwritten, so concurrent writers add up
+    _apply_delta = update(_table).where(_table.c.id == bindparam("pid")).values(
+        total_score=func.coalesce(_table.c.total_score, 0) + bindparam("d_score"),
+        correct_count=func.coalesce(_table.c.correct_count, 0) + bindparam("d_correct"),
+        wrong_count=func.coalesce(_table.c.wrong_count, 0) + bindparam("d_wrong"),
+        current_streak=bindparam("streak"),
+        best_streak=case(
+            (func.coalesce(_table.c.best_streak, 0) < bindparam("best"), bindparam("best")),
+            else_=_table.c.best_streak
+        )
+    )
+
+    def __init__(self):
+        self._sessions: Dict[UUID, LiveQuizSession] = {}
+        self._lock = threading.Lock()
+
+    def get(self, quiz_id: UUID) -> Optional[LiveQuizSession]:
+        return self._sessions.get(quiz_id)
+
+    def load(self, db: Session, quiz: LiveQuiz) -> LiveQuizSession:
+        """Build session state for an active quiz (three queries)."""
+        questions = db.query(LiveQuizQuestion).filter(
+            LiveQuizQuestion.quiz_id == quiz.id
+        ).order_by(LiveQuizQuestion.order).all()
+
+        participants = db.query(LiveQuizParticipant, StudentProfile.user_id).join(
+            StudentProfile, StudentProfile.id == LiveQuizParticipant.student_id
+        ).filter(LiveQuizParticipant.quiz_id == quiz.id).all()
+
+        # Answers already persisted (non-empty only when reloading mid-quiz)
+        answered = db.query(LiveQuizAnswer.participant_id, LiveQuizAnswer.question_id).join(
+            LiveQuizParticipant, LiveQuizParticipant.id == LiveQuizAnswer.participant_id
+        ).filter(LiveQuizParticipant.quiz_id == quiz.id).all()
+
+        session = LiveQuizSession(quiz, questions, participants, answered)
+        with self._lock:
+            self._sessions[quiz.id] = session
+        return session
+
+    def get_or_load(self, db: Session, quiz_id: UUID) -> Optional[LiveQuizSession]:
+        """
+        Session of an active quiz, or None if it is not active. A cached
+        session is re-checked against the database once it is older than
+        SYNC_INTERVAL (another worker may have moved on or ended the quiz);
+        a missing one is loaded (e.g. after a restart).
+        """
+        session = self._sessions.get(quiz_id)
+        if session is not None and time.monotonic() - session.synced_at < self.SYNC_INTERVAL:
+            return session
+
+        quiz = db.execute(
+            select(LiveQuiz.status, LiveQuiz.current_question_index).where(LiveQuiz.id == quiz_id)
+        ).first()
+        if quiz is None or quiz.status != LiveQuizStatus.active:
+            if session is not None:
+                self.drop(quiz_id)
+            return None
+
+        if session is None:
+            return self.load(db, db.get(LiveQuiz, quiz_id))
+        with session.lock:
+            session.current_index = quiz.current_question_index or 0
+            session.synced_at = time.monotonic()
+        return session
+
+    def drop(self, quiz_id: UUID):
+        with self._lock:
+            session = self._sessions.pop(quiz_id, None)
+        if session is not None:
+            if session.pending_answers:
+                # The quiz was settled by another worker without them
+                logger.warning(
+                    f"Live quiz {quiz_id} ended elsewhere; {len(session.pending_answers)} unflushed answers discarded"
+                )
+            leaderboards.drop(session.board)
+
+    def should_flush(self, session: LiveQuizSession) -> bool:
+        return (
+            len(session.pending_answers) >= self.FLUSH_BATCH_SIZE
+            or (session.pending_answers and time.monotonic() - session.last_flush >= self.FLUSH_INTERVAL)
+        )
+
+    def flush(self, db: Session, session: LiveQuizSession) -> int:
+        """
+        Write pending answers (one bulk INSERT) and dirty participants'
+        score deltas (one executemany UPDATE), then reload the quiz's totals.
+        Caller commits. Returns number of answers written.
+        """
+        with session.lock:
+            answers = session.pending_answers
+            deltas = [session.participants[pid].take_delta() for pid in session.dirty]
+            session.pending_answers = []
+            session.dirty = set()
+            session.last_flush = time.monotonic()
+
+        if not answers and not deltas:
+            return 0
+
+        try:
+            applied = deltas
+            if answers:
+                duplicates = self._insert_answers(db, answers)
+                if duplicates:
+                    applied = self._without(deltas, duplicates)
+            if applied:
+                db.execute(self._apply_delta, applied)
+        except Exception:
+            # Put the batch back so the next flush retries it
+            with session.lock:
+                session.pending_answers = answers + session.pending_answers
+                for row in deltas:
+                    session.participants[row["pid"]].restore_delta(row)
+                    session.dirty.add(row["pid"])
+            raise
+
+        self._reload_totals(db, session)
+
+        # Loaded participant objects are now stale
+        for obj in list(db.identity_map.values()):
+            if isinstance(obj, LiveQuizParticipant):
+                db.expire(obj)
+
+        return len(answers)
+
+    @staticmethod
+    def _insert_answers(db: Session, answers: List[Dict]) -> List[Dict]:
+        """Bulk INSERT ... ON CONFLICT DO NOTHING; returns the answers already stored by another worker."""
+        dialect = db.get_bind().dialect.name
+        stmt = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(LiveQuizAnswer).values(
+            [{"id": uuid.uuid4(), **answer} for answer in answers]
+        ).on_conflict_do_nothing(
+            index_elements=["participant_id", "question_id"]
+        ).returning(LiveQuizAnswer.participant_id, LiveQuizAnswer.question_id)
+
+        written = {(row.participant_id, row.question_id) for row in db.execute(stmt)}
+        return [a for a in answers if (a["participant_id"], a["question_id"]) not in written]
+
+    @staticmethod
+    def _without(deltas: List[Dict], duplicates: List[Dict]) -> List[Dict]:
+        """Score deltas minus the points of answers that were not stored."""
+        deltas = {row["pid"]: dict(row) for row in deltas}
+        for answer in duplicates:
+            row = deltas.get(answer["participant_id"])
+            if row is None:
+                continue
+            row["d_score"] -= answer["points_earned"]
+            row["d_correct" if answer["is_correct"] else "d_wrong"] -= 1
+        return list(deltas.values())
+
+    def _reload_totals(self, db: Session, session: LiveQuizSession):
+        """Database totals (all workers' answers) plus what is still pending here."""
+        rows = db.execute(
+            select(
+                LiveQuizParticipant.id,
+                LiveQuizParticipant.total_score,
+                LiveQuizParticipant.correct_count,
+                LiveQuizParticipant.wrong_count,
+                LiveQuizParticipant.best_streak
+            ).where(LiveQuizParticipant.quiz_id == session.quiz_id)
+        ).all()
+
+        with session.lock:
+            for row in rows:
+                participant = session.participants.get(row.id)
+                if participant is None:
+                    continue
+                total_score = (row.total_score or 0) + participant.pending_score
+                changed = total_score != participant.total_score
+                participant.total_score = total_score
+                participant.correct_count = (row.correct_count or 0) + participant.pending_correct
+                participant.wrong_count = (row.wrong_count or 0) + participant.pending_wrong
+                participant.best_streak = max(participant.best_streak, row.best_streak or 0)
+                if changed:
+                    leaderboards.update(session.board, *participant.board_row())
+
+
+# Global engine instance (one per worker process)
+live_quiz_state = LiveQuizStateEngine()
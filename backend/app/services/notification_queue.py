@@ -0,0 +1,329 @@
+"""
+Notification Queue - send SMS/Telegram/Email in the background
+
+Endpoints call `await notification_queue.enqueue(...)` and return at once;
+provider latency no longer sits on the request path. Messages that must
+not be lost (e.g. invite credentials) use `send_now(...)` instead, which
+delivers before the request returns.
+
+- one queue per channel, each with its own worker pool, token bucket and
+  retry budget, so a slow SMTP server never delays OTP SMS
+- NotificationLog rows are written in bulk by a single flusher
+  (one INSERT ... VALUES per batch, final status included) instead of
+  two commits per message
+- in-process asyncio queues by default; set NOTIFICATION_QUEUE_REDIS_URL
+  (and install `redis`) to keep jobs in Redis lists, shared between
+  workers and surviving restarts
+
+Workers start lazily on the first enqueue and are stopped (drained) in
+the app lifespan.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from app.core.database import SessionLocal
+from app.core.errors import ServiceUnavailableError
+from app.models.notification import NotificationLog, NotificationStatus, NotificationType
+from app.services.telegram_broadcast import TokenBucket
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class NotificationJob:
+    channel: str
+    recipient: str
+    message: str
+    user_id: Optional[str] = None
+    subject: Optional[str] = None  # email only
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    attempts: int = 0
+
+
+async def _retry_delay(attempts: int):
+    """Jittered exponential backoff between delivery attempts."""
+    await asyncio.sleep(random.uniform(0, 2 ** attempts))
+
+
+# channel -> (workers, messages per second)
+CHANNEL_LIMITS = {
+    NotificationType.SMS.value: (int(os.getenv("SMS_WORKERS", 4)), float(os.getenv("SMS_RATE", 5))),
+    NotificationType.TELEGRAM.value: (int(os.getenv("TELEGRAM_WORKERS", 8)), float(os.getenv("TELEGRAM_RATE", 25))),
+    NotificationType.EMAIL.value: (int(os.getenv("EMAIL_WORKERS", 2)), float(os.getenv("EMAIL_RATE", 2))),
+}
+
+
+class MemoryJobBackend:
+    """asyncio.Queue per channel (jobs are lost if the process dies)."""
+
+    def __init__(self, maxsize: int = 10000):
+        self._queues = {channel: asyncio.Queue(maxsize) for channel in CHANNEL_LIMITS}
+
+    async def put(self, job: NotificationJob):
+        self._queues[job.channel].put_nowait(job)
+
+    async def get(self, channel: str) -> NotificationJob:
+        return await self._queues[channel].get()
+
+    def task_done(self, channel: str):
+        self._queues[channel].task_done()
+
+    async def size(self) -> Dict[str, int]:
+        return {channel: q.qsize() for channel, q in self._queues.items()}
+
+    async def join(self):
+        await asyncio.gather(*(q.join() for q in self._queues.values()))
+
+
+class RedisJobBackend:
+    """Redis list per channel (LPUSH / BRPOP)."""
+
+    KEY_PREFIX = "alif24:notifications:"
+
+    def __init__(self, url: str):
+        self._redis = aioredis.from_url(url)
+
+    async def put(self, job: NotificationJob):
+        await self._redis.lpush(self.KEY_PREFIX + job.channel, json.dumps(asdict(job)))
+
+    async def get(self, channel: str) -> NotificationJob:
+        _, raw = await self._redis.brpop(self.KEY_PREFIX + channel, timeout=0)
+        return NotificationJob(**json.loads(raw))
+
+    def task_done(self, channel: str):
+        pass
+
+    async def size(self) -> Dict[str, int]:
+        return {channel: await self._redis.llen(self.KEY_PREFIX + channel) for channel in CHANNEL_LIMITS}
+
+    async def join(self):
+        pass  # jobs stay in Redis for the next worker
+
+
+class NotificationQueue:
+    MAX_ATTEMPTS = 3
+    FLUSH_INTERVAL = 1.0  # seconds
+    FLUSH_BATCH_SIZE = 200
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self._redis_url = redis_url
+        self._backend = None
+        self._tasks: List[asyncio.Task] = []
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._results: List[Dict[str, Any]] = []
+        self._flush_event: Optional[asyncio.Event] = None
+        self.sent = 0
+        self.failed = 0
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    def _make_backend(self):
+        if self._redis_url and aioredis is not None:
+            return RedisJobBackend(self._redis_url)
+        if self._redis_url:
+            logger.warning("NOTIFICATION_QUEUE_REDIS_URL set but redis is not installed; using memory queue")
+        return MemoryJobBackend()
+
+    def start(self):
+        """Start channel workers and the log flusher on the running loop."""
+        if self.started:
+            return
+        self._backend = self._make_backend()
+        self._flush_event = asyncio.Event()
+        for channel, (workers, rate) in CHANNEL_LIMITS.items():
+            self._buckets[channel] = TokenBucket(rate)
+            for _ in range(workers):
+                self._tasks.append(asyncio.create_task(self._worker(channel)))
+        self._tasks.append(asyncio.create_task(self._flusher()))
+        logger.info(f"Notification queue started ({type(self._backend).__name__})")
+
+    async def stop(self, timeout: float = 10.0):
+        """Drain queued jobs (up to timeout), stop workers, write remaining logs."""
+        if not self.started:
+            return
+        try:
+            await asyncio.wait_for(self._backend.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Notification queue stopped with jobs pending: {await self._backend.size()}")
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._flush()
+
+    async def enqueue(
+        self,
+        channel: NotificationType,
+        recipient: str,
+        message: str,
+        user_id=None,
+        subject: Optional[str] = None
+    ) -> str:
+        """Queue a notification; returns the id its NotificationLog row will have."""
+        if not self.started:
+            self.start()
+        job = NotificationJob(
+            channel=NotificationType(channel).value,
+            recipient=recipient,
+            message=message,
+            user_id=str(user_id) if user_id else None,
+            subject=subject
+        )
+        try:
+            await self._backend.put(job)
+        except asyncio.QueueFull:
+            logger.warning(f"{job.channel} notification queue is full; rejecting job")
+            raise ServiceUnavailableError("Xabarlar navbati to'lgan. Birozdan so'ng qayta urinib ko'ring")
+        return job.id
+
+    async def send_now(
+        self,
+        channel: NotificationType,
+        recipient: str,
+        message: str,
+        user_id=None,
+        subject: Optional[str] = None
+    ) -> bool:
+        """
+        Deliver on the request path (same retries and rate limit as the
+        workers); returns True if the message was sent. Used for messages
+        that must not be lost when the process is frozen or recycled right
+        after the response, as on serverless.
+        """
+        if not self.started:
+            self.start()
+        job = NotificationJob(
+            channel=NotificationType(channel).value,
+            recipient=recipient,
+            message=message,
+            user_id=str(user_id) if user_id else None,
+            subject=subject
+        )
+        return await self._run(job, self._buckets[job.channel])
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    async def _deliver(self, job: NotificationJob):
+        from app.services.notification_service import deliver_sms, deliver_telegram
+        from app.services.email_service import EmailService
+
+        if job.channel == NotificationType.SMS.value:
+            await deliver_sms(job.recipient, job.message)
+        elif job.channel == NotificationType.TELEGRAM.value:
+            await deliver_telegram(job.recipient, job.message)
+        else:
+            await asyncio.to_thread(
+                EmailService().send_email,
+                email_to=job.recipient, subject=job.subject or "", html_content=job.message
+            )
+
+    async def _worker(self, channel: str):
+        bucket = self._buckets[channel]
+        while True:
+            job = await self._backend.get(channel)
+            try:
+                await self._run(job, bucket)
+            finally:
+                self._backend.task_done(channel)
+
+    async def _run(self, job: NotificationJob, bucket: TokenBucket) -> bool:
+        error = None
+        while job.attempts < self.MAX_ATTEMPTS:
+            job.attempts += 1
+            await bucket.acquire()
+            try:
+                await self._deliver(job)
+                error = None
+                break
+            except Exception as e:
+                error = e
+                if job.attempts < self.MAX_ATTEMPTS:
+                    await _retry_delay(job.attempts)
+
+        if error is None:
+            self.sent += 1
+        else:
+            self.failed += 1
+            logger.error(f"{job.channel} notification to {job.recipient} failed: {error}")
+        self._record(job, error)
+        return error is None
+
+    # ------------------------------------------------------------------
+    # Bulk log writes
+    # ------------------------------------------------------------------
+
+    def _record(self, job: NotificationJob, error: Optional[Exception]):
+        self._results.append({
+            "id": uuid.UUID(job.id),
+            "user_id": uuid.UUID(job.user_id) if job.user_id else None,
+            "notification_type": job.channel,
+            "recipient": job.recipient,
+            # HTML content is too large to log fully
+            "message": f"Subject: {job.subject}" if job.channel == NotificationType.EMAIL.value else job.message,
+            "status": (NotificationStatus.FAILED if error else NotificationStatus.SENT).value,
+            "error_message": str(error) if error else None,
+            "created_at": datetime.fromisoformat(job.created_at),
+            "sent_at": None if error else datetime.now(),
+        })
+        if len(self._results) >= self.FLUSH_BATCH_SIZE:
+            self._flush_event.set()
+
+    async def _flusher(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), self.FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            await self._flush()
+
+    async def _flush(self):
+        if not self._results:
+            return
+        rows, self._results = self._results, []
+        try:
+            await asyncio.to_thread(self._write_logs, rows)
+        except Exception as e:
+            logger.error(f"Notification log flush failed ({len(rows)} rows): {e}")
+
+    @staticmethod
+    def _write_logs(rows: List[Dict[str, Any]]):
+        db = SessionLocal()
+        try:
+            db.execute(insert(NotificationLog), rows)
+            db.commit()
+        finally:
+            db.close()
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self._backend).__name__ if self._backend else None,
+            "queued": await self._backend.size() if self._backend else {},
+            "sent": self.sent,
+            "failed": self.failed,
+            "unflushed_logs": len(self._results)
+        }
+
+
+# Global queue instance (one per worker process)
+notification_queue = NotificationQueue(redis_url=os.getenv("NOTIFICATION_QUEUE_REDIS_URL"))
@@ -1,13 +1,99 @@
+import asyncio
 import httpx
 import logging
+import time
+from typing import Optional
 from sqlalchemy.orm import Session
 from datetime import datetime
 from app.core.config import settings
+from app.core.http_clients import http_clients
 from app.models.notification import NotificationLog, NotificationType, NotificationStatus
 from app.services.email_service import EmailService
 
 logger = logging.getLogger(__name__)
 
+
+class EskizAuth:
+    """
+    Eskiz bearer token cache. Tokens live 30 days; we log in again after
+    TOKEN_TTL or when Eskiz answers 401, and only one login runs at a time.
+    """
+    LOGIN_URL = "https://notify.eskiz.uz/api/auth/login"
+    TOKEN_TTL = 25 * 24 * 3600  # seconds
+
+    def __init__(self):
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def get_token(self, client: httpx.AsyncClient, force_refresh: bool = False) -> str:
+        if not force_refresh and self._token and time.monotonic() < self._expires_at:
+            return self._token
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not force_refresh and self._token and time.monotonic() < self._expires_at:
+                return self._token
+
+            auth_response = await client.post(
+                self.LOGIN_URL,
+                data={"email": settings.ESKIZ_EMAIL, "password": settings.ESKIZ_PASSWORD}
+            )
+            if auth_response.status_code != 200:
+                raise Exception(f"Eskiz Auth Failed: {auth_response.text}")
+
+            self._token = auth_response.json()["data"]["token"]
+            self._expires_at = time.monotonic() + self.TOKEN_TTL
+            return self._token
+
+    def invalidate(self):
+        self._token = None
+
+
+# Global Eskiz token cache (one per worker process)
+eskiz_auth = EskizAuth()
+
+
+async def deliver_sms(recipient: str, message: str):
+    """Send one SMS via Eskiz.uz; raises on failure. No logging to DB."""
+    client = http_clients.get("eskiz")
+
+    for attempt in range(2):
+        # 1. Get Token (cached; refreshed once if Eskiz rejects it)
+        token = await eskiz_auth.get_token(client, force_refresh=attempt > 0)
+
+        # 2. Send SMS
+        send_response = await client.post(
+            "https://notify.eskiz.uz/api/message/sms/send",
+            headers={"Authorization": f"Bearer {token}"},
+            data={
+                "mobile_phone": recipient.replace("+", "").replace(" ", ""),
+                "message": message,
+                "from": "4546" # Standard Eskiz ID, change if you have a brand name
+            }
+        )
+        if send_response.status_code != 401:
+            break
+
+    if send_response.status_code != 200:
+        raise Exception(f"Eskiz Send Failed: {send_response.text}")
+
+
+async def deliver_telegram(chat_id: str, message: str):
+    """Send one Telegram message; raises on failure. No logging to DB."""
+    if not settings.TELEGRAM_BOT_TOKEN:
+        raise Exception("Telegram Bot Token not configured")
+
+    response = await http_clients.get("telegram").post(
+        f"https://api.telegram.org/bot{settings.TELEGRAM_BOT_TOKEN}/sendMessage",
+        json={"chat_id": chat_id, "text": message}
+    )
+
+    if response.status_code != 200:
+        raise Exception(f"Telegram Send Failed: {response.text}")
+
+
 class NotificationService:
     def __init__(self, db: Session):
         self.db = db
@@ -30,37 +116,13 @@ class NotificationService:
         self.db.refresh(log)
 
         try:
-            # 1. Get Token (In production, cache this token)
-            async with httpx.AsyncClient() as client:
-                auth_response = await client.post(
-                    "https://notify.eskiz.uz/api/auth/login",
-                    data={"email": settings.ESKIZ_EMAIL, "password": settings.ESKIZ_PASSWORD}
-                )
-                
-                if auth_response.status_code != 200:
-                    raise Exception(f"Eskiz Auth Failed: {auth_response.text}")
-                
-                token = auth_response.json()["data"]["token"]
-
-                # 2. Send SMS
-                send_response = await client.post(
-                    "https://notify.eskiz.uz/api/message/sms/send",
-                    headers={"Authorization": f"Bearer {token}"},
-                    data={
-                        "mobile_phone": recipient.replace("+", "").replace(" ", ""),
-                        "message": message,
-                        "from": "4546" # Standard Eskiz ID, change if you have a brand name
-                    }
-                )
-
-                if send_response.status_code != 200:
-                    raise Exception(f"Eskiz Send Failed: {send_response.text}")
-
-                # Update log
-                log.status = NotificationStatus.SENT
-                log.sent_at = datetime.now()
-                self.db.commit()
-                return True
+            await deliver_sms(recipient, message)
+
+            # Update log
+            log.status = NotificationStatus.SENT
+            log.sent_at = datetime.now()
+            self.db.commit()
+            return True
 
         except Exception as e:
             logger.error(f"SMS Error: {e}")
@@ -86,23 +148,13 @@ class NotificationService:
         self.db.refresh(log)
 
         try:
-            if not settings.TELEGRAM_BOT_TOKEN:
-                raise Exception("Telegram Bot Token not configured")
-
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"https://api.telegram.org/bot{settings.TELEGRAM_BOT_TOKEN}/sendMessage",
-                    json={"chat_id": chat_id, "text": message}
-                )
-
-                if response.status_code != 200:
-                    raise Exception(f"Telegram Send Failed: {response.text}")
-
-                # Update log
-                log.status = NotificationStatus.SENT
-                log.sent_at = datetime.now()
-                self.db.commit()
-                return True
+            await deliver_telegram(chat_id, message)
+
+            # Update log
+            log.status = NotificationStatus.SENT
+            log.sent_at = datetime.now()
+            self.db.commit()
+            return True
 
         except Exception as e:
             logger.error(f"Telegram Error: {e}")
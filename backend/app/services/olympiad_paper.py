@@ -0,0 +1,113 @@
+"""
+Olympiad Paper - questions without answers, compiled once per olympiad
+
+When an olympiad starts, every registered student calls /begin within a
+few seconds. The paper is the same for all of them, so it is serialized
+once (when the moderator starts the olympiad, or on the first request a
+worker sees) and every participant gets the same bytes and strong ETag.
+The questions table is read once per olympiad per worker instead of once
+per participant.
+
+The compiled paper also carries the answer key (question id -> correct
+option, points) so answers are scored in memory; the key is never part
+of the serialized body.
+
+Papers are immutable while the olympiad is active. Each paper is stamped
+with the olympiad's updated_at; add_questions bumps it, so every worker
+recompiles on its next request instead of serving a stale cached copy.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.models import Olympiad, OlympiadQuestion
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OlympiadPaper:
+    olympiad_id: str
+    body: bytes  # pre-serialized JSON
+    etag: str  # quoted strong ETag
+    duration_minutes: int
+    questions_count: int
+    answer_key: Dict[str, Tuple[int, int]]  # question id -> (correct option, points)
+    updated_at: Optional[datetime] = None  # olympiad.updated_at it was compiled from
+
+
+class OlympiadPaperCache:
+    TTL = 6 * 3600  # longer than any olympiad window
+
+    def __init__(self):
+        self._papers = TTLCache(maxsize=64, ttl=self.TTL)
+        self._lock = threading.Lock()
+        self.compiled = 0
+
+    def compile(self, db: Session, olympiad: Olympiad) -> OlympiadPaper:
+        """Serialize the paper for this olympiad and cache it."""
+        questions = db.query(OlympiadQuestion).filter(
+            OlympiadQuestion.olympiad_id == olympiad.id
+        ).order_by(OlympiadQuestion.order).all()
+
+        body = json.dumps({
+            "olympiad_id": str(olympiad.id),
+            "olympiad_title": olympiad.title,
+            "duration_minutes": olympiad.duration_minutes,
+            "questions": [
+                {
+                    "id": str(q.id),
+                    "order": q.order,
+                    "text": q.question_text,
+                    "image": q.question_image,
+                    "options": q.options,
+                    "points": q.points
+                }
+                for q in questions
+            ]
+        }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        paper = OlympiadPaper(
+            olympiad_id=str(olympiad.id),
+            body=body,
+            etag=f'"{hashlib.sha256(body).hexdigest()}"',
+            duration_minutes=olympiad.duration_minutes,
+            questions_count=len(questions),
+            answer_key={str(q.id): (q.correct_answer, q.points) for q in questions},
+            updated_at=olympiad.updated_at
+        )
+        self._papers.set(paper.olympiad_id, paper)
+        self.compiled += 1
+        logger.info(f"Olympiad {paper.olympiad_id} paper compiled: {len(questions)} questions, {len(body)} bytes")
+        return paper
+
+    def get(self, db: Session, olympiad: Olympiad) -> OlympiadPaper:
+        """Cached paper, (re)compiling it on the first request in this worker
+        and whenever the olympiad changed since it was compiled."""
+        paper = self._papers.get(str(olympiad.id))
+        if paper is not None and paper.updated_at == olympiad.updated_at:
+            return paper
+        with self._lock:
+            paper = self._papers.get(str(olympiad.id))
+            if paper is None or paper.updated_at != olympiad.updated_at:
+                paper = self.compile(db, olympiad)
+        return paper
+
+    def invalidate(self, olympiad_id: UUID):
+        self._papers.delete(str(olympiad_id))
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._papers.stats(), "compiled": self.compiled}
+
+
+# Global paper cache (one per worker process)
+olympiad_papers = OlympiadPaperCache()
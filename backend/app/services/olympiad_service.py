@@ -3,12 +3,13 @@ Olympiad Service - Business logic for Olympiad operations
 Only moderators can create olympiads.
 Only monthly subscribers can participate.
 """
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple, TYPE_CHECKING
 from uuid import UUID
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy import and_, or_, insert, update, select, case, func
 
+from app.core.cache import TTLCache
 from app.core.errors import BadRequestError, NotFoundError, ForbiddenError
 from app.models import (
     User, UserRole, AccountStatus,
@@ -16,13 +17,44 @@ from app.models import (
     ModeratorProfile, ModeratorRoleType,
     Olympiad, OlympiadQuestion, OlympiadParticipant, OlympiadAnswer,
     OlympiadStatus, OlympiadSubject, ParticipationStatus,
-    StudentCoin, CoinTransaction, TransactionType
+    TransactionType
 )
+from app.services.coin_ledger import CoinAward, CoinLedger
+from app.services.leaderboard import TIEBREAK_LIMIT, leaderboards
+from app.services.olympiad_paper import OlympiadPaper, olympiad_papers
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# Upcoming/active olympiad listing, the same for every student (one per worker process).
+# Dropped on register and status changes in this worker; other workers see them within the TTL.
+upcoming_olympiads_cache = TTLCache(maxsize=1, ttl=30)
+
+
+def _listing_row(o: Olympiad) -> Dict:
+    return {
+        "id": str(o.id),
+        "title": o.title,
+        "subject": o.subject.value,
+        "status": o.status.value,
+        "registration_start": o.registration_start.isoformat(),
+        "registration_end": o.registration_end.isoformat(),
+        "start_time": o.start_time.isoformat(),
+        "min_age": o.min_age,
+        "max_age": o.max_age,
+        "participants_count": o.participants_count,
+        "max_participants": o.max_participants
+    }
 
 
 class OlympiadService:
     """Service for olympiad operations"""
     
+    # In-memory live boards are re-read from the database at most this often
+    # per worker (answers handled by other workers show up within this window)
+    LEADERBOARD_SYNC_SECONDS = 10
+    
     def __init__(self, db: Session):
         self.db = db
     
@@ -107,7 +139,10 @@ class OlympiadService:
             )
             self.db.add(question)
         
+        # Stale papers cached by other workers are recompiled on this stamp
+        olympiad.updated_at = datetime.now(timezone.utc)
         self.db.commit()
+        olympiad_papers.invalidate(olympiad_id)
         
         return {
             "message": f"{len(questions)} ta savol qo'shildi",
@@ -126,6 +161,7 @@ class OlympiadService:
         
         olympiad.status = OlympiadStatus.upcoming
         self.db.commit()
+        upcoming_olympiads_cache.clear()
         
         return {"message": "Olimpiada e'lon qilindi", "status": "upcoming"}
     
@@ -140,6 +176,10 @@ class OlympiadService:
         
         olympiad.status = OlympiadStatus.active
         self.db.commit()
+        upcoming_olympiads_cache.clear()
+        
+        # Compile the paper now, before students start requesting it
+        olympiad_papers.compile(self.db, olympiad)
         
         return {"message": "Olimpiada boshlandi", "status": "active"}
     
@@ -157,6 +197,7 @@ class OlympiadService:
         
         olympiad.status = OlympiadStatus.finished
         self.db.commit()
+        upcoming_olympiads_cache.clear()
         
         return {"message": "Olimpiada tugadi. Natijalar hisoblandi.", "status": "finished"}
     
@@ -167,27 +208,19 @@ class OlympiadService:
     def get_upcoming_olympiads(self) -> List[Dict]:
         """
         Get all upcoming and active olympiads.
+        Participant counts come from the participants_count column (no per-row COUNT).
         """
+        cached = upcoming_olympiads_cache.get("upcoming")
+        if cached is not None:
+            return cached
+        
         olympiads = self.db.query(Olympiad).filter(
             Olympiad.status.in_([OlympiadStatus.upcoming, OlympiadStatus.active])
         ).order_by(Olympiad.start_time).all()
         
-        return [
-            {
-                "id": str(o.id),
-                "title": o.title,
-                "subject": o.subject.value,
-                "status": o.status.value,
-                "registration_start": o.registration_start.isoformat(),
-                "registration_end": o.registration_end.isoformat(),
-                "start_time": o.start_time.isoformat(),
-                "min_age": o.min_age,
-                "max_age": o.max_age,
-                "participants_count": len(o.participants),
-                "max_participants": o.max_participants
-            }
-            for o in olympiads
-        ]
+        listing = [_listing_row(o) for o in olympiads]
+        upcoming_olympiads_cache.set("upcoming", listing)
+        return listing
     
     def register_student(
         self,
@@ -218,6 +251,24 @@ class OlympiadService:
         if olympiad.status != OlympiadStatus.upcoming:
             raise BadRequestError("Bu olimpiadaga ro'yxatdan o'tish vaqti tugagan")
         
+        # Take a seat: the counter is checked and increased in one statement,
+        # which also locks the olympiad row so concurrent registrations queue here
+        seats_taken = self.db.execute(
+            update(Olympiad)
+            .where(
+                Olympiad.id == olympiad_id,
+                Olympiad.status == OlympiadStatus.upcoming,
+                Olympiad.participants_count < Olympiad.max_participants
+            )
+            .values(participants_count=Olympiad.participants_count + 1)
+            .returning(Olympiad.participants_count),
+            execution_options={"synchronize_session": False}
+        ).scalar()
+        
+        if seats_taken is None:
+            self.db.rollback()
+            raise BadRequestError("Olimpiadada joy qolmadi")
+        
         # Check if already registered
         existing = self.db.query(OlympiadParticipant).filter(
             and_(
@@ -227,12 +278,9 @@ class OlympiadService:
         ).first()
         
         if existing:
+            self.db.rollback()  # give the seat back
             raise BadRequestError("Siz allaqachon ro'yxatdan o'tgansiz")
         
-        # Check max participants
-        if len(olympiad.participants) >= olympiad.max_participants:
-            raise BadRequestError("Olimpiadada joy qolmadi")
-        
         # Register
         participant = OlympiadParticipant(
             olympiad_id=olympiad_id,
@@ -240,22 +288,26 @@ class OlympiadService:
             status=ParticipationStatus.registered
         )
         
+        olympiad_title = olympiad.title
         self.db.add(participant)
         self.db.commit()
+        upcoming_olympiads_cache.clear()
         
         return {
             "message": "Olimpiadaga muvaffaqiyatli ro'yxatdan o'tdingiz",
-            "olympiad_title": olympiad.title
+            "olympiad_title": olympiad_title
         }
     
     def start_olympiad_for_student(
         self,
         student_user_id: UUID,
         olympiad_id: UUID
-    ) -> Dict:
+    ) -> Tuple[OlympiadPaper, datetime]:
         """
         Student starts taking the olympiad.
-        Returns questions without correct answers.
+        Returns the shared precompiled paper (questions without correct
+        answers) and this participant's start time.
+        Calling it again after a reconnect resumes without resetting the timer.
         """
         participant = self._get_participant(student_user_id, olympiad_id)
         olympiad = participant.olympiad
@@ -267,29 +319,26 @@ class OlympiadService:
             raise BadRequestError("Siz allaqachon olimpiadani tugatgansiz")
         
         # Mark as started
-        participant.status = ParticipationStatus.started
-        participant.started_at = datetime.utcnow()
-        self.db.commit()
+        if participant.status != ParticipationStatus.started:
+            participant.status = ParticipationStatus.started
+            participant.started_at = datetime.utcnow()
+            self.db.commit()
+            
+            student_name = self.db.query(User.first_name).filter(User.id == student_user_id).scalar()
+            self._update_leaderboard(participant, {"student_name": student_name})
         
-        # Get questions (without correct answers)
-        questions = [
-            {
-                "id": str(q.id),
-                "order": q.order,
-                "text": q.question_text,
-                "image": q.question_image,
-                "options": q.options,
-                "points": q.points
-            }
-            for q in olympiad.questions
-        ]
+        return olympiad_papers.get(self.db, olympiad), participant.started_at
+    
+    def get_paper_for_student(self, student_user_id: UUID, olympiad_id: UUID) -> OlympiadPaper:
+        """
+        Paper for a participant who has already started (page reload).
+        """
+        participant = self._get_participant(student_user_id, olympiad_id)
         
-        return {
-            "olympiad_title": olympiad.title,
-            "duration_minutes": olympiad.duration_minutes,
-            "questions": questions,
-            "started_at": participant.started_at.isoformat()
-        }
+        if participant.status != ParticipationStatus.started:
+            raise BadRequestError("Avval olimpiadani boshlang")
+        
+        return olympiad_papers.get(self.db, participant.olympiad)
     
     def submit_answer(
         self,
@@ -301,22 +350,11 @@ class OlympiadService:
         """
         Submit answer for a single question.
         """
-        participant = self._get_participant(student_user_id, olympiad_id)
+        participant, time_spent = self._get_started_participant(student_user_id, olympiad_id)
         
-        if participant.status != ParticipationStatus.started:
-            raise BadRequestError("Avval olimpiadani boshlang")
-        
-        # Check time limit
-        time_spent = (datetime.utcnow() - participant.started_at).total_seconds()
-        if time_spent > (participant.olympiad.duration_minutes * 60):
-            raise BadRequestError("Vaqt tugadi")
-        
-        # Get question
-        question = self.db.query(OlympiadQuestion).filter(
-            OlympiadQuestion.id == question_id
-        ).first()
-        
-        if not question or question.olympiad_id != olympiad_id:
+        # Score against the cached answer key (no question lookup)
+        answer_key = olympiad_papers.get(self.db, participant.olympiad).answer_key
+        if str(question_id) not in answer_key:
             raise NotFoundError("Savol topilmadi")
         
         # Check if already answered
@@ -331,8 +369,9 @@ class OlympiadService:
             raise BadRequestError("Bu savolga allaqachon javob bergansiz")
         
         # Check answer
-        is_correct = (selected_answer == question.correct_answer)
-        points = question.points if is_correct else 0
+        correct_answer, question_points = answer_key[str(question_id)]
+        is_correct = (selected_answer == correct_answer)
+        points = question_points if is_correct else 0
         
         # Save answer
         answer = OlympiadAnswer(
@@ -354,6 +393,7 @@ class OlympiadService:
             participant.wrong_answers += 1
         
         self.db.commit()
+        self._update_leaderboard(participant)
         
         return {
             "is_correct": is_correct,
@@ -361,6 +401,77 @@ class OlympiadService:
             "total_score": participant.total_score
         }
     
+    def submit_answer_sheet(
+        self,
+        student_user_id: UUID,
+        olympiad_id: UUID,
+        answers: List[Dict]
+    ) -> Dict:
+        """
+        Submit several answers in one call (the whole sheet, or answers the
+        client buffered). answers = [{"question_id": ..., "selected_answer": 0}, ...]
+        Scored in memory, stored with one bulk INSERT and one commit.
+        Questions that already have an answer are skipped, so resending is safe.
+        """
+        participant, time_spent = self._get_started_participant(student_user_id, olympiad_id)
+        answer_key = olympiad_papers.get(self.db, participant.olympiad).answer_key
+        
+        # First answer per question wins, same as one-by-one submission
+        sheet = {}
+        for answer in answers:
+            question_id = str(answer["question_id"])
+            if question_id not in answer_key:
+                raise NotFoundError("Savol topilmadi")
+            sheet.setdefault(question_id, answer["selected_answer"])
+        
+        answered = {
+            str(question_id) for (question_id,) in self.db.query(OlympiadAnswer.question_id).filter(
+                OlympiadAnswer.participant_id == participant.id
+            )
+        }
+        
+        rows = []
+        for question_id, selected_answer in sheet.items():
+            if question_id in answered:
+                continue
+            correct_answer, question_points = answer_key[question_id]
+            is_correct = (selected_answer == correct_answer)
+            rows.append({
+                "participant_id": participant.id,
+                "question_id": UUID(question_id),
+                "selected_answer": selected_answer,
+                "is_correct": is_correct,
+                "points_earned": question_points if is_correct else 0,
+                "time_spent_seconds": int(time_spent)
+            })
+        
+        if rows:
+            self.db.execute(insert(OlympiadAnswer), rows)
+            correct_count = sum(1 for row in rows if row["is_correct"])
+            participant.total_score += sum(row["points_earned"] for row in rows)
+            participant.correct_answers += correct_count
+            participant.wrong_answers += len(rows) - correct_count
+        
+        self.db.commit()
+        if rows:
+            self._update_leaderboard(participant)
+        
+        return {
+            "accepted": len(rows),
+            "skipped": len(sheet) - len(rows),
+            "results": [
+                {
+                    "question_id": str(row["question_id"]),
+                    "is_correct": row["is_correct"],
+                    "points_earned": row["points_earned"]
+                }
+                for row in rows
+            ],
+            "total_score": participant.total_score,
+            "correct_answers": participant.correct_answers,
+            "wrong_answers": participant.wrong_answers
+        }
+    
     def finish_olympiad_for_student(
         self,
         student_user_id: UUID,
@@ -381,6 +492,7 @@ class OlympiadService:
         )
         
         self.db.commit()
+        self._update_leaderboard(participant)
         
         return {
             "message": "Olimpiada tugatildi",
@@ -390,9 +502,15 @@ class OlympiadService:
             "time_spent_seconds": participant.time_spent_seconds
         }
     
-    def get_olympiad_results(self, olympiad_id: UUID) -> List[Dict]:
+    def get_olympiad_results(
+        self,
+        olympiad_id: UUID,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict]:
         """
         Get public leaderboard for olympiad.
+        Final results never change, so each worker loads them once.
         """
         olympiad = self.db.query(Olympiad).filter(Olympiad.id == olympiad_id).first()
         if not olympiad:
@@ -401,22 +519,51 @@ class OlympiadService:
         if olympiad.status != OlympiadStatus.finished:
             raise BadRequestError("Olimpiada hali tugamagan")
         
-        participants = self.db.query(OlympiadParticipant).filter(
-            OlympiadParticipant.olympiad_id == olympiad_id
-        ).order_by(OlympiadParticipant.rank).all()
+        board = self._sync_leaderboard(olympiad_id, final=True)
+        entries = leaderboards.top(board, limit or leaderboards.size(board), offset)
         
         return [
             {
-                "rank": p.rank,
-                "student_name": p.student.user.first_name,
-                "total_score": p.total_score,
-                "correct_answers": p.correct_answers,
-                "time_spent_seconds": p.time_spent_seconds,
-                "coins_earned": p.coins_earned
+                "rank": e.info["rank"],
+                "student_name": e.info["student_name"],
+                "total_score": e.score,
+                "correct_answers": e.info["correct_answers"],
+                "time_spent_seconds": e.info["time_spent_seconds"],
+                "coins_earned": e.info["coins_earned"]
             }
-            for p in participants if p.status == ParticipationStatus.completed
+            for e in entries
         ]
     
+    def get_live_leaderboard(self, olympiad_id: UUID, limit: int = 10) -> List[Dict]:
+        """
+        Top participants while the olympiad runs (score, then finishing time);
+        the final top with the same fields once it is finished.
+        """
+        olympiad = self.db.query(Olympiad).filter(Olympiad.id == olympiad_id).first()
+        if not olympiad:
+            raise NotFoundError("Olimpiada topilmadi")
+        
+        final = olympiad.status == OlympiadStatus.finished
+        if not final and olympiad.status != OlympiadStatus.active:
+            raise BadRequestError("Olimpiada hali boshlanmagan")
+        
+        board = self._sync_leaderboard(olympiad_id, final=final)
+        return [self._live_row(e, final) for e in leaderboards.top(board, limit)]
+    
+    def get_my_rank(self, student_user_id: UUID, olympiad_id: UUID) -> Dict:
+        """
+        Student's current (or final) place in the olympiad.
+        """
+        participant = self._get_participant(student_user_id, olympiad_id)
+        final = participant.olympiad.status == OlympiadStatus.finished
+        
+        board = self._sync_leaderboard(olympiad_id, final=final)
+        entry = leaderboards.rank(board, str(participant.id))
+        if entry is None:
+            return {"rank": None, "total_score": participant.total_score, "participants_count": leaderboards.size(board)}
+        
+        return {**self._live_row(entry, final), "participants_count": leaderboards.size(board)}
+    
     def get_student_olympiad_history(self, student_user_id: UUID) -> List[Dict]:
         """
         Get student's olympiad participation history.
@@ -462,27 +609,135 @@ class OlympiadService:
         
         return olympiad
     
-    def _get_participant(self, student_user_id: UUID, olympiad_id: UUID) -> OlympiadParticipant:
-        """Get participant by student user ID."""
-        student_profile = self.db.query(StudentProfile).filter(
-            StudentProfile.user_id == student_user_id
-        ).first()
-        
-        if not student_profile:
-            raise NotFoundError("O'quvchi profili topilmadi")
-        
-        participant = self.db.query(OlympiadParticipant).filter(
+    def _get_participant(
+        self,
+        student_user_id: UUID,
+        olympiad_id: UUID,
+        lock: bool = False
+    ) -> OlympiadParticipant:
+        """
+        Get participant (with its olympiad) by student user ID in one query.
+        lock=True takes a row lock on the participant so concurrent answer
+        submissions from the same student are applied one after another.
+        """
+        query = self.db.query(OlympiadParticipant).join(
+            StudentProfile, OlympiadParticipant.student_id == StudentProfile.id
+        ).join(
+            OlympiadParticipant.olympiad
+        ).options(
+            contains_eager(OlympiadParticipant.olympiad)
+        ).filter(
             and_(
                 OlympiadParticipant.olympiad_id == olympiad_id,
-                OlympiadParticipant.student_id == student_profile.id
+                StudentProfile.user_id == student_user_id
             )
-        ).first()
+        )
+        if lock:
+            query = query.with_for_update(of=OlympiadParticipant)
+        participant = query.first()
         
         if not participant:
+            student_exists = self.db.query(StudentProfile.id).filter(
+                StudentProfile.user_id == student_user_id
+            ).first()
+            if not student_exists:
+                raise NotFoundError("O'quvchi profili topilmadi")
             raise NotFoundError("Siz bu olimpiadaga ro'yxatdan o'tmagansiz")
         
         return participant
     
+    def _get_started_participant(self, student_user_id: UUID, olympiad_id: UUID) -> Tuple[OlympiadParticipant, float]:
+        """Locked participant who is taking the olympiad now, and seconds since start."""
+        participant = self._get_participant(student_user_id, olympiad_id, lock=True)
+        
+        if participant.status != ParticipationStatus.started:
+            raise BadRequestError("Avval olimpiadani boshlang")
+        
+        # Check time limit
+        time_spent = (datetime.utcnow() - participant.started_at).total_seconds()
+        if time_spent > (participant.olympiad.duration_minutes * 60):
+            raise BadRequestError("Vaqt tugadi")
+        
+        return participant, time_spent
+    
+    @staticmethod
+    def _leaderboard_name(olympiad_id: UUID, final: bool = False) -> str:
+        return f"olympiad:{olympiad_id}:final" if final else f"olympiad:{olympiad_id}"
+    
+    @staticmethod
+    def _leaderboard_tiebreak(participant) -> int:
+        """Finished participants rank above unfinished ones, faster first."""
+        if participant.status != ParticipationStatus.completed:
+            return 0
+        return max(TIEBREAK_LIMIT - 1 - (participant.time_spent_seconds or 0), 1)
+    
+    def _update_leaderboard(self, participant: OlympiadParticipant, info: Optional[Dict] = None):
+        """Apply a participant's new score to the live board (no query)."""
+        board = self._leaderboard_name(participant.olympiad_id)
+        if leaderboards.needs_sync(board):
+            return  # not loaded in this worker yet; the first read loads it from the database
+        leaderboards.update(
+            board,
+            str(participant.id),
+            participant.total_score,
+            self._leaderboard_tiebreak(participant),
+            {
+                **(info or {}),
+                "correct_answers": participant.correct_answers,
+                "completed": participant.status == ParticipationStatus.completed
+            }
+        )
+    
+    def _sync_leaderboard(self, olympiad_id: UUID, final: bool) -> str:
+        """
+        Load the board from the database if this worker does not have it
+        (live boards: or it is older than LEADERBOARD_SYNC_SECONDS). One query.
+        """
+        board = self._leaderboard_name(olympiad_id, final)
+        if not leaderboards.needs_sync(board, None if final else self.LEADERBOARD_SYNC_SECONDS):
+            return board
+        
+        statuses = [ParticipationStatus.completed] if final else [
+            ParticipationStatus.started, ParticipationStatus.completed
+        ]
+        rows = self.db.query(OlympiadParticipant, User.first_name).join(
+            StudentProfile, OlympiadParticipant.student_id == StudentProfile.id
+        ).join(
+            User, StudentProfile.user_id == User.id
+        ).filter(
+            OlympiadParticipant.olympiad_id == olympiad_id,
+            OlympiadParticipant.status.in_(statuses)
+        ).all()
+        
+        leaderboards.replace(board, [
+            (
+                str(p.id),
+                p.total_score or 0,
+                self._leaderboard_tiebreak(p),
+                {
+                    "student_name": first_name,
+                    "correct_answers": p.correct_answers,
+                    "completed": p.status == ParticipationStatus.completed,
+                    "time_spent_seconds": p.time_spent_seconds,
+                    "rank": p.rank,
+                    "coins_earned": p.coins_earned
+                }
+            )
+            for p, first_name in rows
+        ])
+        return board
+    
+    @staticmethod
+    def _live_row(entry, final: bool = False) -> Dict:
+        return {
+            # Final boards keep the stored rank (ties share a place)
+            "rank": entry.info["rank"] if final else entry.rank,
+            "student_name": entry.info.get("student_name"),
+            "total_score": entry.score,
+            "correct_answers": entry.info.get("correct_answers", 0),
+            "completed": entry.info.get("completed", False)
+        }
+    
     def _check_student_subscription(self, student_profile: StudentProfile) -> bool:
         """
         Check if student has active subscription via parent.
@@ -501,59 +756,85 @@ class OlympiadService:
         # Check subscription_plan field
         return parent_profile.subscription_plan in ['basic', 'premium', 'trial']
     
+    # Prize by dense rank; everyone else who completed gets the participation bonus
+    RANK_PRIZES = {
+        1: (500, TransactionType.olympiad_first),
+        2: (300, TransactionType.olympiad_second),
+        3: (100, TransactionType.olympiad_third),
+    }
+    PARTICIPATION_PRIZE = (10, TransactionType.olympiad_participation)
+    
     def _calculate_rankings(self, olympiad_id: UUID):
         """
         Calculate final rankings and award coins.
+        Ranks are computed in the database (dense rank by score, then time
+        spent) and written with one UPDATE ... FROM; the coins are paid out
+        through the coin ledger in a few bulk statements.
         """
-        participants = self.db.query(OlympiadParticipant).filter(
+        ranked = select(
+            OlympiadParticipant.id.label("participant_id"),
+            func.dense_rank().over(
+                order_by=(
+                    OlympiadParticipant.total_score.desc(),
+                    OlympiadParticipant.time_spent_seconds.asc()
+                )
+            ).label("rank")
+        ).where(
             and_(
                 OlympiadParticipant.olympiad_id == olympiad_id,
                 OlympiadParticipant.status == ParticipationStatus.completed
             )
-        ).order_by(
-            OlympiadParticipant.total_score.desc(),
-            OlympiadParticipant.time_spent_seconds.asc()
-        ).all()
+        ).subquery()
         
-        for rank, participant in enumerate(participants, 1):
-            participant.rank = rank
-            
-            # Award coins based on rank
-            if rank == 1:
-                participant.coins_earned = 500
-                self._add_coins(participant.student_id, 500, TransactionType.olympiad_first)
-            elif rank == 2:
-                participant.coins_earned = 300
-                self._add_coins(participant.student_id, 300, TransactionType.olympiad_second)
-            elif rank == 3:
-                participant.coins_earned = 100
-                self._add_coins(participant.student_id, 100, TransactionType.olympiad_third)
-            else:
-                # Participation bonus
-                participant.coins_earned = 10
-                self._add_coins(participant.student_id, 10, TransactionType.olympiad_participation)
+        prize_amount = case(
+            *[(ranked.c.rank == rank, amount) for rank, (amount, _) in self.RANK_PRIZES.items()],
+            else_=self.PARTICIPATION_PRIZE[0]
+        )
         
-        self.db.commit()
-    
-    def _add_coins(self, student_id: UUID, amount: int, transaction_type: TransactionType):
-        """Add coins to student balance."""
-        # Get or create coin balance
-        coin_balance = self.db.query(StudentCoin).filter(
-            StudentCoin.student_id == student_id
-        ).first()
+        ranked_rows = self.db.execute(
+            update(OlympiadParticipant)
+            .where(OlympiadParticipant.id == ranked.c.participant_id)
+            .values(rank=ranked.c.rank, coins_earned=prize_amount)
+            .returning(OlympiadParticipant.student_id, OlympiadParticipant.rank, OlympiadParticipant.coins_earned),
+            execution_options={"synchronize_session": False}
+        ).all()
         
-        if not coin_balance:
-            coin_balance = StudentCoin(student_id=student_id)
-            self.db.add(coin_balance)
-            self.db.flush()
+        CoinLedger(self.db).award_many(
+            CoinAward(
+                student_id=row.student_id,
+                amount=row.coins_earned,
+                type=self.RANK_PRIZES.get(row.rank, self.PARTICIPATION_PRIZE)[1],
+                description="Olimpiada mukofoti",
+                reference_id=olympiad_id,
+                reference_type="olympiad"
+            )
+            for row in ranked_rows
+        )
         
-        coin_balance.add_coins(amount, transaction_type)
+        self.db.commit()
         
-        # Record transaction
-        transaction = CoinTransaction(
-            student_coin_id=coin_balance.id,
-            type=transaction_type,
-            amount=amount,
-            description=f"Olimpiada mukofoti"
-        )
-        self.db.add(transaction)
+        # Results are served from the final board from now on
+        leaderboards.drop(self._leaderboard_name(olympiad_id))
+
+
+class AsyncOlympiadService:
+    """Read-only olympiad queries on an AsyncSession (public listing)."""
+    
+    def __init__(self, db: "AsyncSession"):
+        self.db = db
+    
+    async def get_upcoming_olympiads(self) -> List[Dict]:
+        """Get all upcoming and active olympiads (shares the listing cache)."""
+        cached = upcoming_olympiads_cache.get("upcoming")
+        if cached is not None:
+            return cached
+        
+        olympiads = (await self.db.scalars(
+            select(Olympiad)
+            .where(Olympiad.status.in_([OlympiadStatus.upcoming, OlympiadStatus.active]))
+            .order_by(Olympiad.start_time)
+        )).all()
+        
+        listing = [_listing_row(o) for o in olympiads]
+        upcoming_olympiads_cache.set("upcoming", listing)
+        return listing
@@ -0,0 +1,156 @@
+"""
+Reading Stats Service - daily rollups of reading analyses
+
+save_analysis adds each ReadingAnalysis to its user's row for the day
+(reading_daily_stats) in the same transaction, with one
+INSERT ... ON CONFLICT (user_id, day) DO UPDATE SET x = x + excluded.x.
+Concurrent saves for the same day add up correctly.
+
+History and dashboard reads then touch at most one row per day instead
+of every analysis a heavy reader has ever saved. Averages are sums
+divided by session counts. The save endpoint always sends scores
+(0.0 by default), so this matches averaging the raw rows. The exception
+is legacy analyses with a NULL score: AVG skipped them, the rollups
+count them as 0.
+
+When init_db (not the alembic migration) creates reading_daily_stats,
+backfill() fills it from reading_analyses at startup.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict
+from uuid import UUID
+
+from sqlalchemy import Date, cast, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import ReadingAnalysis, ReadingDailyStat
+
+# Rolled-up counters: ReadingDailyStat column -> ReadingAnalysis attribute
+ROLLUP_COLUMNS = {
+    "total_words": "total_words_read",
+    "reading_time_seconds": "reading_time_seconds",
+    "speech_errors": "speech_errors",
+    "pronunciation_sum": "pronunciation_score",
+    "fluency_sum": "fluency_score",
+    "comprehension_sum": "comprehension_score",
+    "answer_quality_sum": "answer_quality_score",
+}
+
+
+def _avg(total, sessions) -> float:
+    return round(float(total or 0) / sessions, 1) if sessions else 0.0
+
+
+class ReadingStatsService:
+    """Daily reading rollups (write path and history reads)."""
+
+    RECENT_LIMIT = 10
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(self, analysis: ReadingAnalysis, day: date = None):
+        """Add one analysis to its day's rollup. The caller commits."""
+        values = {column: getattr(analysis, attr) or 0 for column, attr in ROLLUP_COLUMNS.items()}
+        dialect = self.db.get_bind().dialect.name
+        insert = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(ReadingDailyStat)
+
+        stmt = insert.values(
+            user_id=analysis.user_id,
+            day=day or datetime.utcnow().date(),
+            sessions=1,
+            **values
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ReadingDailyStat.user_id, ReadingDailyStat.day],
+            set_={
+                "sessions": ReadingDailyStat.sessions + 1,
+                "updated_at": func.now(),
+                **{column: getattr(ReadingDailyStat, column) + stmt.excluded[column] for column in values}
+            }
+        )
+        self.db.execute(stmt)
+
+    def get_history(self, user_id: UUID, days: int = 30) -> Dict:
+        """Totals, per-day stats and recent analyses for the last N days."""
+        start_date = datetime.utcnow() - timedelta(days=days)
+
+        daily = self.db.query(ReadingDailyStat).filter(
+            ReadingDailyStat.user_id == user_id,
+            ReadingDailyStat.day >= start_date.date()
+        ).order_by(ReadingDailyStat.day).all()
+
+        recent = self.db.query(ReadingAnalysis).filter(
+            ReadingAnalysis.user_id == user_id,
+            ReadingAnalysis.session_date >= start_date
+        ).order_by(ReadingAnalysis.session_date.desc()).limit(self.RECENT_LIMIT).all()
+
+        total_sessions = sum(d.sessions for d in daily)
+
+        return {
+            "total_sessions": total_sessions,
+            "total_words": sum(d.total_words for d in daily),
+            "avg_pronunciation": _avg(sum(d.pronunciation_sum for d in daily), total_sessions),
+            "avg_fluency": _avg(sum(d.fluency_sum for d in daily), total_sessions),
+            "avg_comprehension": _avg(sum(d.comprehension_sum for d in daily), total_sessions),
+            "total_speech_errors": sum(d.speech_errors for d in daily),
+            "daily_stats": [self._daily_row(d) for d in daily],
+            "recent_analyses": [
+                {
+                    "id": str(a.id),
+                    "date": a.session_date.isoformat(),
+                    "story_title": a.story_title,
+                    "words_read": a.total_words_read,
+                    "pronunciation_score": a.pronunciation_score,
+                    "comprehension_score": a.comprehension_score,
+                    "speech_errors": a.speech_errors
+                }
+                for a in recent
+            ]
+        }
+
+    @staticmethod
+    def _daily_row(d: ReadingDailyStat) -> Dict:
+        return {
+            "date": str(d.day),
+            "total_words": d.total_words,
+            "avg_errors": _avg(d.speech_errors, d.sessions),
+            "avg_comprehension": _avg(d.comprehension_sum, d.sessions),
+            "avg_answers": _avg(d.answer_quality_sum, d.sessions)
+        }
+
+    @staticmethod
+    def backfill(conn) -> int:
+        """Roll up every existing analysis into an empty reading_daily_stats (INSERT ... SELECT ... GROUP BY)."""
+        if conn.dialect.name == "postgresql":
+            new_id, day = func.gen_random_uuid(), cast(ReadingAnalysis.session_date, Date)
+        else:
+            # UUID columns are 32-char hex strings off PostgreSQL
+            new_id, day = func.lower(func.hex(func.randomblob(16))), func.date(ReadingAnalysis.session_date)
+
+        rollups = select(
+            new_id,
+            ReadingAnalysis.user_id,
+            day,
+            func.count(),
+            *[func.coalesce(func.sum(getattr(ReadingAnalysis, attr)), 0) for attr in ROLLUP_COLUMNS.values()]
+        ).group_by(ReadingAnalysis.user_id, day)
+
+        return conn.execute(
+            insert(ReadingDailyStat).from_select(["id", "user_id", "day", "sessions", *ROLLUP_COLUMNS], rollups)
+        ).rowcount
+
+    @staticmethod
+    def totals_query(user_id: UUID):
+        """All-time totals from the rollup (one row; sums are NULL for new users)."""
+        return select(
+            func.sum(ReadingDailyStat.sessions).label("total_sessions"),
+            func.sum(ReadingDailyStat.total_words).label("total_words"),
+            (func.sum(ReadingDailyStat.pronunciation_sum) / func.nullif(func.sum(ReadingDailyStat.sessions), 0)).label("avg_pronunciation"),
+            (func.sum(ReadingDailyStat.comprehension_sum) / func.nullif(func.sum(ReadingDailyStat.sessions), 0)).label("avg_comprehension"),
+            func.sum(ReadingDailyStat.speech_errors).label("total_errors")
+        ).where(
+            ReadingDailyStat.user_id == user_id
+        )
@@ -1,75 +1,181 @@
-import requests
+"""
+Azure Speech gateway - shared async TTS client for all letter/speech routers
+
+- STS access token cached for its 10-minute validity (refreshed at 9 min)
+- shared keep-alive "azure_speech" client (app.core.http_clients)
+- synthesized MP3 cached in memory (LRU) and on disk, keyed by the SSML
+  (text + voice + prosody), so repeated letter sounds never hit Azure
+- concurrent requests for the same audio share one upstream call
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from typing import Optional
+from xml.sax.saxutils import escape
+
+import httpx
 from fastapi import HTTPException
+
+from app.core.cache import DiskCache, SingleFlight, TTLCache
 from app.core.config import settings
+from app.core.http_clients import http_clients
+
+logger = logging.getLogger(__name__)
+
 
 class AzureSpeechService:
+    TOKEN_TTL = 9 * 60  # Azure tokens are valid for 10 minutes
+    OUTPUT_FORMAT = "audio-16khz-128kbitrate-mono-mp3"
+    MEMORY_MAXSIZE = int(os.getenv("TTS_CACHE_MEMORY_SIZE", 512))  # clips
+    DISK_MAX_BYTES = int(os.getenv("TTS_CACHE_DISK_MB", 200)) * 1024 * 1024
+    DISK_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "alif24_tts"))
+
     def __init__(self):
-        self.speech_key = settings.AZURE_SPEECH_KEY
-        self.speech_region = settings.AZURE_SPEECH_REGION
-        self.token_url = f"https://{self.speech_region}.api.cognitive.microsoft.com/sts/v1.0/issueToken"
-        self.tts_url = f"https://{self.speech_region}.tts.speech.microsoft.com/cognitiveservices/v1"
-        self.access_token = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._token: Optional[str] = None
+        self._token_expires_at = 0.0
+        self._token_lock: Optional[asyncio.Lock] = None
+        self._memory = TTLCache(maxsize=self.MEMORY_MAXSIZE, ttl=None)
+        self._disk = DiskCache(self.DISK_DIR, max_bytes=self.DISK_MAX_BYTES, suffix=".mp3")
+        self._flight = SingleFlight()
+        self.token_refreshes = 0
+        self.synth_calls = 0
+
+    @property
+    def speech_key(self) -> str:
+        return settings.AZURE_SPEECH_KEY
 
-    def _get_access_token(self):
+    @property
+    def speech_region(self) -> str:
+        return settings.AZURE_SPEECH_REGION
+
+    @property
+    def token_url(self) -> str:
+        return f"https://{self.speech_region}.api.cognitive.microsoft.com/sts/v1.0/issueToken"
+
+    @property
+    def tts_url(self) -> str:
+        return f"https://{self.speech_region}.tts.speech.microsoft.com/cognitiveservices/v1"
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client or http_clients.get("azure_speech")
+
+    async def _get_access_token(self, force_refresh: bool = False) -> str:
         """
         Fetch an access token from Azure Cognitive Services.
-        Tokens are valid for 10 minutes. 
-        For simplicity in this lightweight implementation, we fetch a new one each time 
-        or rely on the browser/client to retry if 401. 
-         Ideally, cache this for 9 mins.
+        The token is reused until shortly before its 10-minute expiry;
+        concurrent callers wait on one refresh.
         """
-        headers = {
-            "Ocp-Apim-Subscription-Key": self.speech_key
-        }
-        try:
-            response = requests.post(self.token_url, headers=headers)
-            response.raise_for_status()
-            return response.text
-        except requests.exceptions.RequestException as e:
-            raise HTTPException(status_code=500, detail=f"Failed to authenticate with Azure Speech: {e}")
-
-    def generate_speech(self, text: str, voice_name: str = "uz-UZ-MadinaNeural") -> bytes:
+        if not force_refresh and self._token and time.monotonic() < self._token_expires_at:
+            return self._token
+
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+        async with self._token_lock:
+            # Another request may have refreshed while we waited
+            if not force_refresh and self._token and time.monotonic() < self._token_expires_at:
+                return self._token
+            try:
+                response = await self.client.post(
+                    self.token_url,
+                    headers={"Ocp-Apim-Subscription-Key": self.speech_key}
+                )
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                raise HTTPException(status_code=500, detail=f"Failed to authenticate with Azure Speech: {e}")
+            self._token = response.text
+            self._token_expires_at = time.monotonic() + self.TOKEN_TTL
+            self.token_refreshes += 1
+            return self._token
+
+    def build_ssml(self, text: str, language: str = "uz-UZ", voice_name: str = "uz-UZ-MadinaNeural",
+                   rate: Optional[str] = None) -> str:
+        """Standard SSML, optionally wrapped in <prosody rate=...>"""
+        body = escape(text)
+        if rate:
+            body = f"<prosody rate='{rate}'>{body}</prosody>"
+        return f"""<speak version='1.0' xml:lang='{language}'>
+            <voice name='{voice_name}'>
+                {body}
+            </voice>
+        </speak>"""
+
+    @staticmethod
+    def cache_key(ssml: str) -> str:
+        # SSML carries text, voice and prosody; whitespace is not significant
+        normalized = " ".join(ssml.split())
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    async def synthesize(self, ssml: str) -> bytes:
         """
-        Convert text to speech using Azure TTS REST API.
-        Returns raw MP3 audio bytes.
+        Convert SSML to MP3 bytes, served from cache when possible.
         """
         if not self.speech_key or not self.speech_region:
             raise HTTPException(status_code=500, detail="Azure Speech configuration missing")
 
-        # 1. Get Token
-        token = self._get_access_token()
-
-        # 2. Construct SSML
-        # Escaping XML chars in text is important, but for now assuming simple text
-        # A robust solution needs xml.sax.saxutils.escape(text)
-        from xml.sax.saxutils import escape
-        escaped_text = escape(text)
-        
-        ssml = f"""
-        <speak version='1.0' xml:lang='uz-UZ'>
-            <voice xml:lang='uz-UZ' xml:gender='Female' name='{voice_name}'>
-                {escaped_text}
-            </voice>
-        </speak>
+        key = self.cache_key(ssml)
+        audio = self._memory.get(key)
+        if audio is not None:
+            return audio
+
+        audio = await asyncio.to_thread(self._disk.get, key)
+        if audio is not None:
+            self._memory.set(key, audio)
+            return audio
+
+        async def produce():
+            result = await self._request_audio(ssml)
+            self._memory.set(key, result)
+            await asyncio.to_thread(self._disk.set, key, result)
+            return result
+
+        return await self._flight.do(key, produce)
+
+    async def _request_audio(self, ssml: str) -> bytes:
+        self.synth_calls += 1
+        data = ssml.encode("utf-8")
+        for attempt in range(2):
+            token = await self._get_access_token(force_refresh=attempt > 0)
+            try:
+                response = await self.client.post(self.tts_url, headers={
+                    "Authorization": f"Bearer {token}",
+                    "Content-Type": "application/ssml+xml",
+                    "X-Microsoft-OutputFormat": self.OUTPUT_FORMAT,
+                    "User-Agent": "Alif24-Backend"
+                }, content=data)
+            except httpx.HTTPError as e:
+                raise HTTPException(status_code=500, detail=f"Azure TTS failed: {e}")
+
+            if response.status_code == 401 and attempt == 0:
+                # Token revoked or clock skew: refresh once and retry
+                logger.info("Azure TTS returned 401, refreshing token")
+                continue
+            if response.is_error:
+                raise HTTPException(status_code=500, detail=f"Azure TTS failed: {response.text}")
+            return response.content
+
+    async def generate_speech(self, text: str, voice_name: str = "uz-UZ-MadinaNeural",
+                              language: str = "uz-UZ", rate: Optional[str] = None) -> bytes:
         """
+        Convert text to speech using Azure TTS REST API.
+        Returns raw MP3 audio bytes.
+        """
+        return await self.synthesize(self.build_ssml(text, language, voice_name, rate))
 
-        # 3. Send TTS Request
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/ssml+xml",
-            "X-Microsoft-OutputFormat": "audio-16khz-128kbitrate-mono-mp3",
-            "User-Agent": "Alif24-Backend"
+    def stats(self) -> dict:
+        return {
+            "memory": self._memory.stats(),
+            "disk": self._disk.stats(),
+            "coalesced": self._flight.coalesced,
+            "synth_calls": self.synth_calls,
+            "token_refreshes": self.token_refreshes
         }
 
-        try:
-            response = requests.post(self.tts_url, headers=headers, data=ssml.encode('utf-8'))
-            response.raise_for_status()
-            return response.content
-        except requests.exceptions.RequestException as e:
-            # Try to get error text from response
-            error_detail = str(e)
-            if hasattr(e, 'response') and e.response is not None:
-                error_detail = e.response.text
-            raise HTTPException(status_code=500, detail=f"Azure TTS failed: {error_detail}")
 
+# Global speech service instance (one per worker process)
 speech_service = AzureSpeechService()
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from app.repositories.student_repository import StudentRepository
 from app.services.base_service import BaseService
 from app.services.coin_service import CoinService
+from app.services.dashboard_service import invalidate_dashboard
 from app.models import Progress, ProgressStatus, Lesson, TeacherTest, TestResult
 
 class StudentService(BaseService):
@@ -84,6 +85,7 @@ class StudentService(BaseService):
             coin_reward = total_reward
 
         self.db.commit()
+        invalidate_dashboard(student_user_id)
 
         return {
             "success": True,
@@ -8,15 +8,17 @@ Full-featured Telegram bot with:
 - Webhook support
 """
 
-import httpx
 import logging
 import asyncio
 import secrets
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
+from sqlalchemy import exists, func, or_, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.http_clients import http_clients
 from app.models.phone_verification import PhoneVerification, TelegramUser
 from app.models.rbac_models import User, StudentProfile
 
@@ -37,17 +39,16 @@ class TelegramBotService:
     async def _make_request(self, method: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
         """Make request to Telegram API"""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.api_url}/{method}",
-                    json=data or {}
-                )
-                result = response.json()
+            response = await http_clients.get("telegram").post(
+                f"{self.api_url}/{method}",
+                json=data or {}
+            )
+            result = response.json()
+            
+            if not result.get("ok"):
+                logger.error(f"Telegram API error: {result}")
                 
-                if not result.get("ok"):
-                    logger.error(f"Telegram API error: {result}")
-                    
-                return result
+            return result
         except Exception as e:
             logger.error(f"Telegram request failed: {e}")
             return {"ok": False, "error": str(e)}
@@ -502,51 +503,120 @@ Hoziroq boshlang! 🚀"""
     # QUIZ METHODS
     # ============================================================
 
+    BROADCAST_BATCH_SIZE = 500
+    BROADCAST_LEASE = timedelta(minutes=2)  # a running broadcast not updated for this long is resumable
+
     async def send_daily_quiz_to_all(self) -> int:
-        """Send a random quiz question to all users"""
-        # 1. Get a random active question
-        import random
-        from app.models.quiz import QuizQuestion, QuizAttempt
-        
-        questions = self.db.query(QuizQuestion).filter(QuizQuestion.is_active == True).all()
-        if not questions:
-            return 0
-            
-        question = random.choice(questions)
-        
-        # 2. Get all telegram users
-        users = self.db.query(TelegramUser).filter(TelegramUser.notifications_enabled == True).all()
-        
-        sent_count = 0
-        for user in users:
-            # Check if already attempted this question
-            existing_attempt = self.db.query(QuizAttempt).filter(
-                QuizAttempt.user_id == user.user_id,
-                QuizAttempt.question_id == question.id
-            ).first()
-            
-            if existing_attempt:
-                continue
-                
-            # Send question with inline buttons
-            keyboard = {
-                "inline_keyboard": [
-                    [{"text": opt, "callback_data": f"quiz:{question.id}:{idx}"}]
-                    for idx, opt in enumerate(question.options)
-                ]
-            }
-            
-            message = f"🧠 *Kunlik Savol*\n\n{question.question_text}\n\nJavobni tanlang:"
-            
-            await self._make_request("sendMessage", {
-                "chat_id": user.telegram_chat_id,
-                "text": message,
-                "parse_mode": "Markdown",
-                "reply_markup": keyboard
-            })
-            sent_count += 1
-            
-        return sent_count
+        """
+        Send a random quiz question to all users who have not answered it.
+
+        Recipients are read in TelegramUser.id pages with an anti-join on
+        QuizAttempt and sent concurrently at Telegram's rate limit. After
+        each page the checkpoint is committed, so an interrupted broadcast
+        resumes where it stopped (a page may be re-sent, never skipped).
+
+        Returns the number of messages sent by this call.
+        """
+        from app.models.quiz import QuizQuestion, QuizAttempt, QuizBroadcast
+        from app.services.telegram_broadcast import TelegramBroadcaster, BroadcastResult
+
+        # 1. Resume an interrupted broadcast, or start today's.
+        # Both claims are single statements, so concurrent runs cannot both win.
+        now = datetime.utcnow()
+        broadcast = self.db.query(QuizBroadcast).filter(
+            QuizBroadcast.status == "running"
+        ).order_by(QuizBroadcast.started_at.desc()).first()
+
+        if broadcast:
+            # Take over the lease only if nobody has touched it recently
+            claimed = self.db.execute(
+                update(QuizBroadcast).where(
+                    QuizBroadcast.id == broadcast.id,
+                    QuizBroadcast.status == "running",
+                    or_(QuizBroadcast.updated_at.is_(None), QuizBroadcast.updated_at < now - self.BROADCAST_LEASE)
+                ).values(updated_at=now)
+            ).rowcount
+            self.db.commit()
+            if not claimed:
+                logger.info(f"Quiz broadcast {broadcast.id} is already running")
+                return 0
+            self.db.refresh(broadcast)
+            question = broadcast.question
+            logger.info(f"Resuming quiz broadcast {broadcast.id} after {broadcast.last_recipient_id}")
+        else:
+            question = self.db.query(QuizQuestion).filter(
+                QuizQuestion.is_active == True
+            ).order_by(func.random()).first()
+            if not question:
+                return 0
+            dialect = self.db.get_bind().dialect.name
+            insert = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(QuizBroadcast)
+            broadcast_id = self.db.execute(
+                insert.values(question_id=question.id, day=now.date(), updated_at=now)
+                .on_conflict_do_nothing(index_elements=[QuizBroadcast.day])
+                .returning(QuizBroadcast.id)
+            ).scalar()
+            self.db.commit()
+            if broadcast_id is None:
+                logger.info("Today's quiz broadcast was already started")
+                return 0
+            broadcast = self.db.get(QuizBroadcast, broadcast_id)
+
+        keyboard = {
+            "inline_keyboard": [
+                [{"text": opt, "callback_data": f"quiz:{question.id}:{idx}"}]
+                for idx, opt in enumerate(question.options)
+            ]
+        }
+        message = f"🧠 *Kunlik Savol*\n\n{question.question_text}\n\nJavobni tanlang:"
+
+        # 2. Users who have not attempted this question (NOT EXISTS, no per-user query)
+        already_attempted = exists().where(
+            QuizAttempt.user_id == TelegramUser.user_id,
+            QuizAttempt.question_id == question.id
+        )
+        recipients = self.db.query(TelegramUser.id, TelegramUser.telegram_chat_id).filter(
+            TelegramUser.notifications_enabled == True,
+            ~already_attempted
+        ).order_by(TelegramUser.id)
+
+        # 3. Send page by page, checkpointing after each
+        total = BroadcastResult()
+        broadcaster = TelegramBroadcaster(self.api_url)
+        while True:
+            page = recipients
+            if broadcast.last_recipient_id is not None:
+                page = page.filter(TelegramUser.id > broadcast.last_recipient_id)
+            batch = page.limit(self.BROADCAST_BATCH_SIZE).all()
+            if not batch:
+                break
+
+            result = await broadcaster.send_many(
+                ("sendMessage", {
+                    "chat_id": chat_id,
+                    "text": message,
+                    "parse_mode": "Markdown",
+                    "reply_markup": keyboard
+                })
+                for _, chat_id in batch
+            )
+            total.add(result)
+
+            broadcast.last_recipient_id = batch[-1].id
+            broadcast.sent_count = (broadcast.sent_count or 0) + result.sent
+            broadcast.failed_count = (broadcast.failed_count or 0) + result.failed
+            broadcast.blocked_count = (broadcast.blocked_count or 0) + result.blocked
+            broadcast.updated_at = datetime.utcnow()
+            self.db.commit()
+
+        broadcast.status = "completed"
+        broadcast.finished_at = datetime.utcnow()
+        self.db.commit()
+        logger.info(
+            f"Quiz broadcast {broadcast.id} done: sent={total.sent} "
+            f"failed={total.failed} rejected={total.blocked}"
+        )
+        return total.sent
 
     async def handle_callback_query(self, callback_query: Dict[str, Any]) -> None:
         """Handle inline button clicks"""
@@ -0,0 +1,130 @@
+"""
+Telegram Broadcast Engine
+
+Sends one message to many chats within Telegram's limits:
+- the shared keep-alive "telegram" client (app.core.http_clients)
+- token bucket pacing (Telegram allows ~30 msg/s per bot)
+- bounded number of in-flight requests
+- 429 handling: parameters.retry_after pauses every sender, then retries
+- transient network/5xx errors retried with backoff
+
+Progress checkpointing is left to the caller (see
+TelegramBotService.send_daily_quiz_to_all), which feeds recipients in
+batches and records the last completed one.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import httpx
+
+from app.core.http_clients import http_clients
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Async token bucket; pause() blocks all acquirers (used on 429)."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+
+@dataclass
+class BroadcastResult:
+    sent: int = 0
+    failed: int = 0
+    blocked: int = 0  # rejected by Telegram: bot blocked, chat not found, bad request
+
+    def add(self, other: "BroadcastResult"):
+        self.sent += other.sent
+        self.failed += other.failed
+        self.blocked += other.blocked
+
+
+class TelegramBroadcaster:
+    """Paced, concurrent sender."""
+
+    RATE = float(os.getenv("TELEGRAM_BROADCAST_RATE", 25))  # messages per second
+    CONCURRENCY = int(os.getenv("TELEGRAM_BROADCAST_CONCURRENCY", 20))
+    MAX_RETRIES = 3
+
+    def __init__(self, api_url: str, client: Optional[httpx.AsyncClient] = None):
+        self.api_url = api_url
+        self._client = client or http_clients.get("telegram")
+        self._bucket = TokenBucket(self.RATE)
+        self._limiter = asyncio.Semaphore(self.CONCURRENCY)
+
+    async def send(self, method: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Call a Bot API method, honouring the rate limit and retry_after."""
+        async with self._limiter:
+            for attempt in range(self.MAX_RETRIES + 1):
+                await self._bucket.acquire()
+                try:
+                    response = await self._client.post(f"{self.api_url}/{method}", json=payload)
+                    result = response.json()
+                except (httpx.HTTPError, ValueError) as e:
+                    result = {"ok": False, "error_code": None, "description": str(e)}
+
+                if result.get("ok"):
+                    return result
+
+                code = result.get("error_code")
+                if code == 429:
+                    retry_after = (result.get("parameters") or {}).get("retry_after", 1)
+                    logger.warning(f"Telegram 429, pausing broadcast for {retry_after}s")
+                    self._bucket.pause(retry_after)
+                    continue
+                if code is None or code >= 500:
+                    await asyncio.sleep(random.uniform(0, 2 ** attempt))
+                    continue
+                return result  # 400/403: not retryable
+            return result
+
+    async def send_many(self, messages: Iterable[Tuple[str, Dict[str, Any]]]) -> BroadcastResult:
+        """
+        Send (method, payload) pairs concurrently.
+        Returns counts; individual failures are logged, not raised.
+        """
+        result = BroadcastResult()
+
+        async def one(method: str, payload: Dict[str, Any]):
+            response = await self.send(method, payload)
+            if response.get("ok"):
+                result.sent += 1
+            elif response.get("error_code") in (400, 403):
+                result.blocked += 1
+            else:
+                result.failed += 1
+                logger.error(f"Telegram broadcast to {payload.get('chat_id')} failed: {response}")
+
+        await asyncio.gather(*(one(method, payload) for method, payload in messages))
+        return result
@@ -1,3 +1,4 @@
+import os
 import re
 import json
 import logging
@@ -7,14 +8,29 @@ try:
     import docx
 except ImportError:
     docx = None
-from pypdf import PdfReader
 import io
 import openai
 from openai import AsyncOpenAI
 from app.core.config import settings
+from app.core.errors import AppError
+from app.services.ai_gateway import ai_gateway
+from app.services.upload_cache import upload_cache
+from app.services.document_text import iter_pdf_pages
 
 logger = logging.getLogger(__name__)
 
+
+def extract_text(file_content: bytes, extension: str) -> str:
+    """Plain text of a docx/pdf/text upload (runs in document_pool)."""
+    if extension == '.docx':
+        doc = docx.Document(io.BytesIO(file_content))
+        return "\n".join([para.text for para in doc.paragraphs])
+    if extension == '.pdf':
+        return "\n".join(iter_pdf_pages(file_content))
+    # Try simple text decoding
+    return file_content.decode('utf-8')
+
+
 class TestBuilderService:
     def __init__(self):
         # Configure OpenAI Client
@@ -25,41 +41,27 @@ class TestBuilderService:
         if hasattr(settings, 'OPENAI_API_KEY') and settings.OPENAI_API_KEY and not settings.AZURE_OPENAI_KEY:
             self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
             
-        # 2. Try Azure OpenAI
+        # 2. Try Azure OpenAI: the shared gateway (pooled client, per-deployment limit, retries)
         elif hasattr(settings, 'AZURE_OPENAI_KEY') and settings.AZURE_OPENAI_KEY:
-            from openai import AsyncAzureOpenAI
-            self.client = AsyncAzureOpenAI(
-                api_key=settings.AZURE_OPENAI_KEY,
-                api_version=settings.AZURE_OPENAI_API_VERSION or "2023-05-15",
-                azure_endpoint=settings.AZURE_OPENAI_ENDPOINT
-            )
-            self.deployment_name = settings.AZURE_OPENAI_DEPLOYMENT_NAME or "gpt-35-turbo"
+            self.deployment_name = ai_gateway.default_model or "gpt-35-turbo"
 
     async def parse_file(self, file: UploadFile) -> List[Dict[str, Any]]:
         """
         Parses an uploaded file (docx/pdf) and extracts test questions.
         """
-        content = ""
         filename = file.filename.lower()
         
         try:
             file_content = await file.read()
-            file_stream = io.BytesIO(file_content)
             
-            if filename.endswith('.docx'):
-                if docx is None:
-                    raise HTTPException(status_code=400, detail="DOCX parsing is not supported in this environment (dependency missing).")
-                doc = docx.Document(file_stream)
-                content = "\n".join([para.text for para in doc.paragraphs])
-            elif filename.endswith('.pdf'):
-                reader = PdfReader(file_stream)
-                content = "\n".join([page.extract_text() for page in reader.pages])
-            else:
-                # Try simple text decoding
-                content = file_content.decode('utf-8')
+            if filename.endswith('.docx') and docx is None:
+                raise HTTPException(status_code=400, detail="DOCX parsing is not supported in this environment (dependency missing).")
+            content = await upload_cache.run(extract_text, file_content, os.path.splitext(filename)[1])
                 
             return self._parse_text_content(content)
             
+        except AppError:
+            raise
         except Exception as e:
             logger.error(f"Error parsing file: {e}")
             raise HTTPException(status_code=400, detail=f"File parsing error: {str(e)}")
@@ -173,7 +175,7 @@ class TestBuilderService:
         prompt_text: User's instruction (e.g. "Trigonometry 10 questions") or just a topic.
         """
         
-        if not self.client:
+        if not self.client and not self.deployment_name:
              # MOCK RESPONSE for testing without API Key
             return self._mock_ai_response(prompt_text, count)
 
@@ -199,19 +201,21 @@ class TestBuilderService:
         Difficulty: {difficulty}.
         """
 
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
         try:
-            model_name = "gpt-3.5-turbo"
             if self.deployment_name:
-                model_name = self.deployment_name # Azure uses deployment name as model
-                
-            response = await self.client.chat.completions.create(
-                model=model_name,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.7
-            )
+                # Azure uses deployment name as model
+                response = await ai_gateway.chat(messages, model=self.deployment_name, temperature=0.7)
+            else:
+                response = await self.client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=messages,
+                    temperature=0.7
+                )
             
             content = response.choices[0].message.content
             # Try to parse JSON from Markdown code block if present
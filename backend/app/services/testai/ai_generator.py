@@ -1,21 +1,16 @@
-from openai import AzureOpenAI
 from typing import List
-import os
 from .parsers import parse_tests
 from app.core.config import settings
+from app.services.ai_gateway import ai_gateway
 
 
 class AITestGenerator:
     def __init__(self, api_key: str = None):
-        # Use settings from env vars
-        self.client = AzureOpenAI(
-            api_key=api_key or settings.AZURE_OPENAI_KEY,
-            api_version=settings.AZURE_OPENAI_API_VERSION,
-            azure_endpoint=settings.AZURE_OPENAI_ENDPOINT
-        )
+        # Shared pooled client; a custom key reuses the same connections
+        self.api_key = api_key or settings.AZURE_OPENAI_KEY
         self.deployment_name = settings.AZURE_OPENAI_DEPLOYMENT_NAME
     
-    def generate_questions(self, topic: str, count: int = 5) -> List[dict]:
+    async def generate_questions(self, topic: str, count: int = 5) -> List[dict]:
         prompt = f"""
         {topic} mavzusida {count} ta test savoli yarating.
         Har bir savol 4 ta variantga ega bo'lsin.
@@ -30,8 +25,9 @@ class AITestGenerator:
         """
         
         try:
-            response = self.client.chat.completions.create(
+            response = await ai_gateway.chat(
                 model=self.deployment_name,
+                api_key=self.api_key,
                 messages=[
                     {"role": "system", "content": "Siz test savollari generatsiya qiluvchi yordamchisiz."},
                     {"role": "user", "content": prompt}
@@ -1,10 +1,6 @@
+import logging
 import re
-from typing import List, Dict
-try:
-    import pdfplumber
-except ImportError:
-    pdfplumber = None
-
+from typing import Dict, Iterable, Iterator, List, Optional
 try:
     from docx import Document
 except ImportError:
@@ -23,11 +19,18 @@ except ImportError:
 
 import io
 
+from app.services.document_text import iter_pdf_pages
+
+logger = logging.getLogger(__name__)
+
+# Part of the upload cache key (app.services.upload_cache): bump when the
+# parsed test format changes so cached parses are not served
+PARSER_VERSION = "3"
+
+
 def parse_special_format(text: str) -> List[Dict]:
     """++++, ====, # bilan ajratilgan maxsus format uchun parser"""
     
-    print(f"DEBUG: Maxsus format parser ishga tushdi. Matn uzunligi: {len(text)} belgi")
-    
     # Matnni bloklarga ajratish
     blocks = text.split('++++')
     tests = []
@@ -36,8 +39,6 @@ def parse_special_format(text: str) -> List[Dict]:
         block = block.strip()
         if not block:
             continue
-            
-        print(f"DEBUG: Blok {block_num + 1}: {block[:200]}...")
         
         # Savol va variantlarni ajratish
         parts = block.split('====')
@@ -58,7 +59,7 @@ def parse_special_format(text: str) -> List[Dict]:
                 clean_option = option[1:].strip()
                 clean_options.append(clean_option)
                 correct_answer = chr(65 + i)  # A, B, C, D
-                print(f"DEBUG: To'g'ri javob topildi: {correct_answer} - {clean_option}")
+                logger.debug(f"To'g'ri javob topildi: {correct_answer} - {clean_option}")
             else:
                 clean_options.append(option)
         
@@ -70,7 +71,7 @@ def parse_special_format(text: str) -> List[Dict]:
                     clean_option = option.replace('#', '').strip()
                     clean_options[i] = clean_option
                     correct_answer = chr(65 + i)
-                    print(f"DEBUG: Ichkarida # belgisi topildi: {correct_answer} - {clean_option}")
+                    logger.debug(f"Ichkarida # belgisi topildi: {correct_answer} - {clean_option}")
                     break
         
         # Agar to'g'ri javob topilmasa, variant ichida # belgisini qidirish
@@ -80,7 +81,7 @@ def parse_special_format(text: str) -> List[Dict]:
                     clean_option = option[1:].strip()
                     clean_options[i] = clean_option
                     correct_answer = chr(65 + i)
-                    print(f"DEBUG: Variant boshida # belgisi topildi: {correct_answer} - {clean_option}")
+                    logger.debug(f"Variant boshida # belgisi topildi: {correct_answer} - {clean_option}")
                     break
         
         # Kamida 2 ta variant bo'lishi kerak
@@ -93,306 +94,231 @@ def parse_special_format(text: str) -> List[Dict]:
             }
             
             tests.append(test_data)
-            print(f"DEBUG: Test qo'shildi: {question[:50]}... Javob: {correct_answer}")
+            logger.debug(f"Test qo'shildi: {question[:50]}... Javob: {correct_answer}")
         else:
-            print(f"DEBUG: Blok e'tiborga olinmadi - question: {bool(question)}, options: {len(clean_options)}")
+            logger.debug(f"Blok e'tiborga olinmadi - question: {bool(question)}, options: {len(clean_options)}")
     
-    print(f"DEBUG: Maxsus formatdan {len(tests)} ta test topildi")
+    logger.debug(f"Maxsus formatdan {len(tests)} ta test topildi")
     return tests
 
+# ============================================================
+# NUMBERED FORMAT: single-pass line parser
+# ============================================================
+#
+# The text is read once, line by line. Each line is classified with
+# anchored, precompiled patterns and drives a small state machine
+# (question text -> options -> next question). Answers come from:
+#   1. an inline line inside the question block ("To'g'ri javob: B")
+#   2. the answer key ("1 a 2 c", "3-B, 4-D"), collected from key lines
+#      and free text outside question blocks while scanning
+# The key is applied once at the end, so total work is linear in the
+# length of the text.
+
+_INVISIBLE = dict.fromkeys(map(ord, "\u200b\u200c\u200d\u2060\ufeff\ufe0f"))  # 2️. -> 2.
+_QUESTION_RE = re.compile(r'^(\d+)\s*[\.\)]\s*(.*)$')
+_OPTION_RE = re.compile(r'^([A-D])[\)\.\s]\s*(.*)$', re.IGNORECASE)
+_INLINE_ANSWER_RE = re.compile(
+    r"(?:to[g']ri\s*javob|correct|javob|answer)\s*[:\-]\s*([A-D])\b", re.IGNORECASE
+)
+_KEY_PAIR_RE = re.compile(r'(\d+)\s*[\.\):\-]?\s*([A-D])\b', re.IGNORECASE)
+_KEY_LINE_RE = re.compile(
+    r'^(?:[^\d\n]{0,20}[:\-]\s*)?(?:\d+\s*[\.\):\-]?\s*[A-D]\b[\s,;]*)+$', re.IGNORECASE
+)
+
+
+class NumberedTestParser:
+    """
+    Streaming parser for numbered tests:
+
+        1. Savol matni?          2) Savol          3 . Ko'p qatorli
+        A) Variant               a. Variant        savol?
+        ...                      ...               A) ...
+
+    Options without a letter are accepted after the first lettered one
+    (flexible format); once a second lettered option shows up, unlettered
+    lines are wrapped continuations of the option above them. feed() yields each question as soon as the next
+    one starts, finish() yields the last one. Questions still carry their
+    number ("_number") until apply_answer_key() fills answers from the key,
+    which may only appear at the end of the document.
+    """
+
+    MIN_OPTIONS = 4
+
+    def __init__(self):
+        self.answer_key: Dict[str, str] = {}
+        self._seen = set()
+        self._current = None
+
+    def feed(self, lines: Iterable[str]) -> Iterator[Dict]:
+        for raw in lines:
+            line = raw.translate(_INVISIBLE).strip()
+            if not line:
+                continue
+            done = self._line(line)
+            if done is not None:
+                yield done
+
+    def finish(self) -> Iterator[Dict]:
+        done = self._close()
+        if done is not None:
+            yield done
+
+    def scan_keys(self, lines: Iterable[str]):
+        """Only collect answer-key lines (pages read after an early stop)."""
+        for raw in lines:
+            line = raw.translate(_INVISIBLE).strip()
+            if line and _KEY_LINE_RE.match(line):
+                self._add_key(line)
+
+    def unresolved(self, tests: List[Dict]) -> List[str]:
+        """Numbers of questions with no answer yet, neither inline nor in the key."""
+        return [
+            t["_number"] for t in tests
+            if t["correct_answer"] is None and t["_number"] not in self.answer_key
+        ]
+
+    def apply_answer_key(self, tests: List[Dict]) -> List[Dict]:
+        for test in tests:
+            if test["correct_answer"] is None:
+                test["correct_answer"] = self.answer_key.get(test.pop("_number"))
+            else:
+                test.pop("_number")
+        return tests
+
+    def _line(self, line: str) -> Optional[Dict]:
+        current = self._current
+
+        # "1 a 2 c 3 b" / "Javoblar: 1-A, 2-C" (but "1. A..." right after a question
+        # still without options is the next question)
+        if _KEY_LINE_RE.match(line) and not (current and not current["options"] and _QUESTION_RE.match(line)):
+            self._add_key(line)
+            return None
+
+        question = _QUESTION_RE.match(line)
+        if question:
+            done = self._close()
+            self._current = {
+                "number": question.group(1), "text": [question.group(2)], "options": [], "answer": None,
+                "lettered": 0, "loose": 0  # lettered options / unlettered ones since the last of them
+            }
+            return done
+
+        if current is None:
+            self._add_key(line)
+            return None
+
+        inline = _INLINE_ANSWER_RE.search(line)
+        if inline:
+            current["answer"] = current["answer"] or inline.group(1).upper()
+            return None
+
+        options = current["options"]
+        option = _OPTION_RE.match(line)
+        if option:
+            if current["loose"]:
+                # "A) uzun variant / davomi / B) ...": the loose lines were wrapped
+                loose = options[-current["loose"]:]
+                del options[-current["loose"]:]
+                options[-1] = " ".join([options[-1], *loose])
+            options.append(option.group(2).strip())
+            current["lettered"] += 1
+            current["loose"] = 0
+        elif not options:
+            current["text"].append(line)
+        elif len(options) < self.MIN_OPTIONS:
+            if current["lettered"] > 1:
+                options[-1] = f"{options[-1]} {line}"  # wrapped lettered option
+            else:
+                options.append(line)  # flexible: unlettered option
+                current["loose"] += 1
+        else:
+            self._add_key(line)
+        return None
+
+    def _add_key(self, line: str):
+        for number, answer in _KEY_PAIR_RE.findall(line):
+            self.answer_key.setdefault(number, answer.upper())
+
+    def _close(self) -> Optional[Dict]:
+        current, self._current = self._current, None
+        if current is None:
+            return None
+
+        question = " ".join(part for part in current["text"] if part).strip()
+        options = [o for o in current["options"] if o][:self.MIN_OPTIONS]
+        if not question or len(options) < self.MIN_OPTIONS:
+            logger.debug(f"Savol {current['number']} e'tiborga olinmadi: {len(options)} ta variant")
+            return None
+
+        # Takrorlanishni oldini olish (birinchi 100 belgi bo'yicha)
+        if question[:100] in self._seen:
+            return None
+        self._seen.add(question[:100])
+
+        return {
+            "question": question,
+            "options": options,
+            "correct_answer": current["answer"],
+            "explanation": None,
+            "_number": current["number"]
+        }
+
+
 def parse_tests(text: str) -> List[Dict]:
     """Universal test parser - maxsus format va odatiy formatni tushunadi"""
-    
-    # Debug: Matn uzunligini ko'rish
-    print(f"DEBUG: Matn uzunligi: {len(text)} belgi")
-    print(f"DEBUG: Matn birinchi 1000 belgi:\n{text[:1000]}")
-    
+    logger.debug(f"Test matni: {len(text)} belgi")
+
     # Avval maxsus formatni tekshiramiz (++++, ====, #)
     if '++++' in text and '====' in text:
-        print("DEBUG: Maxsus format ++++ ==== # topildi, maxsus parser ishga tushirilmoqda...")
         return parse_special_format(text)
-    
-    # Matnni tozalash - maxsus belgilarni normalizatsiya qilish
-    text = re.sub(r'\r\n', '\n', text)  # Windows line endings
-    text = re.sub(r'\r', '\n', text)     # Mac line endings
-    text = re.sub(r'\n{3,}', '\n\n', text) # Ko'p bo'sh qatorlarni kamaytirish
-    
-    # Maxsus belgilarni oddiy raqamlarga almashtirish
-    text = re.sub(r'(\d+)[️️\u200B-\u200D\u2060\uFEFF]*[\.\)]', r'\1.', text)  # 2️. -> 2.
-    text = re.sub(r'(\d+)\s*[️️\u200B-\u200D\u2060\uFEFF]*[\.\)]', r'\1.', text)  # 2 . -> 2.
-    
-    print(f"DEBUG: Tozalangan matn birinchi 1000 belgi:\n{text[:1000]}")
-    
-    tests = []
-    seen_questions = set()  # Takrorlanishni oldini olish
-    
-    # Savollarni raqamlar orqali topish - faqat bitta pattern ishlatamiz
-    question_pattern = r'(\d+\.\s*)(.+?)(?=\n\d+\.\s*|\n*$)'  # Faqat 1. format
-    
-    print(f"DEBUG: Pattern ni sinash...")
-    questions = re.finditer(question_pattern, text, re.DOTALL | re.IGNORECASE)
-    question_list = list(questions)
-    print(f"DEBUG: Pattern dan {len(question_list)} ta savol bloki topildi")
-    
-    for i, match in enumerate(question_list):
-        question_number = match.group(1)
-        question_content = match.group(2).strip()
-        
-        print(f"DEBUG: Savol {i+1}: {question_number}")
-        print(f"DEBUG: Savol kontenti (birinchi 300 belgi): {question_content[:300]}")
-        
-        # Savol va variantlarni ajratish
-        lines = question_content.split('\n')
-        question_text = ""
-        options = []
-        
-        # Qatorlarni bo'lib ajratish
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Agar variant bo'lsa
-            if re.match(r'^[A-D][\)\.\s]', line, re.IGNORECASE):
-                options.append(line)
-            # Agar savol bo'lsa
-            elif not question_text:
-                question_text = line
-            # Agar savolga davom etsa
-            elif question_text and len(options) == 0:
-                question_text += " " + line
-        
-        question_text = question_text.strip()
-        
-        # Variantlarni tozalash
-        clean_options = []
-        for option in options[:4]:  # Faqat birinchi 4 ta
-            option = option.strip()
-            # Variant prefiksini olib tashlash
-            option = re.sub(r'^[A-D][\)\.\s]\s*', '', option, flags=re.IGNORECASE)
-            if option:
-                clean_options.append(option)
-        
-        print(f"DEBUG: Tozalangan variantlar: {clean_options}")
-        
-        # Agar to'g'ri savol va 4 ta variant bo'lsa
-        if question_text and len(clean_options) >= 4:
-            # Takrorlanishni tekshirish
-            question_hash = question_text[:100]  # Birinchi 100 belgi
-            if question_hash in seen_questions:
-                print(f"DEBUG: Takroriy savol o'tkazildi: {question_text[:50]}...")
-                continue
-            
-            seen_questions.add(question_hash)
-            
-            # Har bir test uchun alohida javob aniqlash
-            correct_answer = auto_detect_correct_answer_for_question(text, question_text, question_number)
-            
-            test_data = {
-                "question": question_text,
-                "options": clean_options[:4],
-                "correct_answer": correct_answer,
-                "explanation": None
-            }
-            
-            tests.append(test_data)
-            print(f"DEBUG: Test qo'shildi: {question_text[:50]}... Javob: {correct_answer}")
-        else:
-            print(f"DEBUG: Savol e'tiborga olinmadi - question: {bool(question_text)}, options: {len(clean_options)}")
-    
-    print(f"DEBUG: Jami {len(tests)} ta test topildi")
-    
-    # Agar testlar yetarli bo'lmasa, oxirgi urinish
-    if len(tests) < 5:  # Kamida 5 ta test bo'lishi kerak
-        print("DEBUG: Kam test topildi, oxirgi urinish...")
-        additional_tests = parse_last_attempt(text)
-        
-        # Qo'shimcha testlardan takrorlarni olib tashlash
-        for test in additional_tests:
-            question_hash = test["question"][:100]
-            if question_hash not in seen_questions:
-                seen_questions.add(question_hash)
-                tests.append(test)
-        
-        print(f"DEBUG: Oxirgi urinishdan keyin jami {len(tests)} ta test")
-    
-    return tests
 
-def auto_detect_correct_answer_for_question(text: str, question: str, question_number: str) -> str:
-    """Har bir savol uchun alohida to'g'ri javobni aniqlash"""
-    
-    # Savol raqamini olish
-    num_match = re.match(r'(\d+)', question_number)
-    question_num = num_match.group(1) if num_match else ""
-    
-    print(f"DEBUG: Savol raqami: {question_num}")
-    
-    # 1. Savoldan keyin javobni qidirish
-    question_start = text.find(question)
-    if question_start != -1:
-        # Savoldan keyingi 500 belgi
-        after_question = text[question_start:question_start + len(question) + 500]
-        print(f"DEBUG: Savoldan keyingi matn: {after_question[:200]}")
-        
-        # Javob patternlari
-        patterns = [
-            r'to[g\']ri\s*javob\s*[:\-]\s*([A-D])',
-            r'correct\s*[:\-]\s*([A-D])',
-            r'javob\s*[:\-]\s*([A-D])',
-            r'answer\s*[:\-]\s*([A-D])'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, after_question, re.IGNORECASE)
-            if match:
-                print(f"DEBUG: Savoldan keyin javob topildi: {match.group(1).upper()}")
-                return match.group(1).upper()
-    
-    # 2. Oxirgi javob formatidan shu savol javobini olish: "1 a 2 b 3 c"
-    end_pattern = r'(\d+)\s*([A-D])'
-    end_matches = re.findall(end_pattern, text, re.IGNORECASE)
-    print(f"DEBUG: Oxirgi javob formati: {end_matches}")
-    
-    if end_matches:
-        for num, answer in end_matches:
-            if num == question_num:
-                print(f"DEBUG: Savol {question_num} uchun javob topildi: {answer.upper()}")
-                return answer.upper()
-    
-    # 3. Butun matnda shu savol raqamli javobni qidirish
-    specific_pattern = rf'{question_num}\s*[:\.\-]?\s*([A-D])'
-    specific_match = re.search(specific_pattern, text, re.IGNORECASE)
-    if specific_match:
-        print(f"DEBUG: Maxsus pattern bilan javob topildi: {specific_match.group(1).upper()}")
-        return specific_match.group(1).upper()
-    
-    print(f"DEBUG: Savol {question_num} uchun javob topilmadi")
-    return None
+    parser = NumberedTestParser()
+    tests = list(parser.feed(text.splitlines()))
+    tests.extend(parser.finish())
+    parser.apply_answer_key(tests)
 
-def parse_last_attempt(text: str) -> List[Dict]:
-    """Oxirgi urinish - eng soddalashtirilgan"""
-    tests = []
-    
-    # Barcha qatorlarni bo'lish
-    lines = text.split('\n')
-    current_question = ""
-    current_options = []
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        # Agar raqam bilan boshlansa - yangi savol
-        if re.match(r'^\d+[\.\)]', line):
-            # Avvalgi savolni saqlash
-            if current_question and len(current_options) >= 4:
-                correct_answer = auto_detect_correct_answer(text, current_question)
-                tests.append({
-                    "question": current_question,
-                    "options": current_options[:4],
-                    "correct_answer": correct_answer,
-                    "explanation": None
-                })
-            
-            # Yangi savolni boshlash
-            current_question = re.sub(r'^\d+[\.\)]\s*', '', line)
-            current_options = []
-            
-        # Agar variant bo'lsa
-        elif re.match(r'^[A-D][\)\.\s]', line, re.IGNORECASE):
-            option = re.sub(r'^[A-D][\)\.\s]\s*', '', line, flags=re.IGNORECASE)
-            if option and len(current_options) < 4:
-                current_options.append(option)
-        
-        # Agar savolga davom etsa
-        elif current_question and not current_question.endswith('?'):
-            current_question += " " + line
-    
-    # Oxirgi savolni ham saqlash
-    if current_question and len(current_options) >= 4:
-        correct_answer = auto_detect_correct_answer(text, current_question)
-        tests.append({
-            "question": current_question,
-            "options": current_options[:4],
-            "correct_answer": correct_answer,
-            "explanation": None
-        })
-    
-    print(f"DEBUG: Oxirgi urinish {len(tests)} ta test topildi")
+    logger.debug(f"Jami {len(tests)} ta test topildi")
     return tests
 
-def parse_flexible_tests(text: str) -> List[Dict]:
-    """Qo'shimcha moslashuvchan test parser"""
-    tests = []
-    
-    # Savollarni raqamlash orqali ajratish
-    question_blocks = re.split(r'\n(\d+[\.\)]\s*)', text)
-    
-    current_question = None
-    current_options = []
-    question_number = 0
-    
-    for i, block in enumerate(question_blocks):
-        if i % 2 == 1:  # Raqam bloki
-            question_number = block
-            continue
-        
-        if i % 2 == 0 and i > 0:  # Savol bloki
-            lines = block.strip().split('\n')
-            if not lines:
-                continue
-                
-            # Birinchi qator - savol
-            question_line = lines[0].strip()
-            if not question_line or not re.search(r'[?!.]', question_line):
-                continue
-            
-            # Savol raqamini olib tashlash
-            question = re.sub(r'^\d+[\.\)]\s*', '', question_line)
-            
-            # Variantlarni izlash
-            options = []
-            option_pattern = r'^[A-D][\)\.\s]\s*(.+)$'
-            
-            for line in lines[1:]:
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                match = re.match(option_pattern, line, re.IGNORECASE)
-                if match:
-                    options.append(match.group(1).strip())
-                elif options and len(options) < 4:
-                    # Agar variant prefiksi bo'lmasa
-                    options.append(line)
-            
-            # Agar 4 ta variant bo'lsa
-            if len(options) >= 4:
-                correct_answer = auto_detect_correct_answer(text, question)
-                
-                tests.append({
-                    "question": question,
-                    "options": options[:4],
-                    "correct_answer": correct_answer,
-                    "explanation": None
-                })
-    
-    return tests
+def parse_test_pages(pages: Iterable[str], max_questions: Optional[int] = None) -> List[Dict]:
+    """parse_tests for text that arrives page by page.
 
-def parse_pdf(pdf_content: bytes) -> List[Dict]:
-    """PDF fayldan testlarni ajratib olish"""
-    if pdfplumber is None:
-        print("WARNING: pdfplumber not installed, skipping PDF parsing")
-        return []
+    Pages are fed to the parser as they come; with max_questions, parsing
+    stops once that many questions are complete. If some of them still
+    have no answer, the remaining pages are only scanned for the answer
+    key (usually at the end), until every answer is found.
+    """
+    parser = NumberedTestParser()
+    tests: List[Dict] = []
+    seen: List[str] = []
+    pages = iter(pages)
 
-    text = ""
-    with pdfplumber.open(io.BytesIO(pdf_content)) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-    return parse_tests(text)
+    for page in pages:
+        seen.append(page)
+        tests.extend(parser.feed(page.splitlines()))
+        if max_questions and len(tests) >= max_questions:
+            del tests[max_questions:]
+            break
+    else:
+        tests.extend(parser.finish())
+
+    while parser.unresolved(tests):
+        page = next(pages, None)
+        if page is None:
+            break
+        seen.append(page)
+        parser.scan_keys(page.splitlines())
+
+    # The special format (++++ / ====) is only recognised on the whole text
+    text = "\n".join(seen)
+    if '++++' in text and '====' in text:
+        return parse_special_format(text)[:max_questions or None]
+
+    return parser.apply_answer_key(tests)
+
+def parse_pdf(pdf_content: bytes, max_questions: Optional[int] = None) -> List[Dict]:
+    """PDF fayldan testlarni ajratib olish (sahifama-sahifa)"""
+    return parse_test_pages(iter_pdf_pages(pdf_content), max_questions)
 
 def parse_word(docx_content: bytes) -> List[Dict]:
     """Word fayldan testlarni ajratib olish"""
@@ -443,8 +369,7 @@ def parse_image_tests(image_content: bytes) -> List[Dict]:
             text = ""
         else:
             text = pytesseract.image_to_string(image, lang='eng+rus+uzb')
-        print(f"DEBUG: OCR bilan matn olingan: {len(text)} belgi")
-        print(f"DEBUG: OCR natijasi:\n{text}")
+        logger.debug(f"OCR bilan matn olingan: {len(text)} belgi")
         
         # Matnni tozalash
         text = re.sub(r'\r\n', '\n', text)
@@ -576,38 +501,3 @@ def parse_image(image_content: bytes) -> List[Dict]:
     image = Image.open(io.BytesIO(image_content))
     text = pytesseract.image_to_string(image, lang='eng+rus+uzb')
     return parse_tests(text)
-
-def auto_detect_correct_answer(text: str, question: str = None) -> str:
-    """To'g'ri javobni avtomatik aniqlash"""
-    # Pattern: To'g'ri javob: A yoki Correct: B
-    patterns = [
-        r'to[g\']ri\s*javob\s*[:\-]\s*([A-D])',
-        r'correct\s*[:\-]\s*([A-D])',
-        r'javob\s*[:\-]\s*([A-D])',
-        r'answer\s*[:\-]\s*([A-D])'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            return match.group(1).upper()
-    
-    # Agar question berilgan bo'lsa, savoldan keyin javobni qidirish
-    if question:
-        question_start = text.find(question)
-        if question_start != -1:
-            # Savoldan keyingi matn (taxminan 200 belgi)
-            after_question = text[question_start:question_start + len(question) + 200]
-            for pattern in patterns:
-                match = re.search(pattern, after_question, re.IGNORECASE)
-                if match:
-                    return match.group(1).upper()
-    
-    # Oxirgi javob formatini tekshirish: "1 a 2 b 3 c"
-    end_pattern = r'(\d+)\s*([A-D])'
-    end_matches = re.findall(end_pattern, text, re.IGNORECASE)
-    if end_matches:
-        # Oxirgi javobni qaytarish
-        return end_matches[-1][1].upper()
-    
-    return None
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""
+Text store - bounded, expiring storage for uploaded file texts
+
+POST /file/read saves the extracted text under a file id that the
+reader page fetches later with GET /file/read/{file_id}. The store
+bounds memory and makes ids resolvable from every worker.
+
+Backends (same get/set/delete/stats interface):
+- MemoryTextStore: LRU with TTL in worker memory (dev, single worker)
+- DiskTextStore (default): zlib-compressed files with an expiry header
+  in FILE_STORE_DIR. Total size is capped by FILE_STORE_DISK_MB with
+  LRU eviction. Shared by the workers on one host.
+- RedisTextStore: set FILE_STORE_REDIS_URL (and install `redis`) to share
+  texts between hosts. Entries are compressed and expire via SETEX.
+
+Entries expire after FILE_STORE_TTL seconds (default one day).
+"""
+
+import logging
+import os
+import struct
+import tempfile
+import time
+import zlib
+from typing import Any, Dict, Optional
+
+from app.core.cache import DiskCache, TTLCache
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+TEXT_TTL = int(os.getenv("FILE_STORE_TTL", 24 * 3600))
+
+
+def _pack(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"))
+
+
+def _unpack(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8")
+
+
+class MemoryTextStore:
+    def __init__(self, maxsize: int = 1000, ttl: int = TEXT_TTL):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._cache.get(key)
+
+    def set(self, key: str, text: str):
+        self._cache.set(key, text)
+
+    def delete(self, key: str) -> bool:
+        return self._cache.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", **self._cache.stats()}
+
+
+class DiskTextStore:
+    """DiskCache entries: 8-byte expiry timestamp + zlib-compressed text."""
+
+    _HEADER = struct.Struct(">d")
+
+    def __init__(self, directory: str, max_bytes: int = 50 * 1024 * 1024, ttl: int = TEXT_TTL):
+        self._disk = DiskCache(directory, max_bytes=max_bytes, suffix=".txt.z")
+        self.ttl = ttl
+        self.expired = 0
+
+    def get(self, key: str) -> Optional[str]:
+        data = self._disk.get(key)
+        if data is None:
+            return None
+        (expires_at,) = self._HEADER.unpack_from(data)
+        if expires_at < time.time():
+            self.expired += 1
+            self._disk.delete(key)
+            return None
+        return _unpack(data[self._HEADER.size:])
+
+    def set(self, key: str, text: str):
+        self._disk.set(key, self._HEADER.pack(time.time() + self.ttl) + _pack(text))
+
+    def delete(self, key: str) -> bool:
+        return self._disk.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "disk", "expired": self.expired, **self._disk.stats()}
+
+
+class RedisTextStore:
+    KEY_PREFIX = "alif24:file_text:"
+
+    def __init__(self, url: str, ttl: int = TEXT_TTL):
+        self._redis = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[str]:
+        data = self._redis.get(self.KEY_PREFIX + key)
+        return _unpack(data) if data is not None else None
+
+    def set(self, key: str, text: str):
+        self._redis.setex(self.KEY_PREFIX + key, self.ttl, _pack(text))
+
+    def delete(self, key: str) -> bool:
+        return bool(self._redis.delete(self.KEY_PREFIX + key))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis"}
+
+
+def _make_store():
+    url = os.getenv("FILE_STORE_REDIS_URL")
+    if url and redis is not None:
+        return RedisTextStore(url)
+    if url:
+        logger.warning("FILE_STORE_REDIS_URL set but redis is not installed; using disk text store")
+    if os.getenv("FILE_STORE", "disk") == "memory":
+        return MemoryTextStore()
+    return DiskTextStore(
+        os.getenv("FILE_STORE_DIR", os.path.join(tempfile.gettempdir(), "alif24_file_texts")),
+        max_bytes=int(os.getenv("FILE_STORE_DISK_MB", 50)) * 1024 * 1024
+    )
+
+
+# Global text store (memory: one per worker process; disk: per host; redis: shared)
+text_store = _make_store()
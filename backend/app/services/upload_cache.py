@@ -0,0 +1,83 @@
+"""
+Upload cache - extracted text and parsed tests keyed by file content
+
+Teachers upload the same PDFs, DOCX files and photos of test sheets
+again and again. Each document_pool job's result is cached under
+sha256(file bytes), the job function, its extra arguments and a parser
+version. A repeat upload is then answered from memory or disk without
+extraction, OCR or parsing.
+
+- memory: small LRU of recent results (per worker process)
+- disk: JSON files under UPLOAD_CACHE_DIR with LRU eviction past
+  UPLOAD_CACHE_DISK_MB (DiskCache), shared by workers on the same host
+- identical uploads in flight at the same time share one pool job
+- empty results ("" / []) are not cached, so a file hit by a missing
+  OCR/PDF dependency is retried once the dependency is installed
+
+Bump the version passed by a caller (e.g. parsers.PARSER_VERSION) when
+its output format changes; old entries then age out of the LRU.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Callable, Dict, Optional
+
+from app.core.cache import DiskCache, SingleFlight, TTLCache
+from app.core.process_pool import document_pool
+
+
+class UploadCache:
+    MEMORY_MAXSIZE = int(os.getenv("UPLOAD_CACHE_MEMORY_SIZE", 128))  # results
+    DISK_MAX_BYTES = int(os.getenv("UPLOAD_CACHE_DISK_MB", 200)) * 1024 * 1024
+    DISK_DIR = os.getenv("UPLOAD_CACHE_DIR", os.path.join(tempfile.gettempdir(), "alif24_uploads"))
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        self._memory = TTLCache(maxsize=self.MEMORY_MAXSIZE, ttl=None)
+        self._disk = DiskCache(directory or self.DISK_DIR, max_bytes=max_bytes or self.DISK_MAX_BYTES, suffix=".json")
+        self._flight = SingleFlight()
+        self.jobs = 0
+
+    @staticmethod
+    def cache_key(fn: Callable, digest: str, args: tuple, version: str) -> str:
+        return f"{fn.__module__}.{fn.__qualname__}:v{version}:{digest}:{json.dumps(args)}"
+
+    async def run(self, fn: Callable, content: bytes, *args, version: str = "1") -> Any:
+        """document_pool.run(fn, content, *args), served from cache when possible."""
+        # Hashing a 50 MB upload takes tens of ms; keep it off the event loop
+        digest = (await asyncio.to_thread(hashlib.sha256, content)).hexdigest()
+        key = self.cache_key(fn, digest, args, version)
+
+        result = self._memory.get(key)
+        if result is not None:
+            return result
+
+        data = await asyncio.to_thread(self._disk.get, key)
+        if data is not None:
+            result = json.loads(data)
+            self._memory.set(key, result)
+            return result
+
+        async def produce():
+            self.jobs += 1
+            value = await document_pool.run(fn, content, *args)
+            if value:
+                self._memory.set(key, value)
+                await asyncio.to_thread(self._disk.set, key, json.dumps(value, ensure_ascii=False).encode("utf-8"))
+            return value
+
+        return await self._flight.do(key, produce)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory": self._memory.stats(),
+            "disk": self._disk.stats(),
+            "coalesced": self._flight.coalesced,
+            "jobs": self.jobs
+        }
+
+
+# Global upload cache (one per worker process; disk shared per host)
+upload_cache = UploadCache()
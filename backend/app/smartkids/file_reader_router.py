@@ -1,16 +1,20 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
+import asyncio
 import io
 try:
     import docx
 except ImportError:
     docx = None
-import pypdf
 import chardet
 import uuid
 
+from app.services.document_text import iter_pdf_pages
+from app.services.text_store import text_store
+from app.services.upload_cache import upload_cache
+
 router = APIRouter()
 
-file_storage = {}  # In-memory storage for file texts
+MAX_WORDS = 250  # Words kept per uploaded file
 
 def read_docx(content):
     if docx is None:
@@ -19,12 +23,16 @@ def read_docx(content):
     doc = docx.Document(file_like)
     return "\n".join(p.text for p in doc.paragraphs)
 
-def read_pdf(content):
-    reader = pypdf.PdfReader(io.BytesIO(content))
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() or ""
-    return text
+def read_pdf(content, max_words=None):
+    # Stop extracting once past max_words (enough to know the text was truncated)
+    pages = []
+    words = 0
+    for page_text in iter_pdf_pages(content):
+        pages.append(page_text)
+        words += len(page_text.split())
+        if max_words is not None and words > max_words:
+            break
+    return "\n".join(pages)
 
 def read_txt(content):
     enc = chardet.detect(content).get("encoding") or "utf-8"
@@ -45,9 +53,11 @@ async def read_file(file: UploadFile = File(...)):
     filename = file.filename.lower()
 
     if filename.endswith(".docx"):
-        text = read_docx(content)
+        if docx is None:
+            raise HTTPException(status_code=501, detail="DOCX processing is temporarily disabled for optimization.")
+        text = await upload_cache.run(read_docx, content)
     elif filename.endswith(".pdf"):
-        text = read_pdf(content)
+        text = await upload_cache.run(read_pdf, content, MAX_WORDS)
     elif filename.endswith(".txt"):
         text = read_txt(content)
     else:
@@ -58,19 +68,20 @@ async def read_file(file: UploadFile = File(...)):
 
     # Matn uzunligini cheklash (250 so'z)
     words = text.split()
-    if len(words) > 250:
-        truncated_text = ' '.join(words[:250])
+    if len(words) > MAX_WORDS:
+        truncated_text = ' '.join(words[:MAX_WORDS])
         warning_message = "\n\n⚠️ Matn juda katta bo'lganligi sababli faqat 250 ta so'z olindi."
         text = truncated_text + warning_message
 
     # Generate unique ID and store the text
     file_id = str(uuid.uuid4())
-    file_storage[file_id] = text
+    await asyncio.to_thread(text_store.set, file_id, text)
 
     return {"id": file_id, "text": text}
 
 @router.get("/file/read/{file_id}")
 async def get_file(file_id: str):
-    if file_id in file_storage:
-        return {"text": file_storage[file_id]}
+    text = await asyncio.to_thread(text_store.get, file_id)
+    if text is not None:
+        return {"text": text}
     raise HTTPException(status_code=404, detail="File not found")
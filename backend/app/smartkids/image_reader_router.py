@@ -9,22 +9,11 @@ FIX: Previously returned HTTP 200 with {"error": "..."} on failures.
      - 500: AI processing failure
 """
 from fastapi import APIRouter, UploadFile, File, HTTPException
-from openai import AzureOpenAI
 import base64
-import os
-from app.core.config import settings
+from app.services.ai_gateway import ai_gateway
 
 router = APIRouter()
 
-def get_client():
-    """Create Azure OpenAI client from settings (env vars)"""
-    return AzureOpenAI(
-        azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
-        api_key=settings.AZURE_OPENAI_KEY,
-        api_version=settings.AZURE_OPENAI_API_VERSION
-    )
-
-
 def clean_text_for_tts(text):
     """Matnni TTS uchun tozalash — o' va g' belgilarni to'g'ri formatlash"""
     text = text.replace("o'", "oʻ").replace("O'", "Oʻ")
@@ -64,9 +53,7 @@ async def read_image(file: UploadFile = File(...)):
     )
 
     try:
-        client = get_client()
-        response = client.chat.completions.create(
-            model=os.getenv("AZURE_OPENAI_MODEL", AZURE_MODEL),
+        response = await ai_gateway.chat(
             messages=[{
                 "role": "user",
                 "content": [
@@ -6,15 +6,14 @@ import json
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import List, Optional, Dict
-from datetime import datetime, timedelta
-from openai import AzureOpenAI
 from sqlalchemy.orm import Session
-from sqlalchemy import func, cast, Date
 from app.core.database import get_db
 from app.models.reading_analysis import ReadingAnalysis
+from app.services.reading_stats_service import ReadingStatsService
 from app.core.config import settings
 from langdetect import detect, LangDetectException
 from app.services.ai_cache_service import AICacheService
+from app.services.ai_gateway import ai_gateway
 
 router = APIRouter()
 
@@ -193,17 +192,8 @@ class SaveAnalysisRequest(BaseModel):
     ai_feedback: Optional[str] = None
 
 
-def get_azure_client():
-    """Azure OpenAI client yaratish"""
-    return AzureOpenAI(
-        azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
-        api_key=settings.AZURE_OPENAI_KEY,
-        api_version=settings.AZURE_OPENAI_API_VERSION
-    )
-
-
 @router.post("/next-question")
-async def next_question(request: NextQuestionRequest):
+async def next_question(request: NextQuestionRequest, db: Session = Depends(get_db)):
     """
     Ertak asosida keyingi savol yaratish
     """
@@ -218,7 +208,6 @@ async def next_question(request: NextQuestionRequest):
         except:
             request.language = "uz-UZ"
             
-        client = get_azure_client()
         model = os.getenv("AZURE_OPENAI_MODEL", AZURE_MODEL)
         
         # Get language-specific system prompt
@@ -236,26 +225,34 @@ async def next_question(request: NextQuestionRequest):
             question_number=request.question_number
         )
         
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=150,
-            temperature=0.8
+        async def generate():
+            response = await ai_gateway.chat(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                max_tokens=150,
+                temperature=0.8
+            )
+            
+            question = response.choices[0].message.content.strip()
+            
+            # Raqam yoki tire bo'lsa olib tashlash
+            if question and question[0].isdigit():
+                question = question.split('.', 1)[-1].strip()
+            if question.startswith('-'):
+                question = question[1:].strip()
+            return {"question": question}
+        
+        # Same story + history -> one completion (cached, concurrent calls coalesced)
+        prompt_hash = AICacheService.generate_hash(user_prompt, system_prompt, model=model)
+        result = await AICacheService.get_or_generate(
+            db, prompt_hash, generate, prompt_text=user_prompt, model=model
         )
         
-        question = response.choices[0].message.content.strip()
-        
-        # Raqam yoki tire bo'lsa olib tashlash
-        if question and question[0].isdigit():
-            question = question.split('.', 1)[-1].strip()
-        if question.startswith('-'):
-            question = question[1:].strip()
-        
         fallback_question = get_fallback_question(request.language)
-        return {"question": question if question else fallback_question}
+        return {"question": result.get("question") or fallback_question}
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating question: {str(e)}")
@@ -276,7 +273,6 @@ async def analyze_answer(request: AnalyzeRequest):
         except:
             pass
             
-        client = get_azure_client()
         model = os.getenv("AZURE_OPENAI_MODEL", AZURE_MODEL)
         
         # Get language-specific system prompt
@@ -350,7 +346,7 @@ async def analyze_answer(request: AnalyzeRequest):
             f'}}'
         )
         
-        response = client.chat.completions.create(
+        response = await ai_gateway.chat(
             model=model,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -383,7 +379,6 @@ async def analyze_reading(request: AnalyzeReadingRequest):
         except:
             pass
 
-        client = get_azure_client()
         model = os.getenv("AZURE_OPENAI_MODEL", AZURE_MODEL)
         
         # Language-specific prompts
@@ -433,7 +428,7 @@ async def analyze_reading(request: AnalyzeReadingRequest):
             f"{lang_config['age']}: {request.age}"
         )
         
-        response = client.chat.completions.create(
+        response = await ai_gateway.chat(
             model=model,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -466,7 +461,6 @@ async def chat_and_ask(request: ChatRequest):
         except:
             pass
 
-        client = get_azure_client()
         model = os.getenv("AZURE_OPENAI_MODEL", AZURE_MODEL)
         
         # Get language-specific system prompt
@@ -490,7 +484,7 @@ async def chat_and_ask(request: ChatRequest):
             for msg in request.conversation_history[-4:]:
                 messages.insert(-1, msg)
         
-        response = client.chat.completions.create(
+        response = await ai_gateway.chat(
             model=model,
             messages=messages,
             max_tokens=150,
@@ -540,6 +534,8 @@ async def save_analysis(request: SaveAnalysisRequest, db: Session = Depends(get_
         )
         
         db.add(analysis)
+        # Daily rollup is updated in the same transaction
+        ReadingStatsService(db).record(analysis)
         db.commit()
         db.refresh(analysis)
         
@@ -576,68 +572,12 @@ async def get_user_analyses(user_id: str, days: int = 30, db: Session = Depends(
             print(f"❌ Invalid UUID: {user_id}")
             raise HTTPException(status_code=400, detail=f"Invalid user_id format: {user_id}")
         
-        # Oxirgi N kun
-        start_date = datetime.utcnow() - timedelta(days=days)
-        
-        analyses = db.query(ReadingAnalysis).filter(
-            ReadingAnalysis.user_id == user_uuid,
-            ReadingAnalysis.session_date >= start_date
-        ).order_by(ReadingAnalysis.session_date.desc()).all()
-        
-        print(f"📈 Topilgan tahlillar: {len(analyses)} ta")
-        
-        # Kunlik statistika
-        daily_stats = db.query(
-            cast(ReadingAnalysis.session_date, Date).label('date'),
-            func.sum(ReadingAnalysis.total_words_read).label('total_words'),
-            func.avg(ReadingAnalysis.speech_errors).label('avg_errors'),
-            func.avg(ReadingAnalysis.comprehension_score).label('avg_comprehension'),
-            func.avg(ReadingAnalysis.answer_quality_score).label('avg_answers')
-        ).filter(
-            ReadingAnalysis.user_id == user_uuid,
-            ReadingAnalysis.session_date >= start_date
-        ).group_by(cast(ReadingAnalysis.session_date, Date)).all()
-        
-        # Umumiy ko'rsatkichlar
-        total_sessions = len(analyses)
-        total_words = sum([a.total_words_read for a in analyses])
-        avg_pronunciation = sum([a.pronunciation_score for a in analyses]) / total_sessions if total_sessions > 0 else 0
-        avg_fluency = sum([a.fluency_score for a in analyses]) / total_sessions if total_sessions > 0 else 0
-        avg_comprehension = sum([a.comprehension_score for a in analyses]) / total_sessions if total_sessions > 0 else 0
-        total_errors = sum([a.speech_errors for a in analyses])
-        
-        print(f"📊 Statistika: sessions={total_sessions}, words={total_words}, daily_stats={len(daily_stats)}")
+        # Oxirgi N kun: kunlik yig'indilar (har kunga bitta qator) + oxirgi 10 ta tahlil
+        history = ReadingStatsService(db).get_history(user_uuid, days)
         
-        return {
-            "total_sessions": total_sessions,
-            "total_words": total_words,
-            "avg_pronunciation": round(avg_pronunciation, 1),
-            "avg_fluency": round(avg_fluency, 1),
-            "avg_comprehension": round(avg_comprehension, 1),
-            "total_speech_errors": total_errors,
-            "daily_stats": [
-                {
-                    "date": str(stat.date),
-                    "total_words": int(stat.total_words or 0),
-                    "avg_errors": round(float(stat.avg_errors or 0), 1),
-                    "avg_comprehension": round(float(stat.avg_comprehension or 0), 1),
-                    "avg_answers": round(float(stat.avg_answers or 0), 1)
-                }
-                for stat in daily_stats
-            ],
-            "recent_analyses": [
-                {
-                    "id": str(a.id),
-                    "date": a.session_date.isoformat(),
-                    "story_title": a.story_title,
-                    "words_read": a.total_words_read,
-                    "pronunciation_score": a.pronunciation_score,
-                    "comprehension_score": a.comprehension_score,
-                    "speech_errors": a.speech_errors
-                }
-                for a in analyses[:10]
-            ]
-        }
+        print(f"📊 Statistika: sessions={history['total_sessions']}, daily_stats={len(history['daily_stats'])}")
+        
+        return history
         
     except Exception as e:
         print(f"❌ Xato tahlillarni olishda: {str(e)}")
@@ -7,7 +7,6 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import List, Optional, Dict
 from datetime import datetime, timedelta
-from openai import AzureOpenAI
 from sqlalchemy.orm import Session
 from sqlalchemy import func, cast, Date
 from app.core.database import get_db
@@ -15,15 +14,10 @@ from app.models.reading_analysis import ReadingAnalysis
 from app.core.config import settings
 from langdetect import detect, LangDetectException
 from app.services.ai_cache_service import AICacheService
+from app.services.ai_gateway import ai_gateway
 
 router = APIRouter()
 
-# Initialize Client from settings (env vars)
-client = AzureOpenAI(
-    api_key=settings.AZURE_OPENAI_KEY,
-    api_version=settings.AZURE_OPENAI_API_VERSION,
-    azure_endpoint=settings.AZURE_OPENAI_ENDPOINT
-)
 deployment_name = settings.AZURE_OPENAI_DEPLOYMENT_NAME
 
 class ChatRequest(BaseModel):
@@ -89,7 +83,7 @@ async def chat_and_ask_question(request: ChatRequest, db: Session = Depends(get_
         ]
 
         # 3. Call AI with JSON Mode
-        response = client.chat.completions.create(
+        response = await ai_gateway.chat(
             model=deployment_name,
             messages=messages,
             response_format={"type": "json_object"},
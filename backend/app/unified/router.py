@@ -2,9 +2,9 @@ from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Response
 from pydantic import BaseModel
 from typing import Optional
 import os
-import requests
 import logging
 from app.core.config import settings
+from app.services.speech_service import speech_service
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -35,36 +35,17 @@ async def tts_options():
 async def text_to_speech(request: TTSRequest):
     """Unified Text to Speech endpoint via REST API"""
     speech_key = settings.AZURE_SPEECH_KEY
-    speech_region = settings.AZURE_SPEECH_REGION
     
     if not speech_key:
         raise HTTPException(status_code=501, detail="Azure Speech key not configured")
     
     voice_name = get_voice_name(request.language, request.voice)
     
-    from xml.sax.saxutils import escape
-    escaped = escape(request.text)
-    ssml = f"""<speak version='1.0' xml:lang='{request.language}'>
-        <voice name='{voice_name}'>
-            <prosody rate='-20%'>{escaped}</prosody>
-        </voice>
-    </speak>"""
-    
     try:
-        token_url = f"https://{speech_region}.api.cognitive.microsoft.com/sts/v1.0/issueToken"
-        token_resp = requests.post(token_url, headers={"Ocp-Apim-Subscription-Key": speech_key})
-        token_resp.raise_for_status()
-        
-        tts_url = f"https://{speech_region}.tts.speech.microsoft.com/cognitiveservices/v1"
-        tts_resp = requests.post(tts_url, headers={
-            "Authorization": f"Bearer {token_resp.text}",
-            "Content-Type": "application/ssml+xml",
-            "X-Microsoft-OutputFormat": "audio-16khz-128kbitrate-mono-mp3",
-            "User-Agent": "Alif24-Backend"
-        }, data=ssml.encode('utf-8'))
-        tts_resp.raise_for_status()
-        
-        return Response(content=tts_resp.content, media_type="audio/mpeg")
+        audio = await speech_service.generate_speech(
+            request.text, voice_name=voice_name, language=request.language, rate="-20%"
+        )
+        return Response(content=audio, media_type="audio/mpeg")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"TTS error: {str(e)}")
 
@@ -61,6 +61,16 @@ try:
         await init_db()
         yield
         # Shutdown: Clean up resources if needed
+        from app.services.ai_gateway import ai_gateway
+        from app.services.notification_queue import notification_queue
+        from app.core.http_clients import http_clients
+        from app.core.database import close_async_db
+        from app.core.process_pool import document_pool
+        await notification_queue.stop()
+        await ai_gateway.close()
+        await http_clients.close()
+        await close_async_db()
+        document_pool.close()
 
     tags_metadata = [
         {"name": "auth", "description": "Authentication (Login, Register, Refresh Token)"},
@@ -113,6 +123,8 @@ try:
         allow_credentials=allow_credentials,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Olympiad /begin returns the student's start time in a header
+        expose_headers=["X-Started-At"],
     )
 
     # Include Routers
@@ -0,0 +1,59 @@
+"""
+Shared in-memory SQLite setup for the olympiad service tests.
+"""
+
+import uuid
+from datetime import datetime
+from typing import Optional
+import sys
+import os
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.database import Base
+from app.models import User, UserRole, StudentProfile, Olympiad, OlympiadParticipant
+
+
+def make_session() -> Session:
+    """Session on a fresh in-memory database with all tables."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def create_olympiad(db: Session, **fields) -> Olympiad:
+    """Olympiad created by a new moderator; all its dates are now."""
+    moderator = User(email=f"m{uuid.uuid4().hex[:8]}@x.com", first_name="M", last_name="M", role=UserRole.moderator)
+    db.add(moderator)
+    db.flush()
+    now = datetime.utcnow()
+    olympiad = Olympiad(
+        title="Olimpiada", registration_start=now, registration_end=now,
+        start_time=now, end_time=now, created_by=moderator.id, **fields
+    )
+    db.add(olympiad)
+    db.flush()
+    return olympiad
+
+
+def add_student(
+    db: Session,
+    olympiad: Optional[Olympiad] = None,
+    first_name: str = "S",
+    **participant
+) -> StudentProfile:
+    """Student user and profile; with an olympiad, also its participant row (extra fields as given)."""
+    user = User(email=f"s{uuid.uuid4().hex[:8]}@x.com", first_name=first_name, last_name="S", role=UserRole.student)
+    db.add(user)
+    db.flush()
+    profile = StudentProfile(user_id=user.id)
+    db.add(profile)
+    db.flush()
+    if olympiad is not None:
+        db.add(OlympiadParticipant(olympiad_id=olympiad.id, student_id=profile.id, **participant))
+    return profile
@@ -0,0 +1,82 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+import sys
+import os
+
+import httpx
+from openai import RateLimitError
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.ai_gateway import AzureOpenAIGateway
+from app.services import test_builder_service
+
+
+def _rate_limit_error():
+    request = httpx.Request("POST", "https://example.test/chat/completions")
+    response = httpx.Response(429, request=request, headers={"retry-after": "0"})
+    return RateLimitError("rate limited", response=response, body=None)
+
+
+class TestAzureOpenAIGateway(unittest.TestCase):
+    def setUp(self):
+        self.gateway = AzureOpenAIGateway()
+        self.completion = MagicMock()
+        self.completion.choices[0].message.content = "  Javob  "
+
+        self.client = MagicMock()
+        self.client.api_key = "key"
+        self.client.chat.completions.create = AsyncMock()
+        self.gateway._client = self.client
+
+    def test_retries_rate_limit_then_succeeds(self):
+        self.client.chat.completions.create.side_effect = [_rate_limit_error(), self.completion]
+
+        with patch('app.services.ai_gateway.asyncio.sleep', new=AsyncMock()):
+            text = asyncio.run(self.gateway.complete([{"role": "user", "content": "salom"}], model="gpt"))
+
+        self.assertEqual(text, "Javob")
+        self.assertEqual(self.client.chat.completions.create.await_count, 2)
+
+    def test_gives_up_after_max_retries(self):
+        self.client.chat.completions.create.side_effect = _rate_limit_error()
+
+        with patch('app.services.ai_gateway.asyncio.sleep', new=AsyncMock()):
+            with self.assertRaises(RateLimitError):
+                asyncio.run(self.gateway.chat([{"role": "user", "content": "salom"}], model="gpt"))
+
+        self.assertEqual(self.client.chat.completions.create.await_count, self.gateway.MAX_RETRIES + 1)
+
+    def test_custom_api_key_uses_copied_client(self):
+        copied = MagicMock()
+        copied.chat.completions.create = AsyncMock(return_value=self.completion)
+        self.client.with_options.return_value = copied
+
+        asyncio.run(self.gateway.chat([], model="gpt", api_key="other"))
+
+        self.client.with_options.assert_called_once_with(api_key="other")
+        copied.chat.completions.create.assert_awaited_once()
+
+
+class TestBuilderUsesGateway(unittest.TestCase):
+    def test_azure_generation_goes_through_gateway(self):
+        completion = MagicMock()
+        completion.choices[0].message.content = '[{"question": "2+2?", "options": ["3", "4"], "correct_answer": "4"}]'
+
+        with patch("app.services.test_builder_service.settings") as settings, \
+                patch("app.services.test_builder_service.ai_gateway") as gateway:
+            settings.AZURE_OPENAI_KEY = "key"
+            gateway.default_model = "gpt-4o"
+            gateway.chat = AsyncMock(return_value=completion)
+            service = test_builder_service.TestBuilderService()
+            questions = asyncio.run(service.generate_ai_test("Matematika", count=1))
+
+        self.assertIsNone(service.client)
+        self.assertEqual(gateway.chat.await_args.kwargs["model"], "gpt-4o")
+        self.assertEqual(questions[0]["correct_answer"], "4")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import asyncio
+import importlib.util
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+from sqlalchemy.pool import StaticPool
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core import database
+from app.core.database import Base, _async_url
+from app.models import User, UserRole, StudentProfile, StudentCoin, CoinTransaction, TransactionType
+from app.services.coin_service import AsyncCoinService
+
+HAS_ASYNC_SQLITE = all(importlib.util.find_spec(m) for m in ("greenlet", "aiosqlite"))
+
+
+class TestAsyncUrl(unittest.TestCase):
+    def test_driver_and_ssl_param(self):
+        self.assertEqual(
+            _async_url("postgres://u:p@db:5432/app?sslmode=require"),
+            "postgresql+asyncpg://u:p@db:5432/app?ssl=require"
+        )
+        self.assertEqual(_async_url("sqlite:///./dev.db"), "sqlite+aiosqlite:///./dev.db")
+
+
+class TestAsyncEnginePerLoop(unittest.TestCase):
+    def test_new_loop_replaces_engine(self):
+        async def engine_in_new_loop():
+            return database.get_async_engine(), database.get_async_engine()
+
+        with patch.object(database, "_async_engine", None), \
+                patch.object(database, "_async_engine_loop", None), \
+                patch.object(database, "AsyncSessionLocal", None), \
+                patch.object(database, "async_sessionmaker", MagicMock()), \
+                patch.object(database, "async_pool_metrics", MagicMock()), \
+                patch.object(database, "create_async_engine", side_effect=lambda *a, **k: MagicMock()):
+            first, same = asyncio.run(engine_in_new_loop())
+            second, _ = asyncio.run(engine_in_new_loop())  # e.g. next serverless invocation
+
+        self.assertIs(first, same)
+        self.assertIsNot(first, second)
+        # The first loop is closed: its pool is dropped without touching the connections
+        first.sync_engine.dispose.assert_called_once_with(close=False)
+
+
+@unittest.skipUnless(HAS_ASYNC_SQLITE, "needs sqlalchemy[asyncio] and aiosqlite")
+class TestAsyncCoinService(unittest.TestCase):
+    def test_balance_and_transactions(self):
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        async def scenario():
+            engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+            async with async_sessionmaker(engine)() as db:
+                user = User(email="s@x.com", first_name="S", last_name="S", role=UserRole.student)
+                db.add(user)
+                await db.flush()
+                profile = StudentProfile(user_id=user.id)
+                db.add(profile)
+                await db.flush()
+                service = AsyncCoinService(db)
+                empty = await service.get_balance(user.id)
+
+                coins = StudentCoin(student_id=profile.id, total_earned=15, current_balance=15)
+                db.add(coins)
+                await db.flush()
+                db.add(CoinTransaction(
+                    student_coin_id=coins.id, type=TransactionType.daily_bonus, amount=15, description="Bonus"
+                ))
+                await db.commit()
+                result = (await service.get_balance(user.id), await service.get_transactions(user.id))
+            await engine.dispose()
+            return empty, result
+
+        empty, (balance, transactions) = asyncio.run(scenario())
+        self.assertEqual(empty["current_balance"], 0)
+        self.assertEqual(balance["current_balance"], 15)
+        self.assertEqual([t["amount"] for t in transactions], [15])
+
+
+if __name__ == "__main__":
+    unittest.main()
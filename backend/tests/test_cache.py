@@ -0,0 +1,98 @@
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.cache import DiskCache, TTLCache, SingleFlight
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2, ttl=None)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")          # "b" is now least recently used
+        cache.set("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_expiry(self):
+        cache = TTLCache(maxsize=10, ttl=5)
+        with patch('app.core.cache.time.monotonic', return_value=100.0):
+            cache.set("a", 1)
+        with patch('app.core.cache.time.monotonic', return_value=106.0):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_delete_where(self):
+        cache = TTLCache()
+        cache.set(("user", 1), "x")
+        cache.set(("user", 2), "y")
+        removed = cache.delete_where(lambda key: key[1] == 1)
+
+        self.assertEqual(removed, 1)
+        self.assertEqual(len(cache), 1)
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_coalesced(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def produce():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"answer": 42}
+
+        async def scenario():
+            return await asyncio.gather(*[flight.do("key", produce) for _ in range(5)])
+
+        results = asyncio.run(scenario())
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r == {"answer": 42} for r in results))
+        self.assertEqual(flight.coalesced, 4)
+
+    def test_error_shared_then_retried(self):
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream")
+
+        async def scenario():
+            return await asyncio.gather(
+                flight.do("key", fail), flight.do("key", fail), return_exceptions=True
+            )
+
+        results = asyncio.run(scenario())
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+
+        async def ok():
+            return "ok"
+
+        self.assertEqual(asyncio.run(flight.do("key", ok)), "ok")
+
+
+class TestDiskCache(unittest.TestCase):
+    def test_overwrite_counts_only_new_size(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = DiskCache(directory, max_bytes=1000)
+            cache.set("a", b"x" * 100)  # first write scans the directory
+            for _ in range(20):
+                cache.set("a", b"x" * 300)
+            cache.set("b", b"y" * 50)
+
+            self.assertEqual(cache.stats()["bytes"], 350)
+            self.assertEqual(cache.evictions, 0)
+            self.assertEqual(cache.get("a"), b"x" * 300)
+
+
+if __name__ == "__main__":
+    unittest.main()
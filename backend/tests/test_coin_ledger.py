@@ -0,0 +1,129 @@
+import unittest
+import uuid
+from unittest.mock import patch
+import sys
+import os
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core import database
+from app.core.database import Base
+from app.core.errors import ServiceUnavailableError
+from app.models import User, UserRole, StudentProfile, StudentCoin, CoinTransaction, TransactionType
+from app.services.coin_ledger import CoinAward, CoinLedger
+
+
+class TestCoinLedger(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(engine)
+        self.engine = engine
+        self.Session = sessionmaker(bind=engine)
+        db = self.Session()
+        self.students = []
+        for i in range(3):
+            user = User(email=f"s{i}@x.com", first_name="S", last_name="S", role=UserRole.student)
+            db.add(user)
+            db.flush()
+            profile = StudentProfile(user_id=user.id)
+            db.add(profile)
+            db.flush()
+            self.students.append(profile.id)
+        db.commit()
+        db.close()
+
+    def _balances(self):
+        db = self.Session()
+        try:
+            return {c.student_id: c.current_balance for c in db.query(StudentCoin).all()}
+        finally:
+            db.close()
+
+    def test_award_many_is_idempotent_per_reference(self):
+        quiz_id = uuid.uuid4()
+        awards = [
+            CoinAward(student_id=s, amount=10 * (i + 1), type=TransactionType.quiz_correct,
+                      description="Live Quiz mukofoti", reference_id=quiz_id, reference_type="live_quiz")
+            for i, s in enumerate(self.students)
+        ]
+
+        db = self.Session()
+        first = CoinLedger(db).award_many(awards)
+        db.commit()
+        repeated = CoinLedger(db).award_many(awards)
+        db.commit()
+
+        self.assertEqual(first, {self.students[0]: 10, self.students[1]: 20, self.students[2]: 30})
+        self.assertEqual(repeated, {})
+        self.assertEqual(db.query(CoinTransaction).count(), 3)
+        db.close()
+
+    def test_awards_from_separate_sessions_both_count(self):
+        # Two sessions that loaded the same balance must not overwrite each other
+        first, second = self.Session(), self.Session()
+        CoinLedger(first).award(self.students[0], 5, TransactionType.game_win, "O'yin", uuid.uuid4(), "game")
+        CoinLedger(second).award(self.students[0], 7, TransactionType.game_win, "O'yin", uuid.uuid4(), "game")
+        first.commit()
+        second.commit()
+
+        self.assertEqual(self._balances()[self.students[0]], 12)
+
+    def test_debit_refuses_overdraft(self):
+        db = self.Session()
+        ledger = CoinLedger(db)
+        ledger.award(self.students[1], 10, TransactionType.daily_bonus, "Kunlik bonus")
+
+        self.assertEqual(ledger.debit(self.students[1], 8, TransactionType.prize_redemption, "Yutiq"), 2)
+        self.assertIsNone(ledger.debit(self.students[1], 8, TransactionType.prize_redemption, "Yutiq"))
+        db.commit()
+        db.close()
+
+    def test_refund_restores_balance_once(self):
+        db = self.Session()
+        ledger = CoinLedger(db)
+        withdrawal_id = uuid.uuid4()
+        ledger.award(self.students[2], 50, TransactionType.daily_bonus, "Kunlik bonus")
+        ledger.debit(self.students[2], 30, TransactionType.withdrawal, "Yechib olish", counter="total_withdrawn")
+
+        args = (self.students[2], 30, TransactionType.admin_adjustment, "Rad etildi")
+        self.assertEqual(ledger.refund(*args, reference_id=withdrawal_id, reference_type="withdrawal_refund"), 50)
+        self.assertIsNone(ledger.refund(*args, reference_id=withdrawal_id, reference_type="withdrawal_refund"))
+        db.commit()
+
+        coin = db.query(StudentCoin).filter(StudentCoin.student_id == self.students[2]).one()
+        self.assertEqual((coin.current_balance, coin.total_withdrawn), (50, 0))
+        db.close()
+
+    def test_credits_refused_without_index_until_auto_migrate_dedupes(self):
+        db = self.Session()
+        coin_id = CoinLedger(db).balance_id(self.students[0])
+        db.commit()
+        with self.engine.begin() as conn:
+            conn.execute(text("DROP INDEX uq_coin_transactions_credit_reference"))
+        # Duplicate credits left by code that predates the ledger
+        for _ in range(2):
+            db.add(CoinTransaction(student_coin_id=coin_id, type=TransactionType.lesson_complete,
+                                   amount=5, description="Dars", reference_id=self.students[0],
+                                   reference_type="lesson"))
+        db.commit()
+
+        with self.assertRaises(ServiceUnavailableError):
+            CoinLedger(db).award(self.students[0], 5, TransactionType.game_win, "O'yin", uuid.uuid4(), "game")
+        db.rollback()
+
+        with patch.object(database, "engine", self.engine):
+            database._auto_migrate_columns()
+        self.assertEqual(db.query(CoinTransaction).count(), 1)
+        self.assertIsNotNone(
+            CoinLedger(db).award(self.students[0], 5, TransactionType.game_win, "O'yin", uuid.uuid4(), "game")
+        )
+        db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
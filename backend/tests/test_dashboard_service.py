@@ -0,0 +1,82 @@
+import unittest
+import sys
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.database import Base
+from app.models import (
+    User, UserRole, StudentProfile, Subject, Lesson, Progress, ProgressStatus, ReadingAnalysis
+)
+from app.services.dashboard_service import DashboardService, dashboard_cache
+from app.services.reading_stats_service import ReadingStatsService
+
+
+class TestDashboardService(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.queries = []
+        event.listen(engine, "before_cursor_execute", lambda *args: self.queries.append(args[2]))
+
+        self.user = User(email="s@x.com", first_name="S", last_name="S", role=UserRole.student)
+        self.db.add(self.user)
+        self.db.flush()
+        self.profile = StudentProfile(user_id=self.user.id, total_points=40, total_coins=7, level=2)
+        self.db.add(self.profile)
+        subject = Subject(name="Matematika", name_uz="Matematika", name_ru="Matematika")
+        self.db.add(subject)
+        self.db.flush()
+        for i, status in enumerate([ProgressStatus.IN_PROGRESS, ProgressStatus.COMPLETED, ProgressStatus.NOT_STARTED]):
+            lesson = Lesson(subject_id=subject.id, title=f"L{i}", title_uz=f"Dars {i}", title_ru=f"L{i}")
+            self.db.add(lesson)
+            self.db.flush()
+            self.db.add(Progress(student_id=self.profile.id, lesson_id=lesson.id, status=status))
+        for words in (100, 50):
+            analysis = ReadingAnalysis(user_id=self.user.id, total_words_read=words, pronunciation_score=80)
+            self.db.add(analysis)
+            ReadingStatsService(self.db).record(analysis)
+        self.db.commit()
+        dashboard_cache.clear()
+
+    def tearDown(self):
+        dashboard_cache.clear()
+        self.db.close()
+
+    def test_summary_in_one_query(self):
+        user_id = self.user.id
+        self.queries.clear()
+        rows = self.db.execute(DashboardService.summary_query(user_id)).all()
+        summary = DashboardService.summarize(rows)
+
+        self.assertEqual(len(self.queries), 1)
+        self.assertEqual(summary["profile"]["points"], 40)
+        self.assertEqual(summary["reading_stats"]["total_sessions"], 2)
+        self.assertEqual(summary["reading_stats"]["total_words"], 150)
+        self.assertEqual(summary["reading_stats"]["avg_pronunciation"], 80.0)
+        self.assertEqual(sorted(t["title"] for t in summary["tasks"]), ["Dars 0", "Dars 2"])
+
+    def test_student_without_data(self):
+        other = User(email="o@x.com", first_name="O", last_name="O", role=UserRole.student)
+        self.db.add(other)
+        self.db.commit()
+        summary = DashboardService.summarize(self.db.execute(DashboardService.summary_query(other.id)).all())
+        self.assertEqual(summary["profile"]["level"], 1)
+        self.assertEqual(summary["reading_stats"]["total_sessions"], 0)
+        self.assertEqual(summary["tasks"], [])
+
+    def test_flush_invalidates_cached_summary(self):
+        dashboard_cache.set(str(self.user.id), {"cached": True})
+        self.db.add(ReadingAnalysis(user_id=self.user.id, total_words_read=10))
+        self.db.commit()
+        self.assertIsNone(dashboard_cache.get(str(self.user.id)))
+
+
+if __name__ == "__main__":
+    unittest.main()
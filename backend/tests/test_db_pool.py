@@ -0,0 +1,51 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.database import _pool_mode
+from app.core.db_metrics import PoolMetrics
+
+POOLER_URL = "postgresql://u:p@aws-0-eu.pooler.supabase.com:6543/postgres"
+DIRECT_URL = "postgresql://u:p@db.example.supabase.co:5432/postgres"
+
+
+class TestPoolMode(unittest.TestCase):
+    def test_defaults(self):
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("DB_POOL_MODE", None)
+            self.assertEqual(_pool_mode(POOLER_URL, serverless=False), "direct")
+            self.assertEqual(_pool_mode(POOLER_URL, serverless=True), "transaction")
+            self.assertEqual(_pool_mode(DIRECT_URL, serverless=True), "none")
+
+    def test_env_override(self):
+        with patch.dict(os.environ, {"DB_POOL_MODE": "transaction"}):
+            self.assertEqual(_pool_mode(DIRECT_URL, serverless=True), "transaction")
+
+
+class TestPoolMetrics(unittest.TestCase):
+    def test_connections_are_reused(self):
+        engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=1, max_overflow=0)
+        metrics = PoolMetrics("test").attach(engine)
+
+        for _ in range(5):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+        stats = metrics.stats()
+        self.assertEqual((stats["connects"], stats["checkouts"]), (1, 5))
+        self.assertEqual((stats["open"], stats["in_use"]), (1, 0))
+        self.assertEqual(stats["reuse_ratio"], 0.8)
+
+        engine.dispose()
+        self.assertEqual(metrics.stats()["open"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
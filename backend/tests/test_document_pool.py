@@ -0,0 +1,71 @@
+import asyncio
+import time
+import unittest
+import sys
+import os
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.errors import ProcessingTimeoutError, ServiceUnavailableError
+from app.core.process_pool import DocumentPool
+
+
+class TestDocumentPool(unittest.TestCase):
+    def test_process_jobs_and_timeout_restart(self):
+        pool = DocumentPool(workers=1, max_queue=4, timeout=10)
+        self.addCleanup(pool.close)
+
+        async def scenario():
+            self.assertEqual(await pool.run(sum, [1, 2, 3]), 6)
+            with self.assertRaises(ValueError):
+                await pool.run(int, "x")
+            with self.assertRaises(ProcessingTimeoutError):
+                await pool.run(time.sleep, 30, timeout=0.5)
+            # The stuck worker was killed; the next job gets a fresh pool
+            return await pool.run(len, b"abcd")
+
+        self.assertEqual(asyncio.run(scenario()), 4)
+        stats = pool.stats()
+        self.assertEqual((stats["timeouts"], stats["restarts"], stats["failed"]), (1, 1, 1))
+
+    def test_restart_lets_other_jobs_finish(self):
+        pool = DocumentPool(workers=2, max_queue=4, timeout=10)
+        self.addCleanup(pool.close)
+
+        async def scenario():
+            # Start both workers before timing anything
+            await asyncio.gather(pool.run(sum, [1]), pool.run(sum, [2]))
+            stuck = asyncio.ensure_future(pool.run(time.sleep, 30, timeout=0.5))
+            other = asyncio.ensure_future(pool.run(time.sleep, 1.5))
+            with self.assertRaises(ProcessingTimeoutError):
+                await stuck
+            # Another user's job in the retired pool still completes
+            self.assertIsNone(await other)
+
+        asyncio.run(scenario())
+        stats = pool.stats()
+        self.assertEqual((stats["restarts"], stats["lost"], stats["failed"]), (1, 0, 0))
+
+    def test_queue_limit_rejects_and_event_loop_stays_free(self):
+        pool = DocumentPool(workers=1, max_queue=2, timeout=5, use_processes=False)
+        self.addCleanup(pool.close)
+
+        async def scenario():
+            jobs = [asyncio.ensure_future(pool.run(time.sleep, 0.3)) for _ in range(2)]
+            await asyncio.sleep(0)
+            with self.assertRaises(ServiceUnavailableError):
+                await pool.run(time.sleep, 0.3)
+            # The loop keeps serving while the jobs block their worker
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            self.assertLess(time.perf_counter() - started, 0.2)
+            await asyncio.gather(*jobs)
+
+        asyncio.run(scenario())
+        self.assertEqual(pool.stats()["rejected"], 1)
+        self.assertEqual(pool.stats()["pending"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
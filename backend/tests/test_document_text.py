@@ -0,0 +1,86 @@
+import unittest
+import sys
+import os
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.document_text import iter_pdf_pages
+from app.services.testai.parsers import parse_pdf, parse_test_pages
+from app.smartkids import file_reader_router
+
+
+def _escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages):
+    """Minimal PDF with one text line per entry of each page's list."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        body = "BT /F1 12 Tf 14 TL 72 720 Td " + " ".join(f"({_escape(line)}) Tj T*" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(body)} >>\nstream\n{body}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF".encode()
+    return out
+
+
+def question_page(first, count, answer=None):
+    lines = []
+    for i in range(first, first + count):
+        lines += [f"{i}. Savol {i}?", "A) bir", "B) ikki", "C) uch", "D) tort"]
+        if answer:
+            lines.append(f"Javob: {answer}")
+    return lines
+
+
+class CountingPages:
+    def __init__(self, pages):
+        self.pages = pages
+        self.pulled = 0
+
+    def __iter__(self):
+        for page in self.pages:
+            self.pulled += 1
+            yield page
+
+
+class TestDocumentText(unittest.TestCase):
+    def test_pdf_pages_and_parse(self):
+        pdf = make_pdf([question_page(1, 2), question_page(3, 2) + ["Javoblar: 1 a 2 b 3 c 4 d"]])
+        self.assertEqual(len(list(iter_pdf_pages(pdf))), 2)
+
+        tests = parse_pdf(pdf)
+        self.assertEqual([t["question"] for t in tests], ["Savol 1?", "Savol 2?", "Savol 3?", "Savol 4?"])
+        self.assertEqual([t["correct_answer"] for t in tests], ["A", "B", "C", "D"])
+
+    def test_question_budget_stops_reading_pages(self):
+        pages = CountingPages(["\n".join(question_page(i * 3 + 1, 3, answer="B")) for i in range(10)])
+        tests = parse_test_pages(pages, max_questions=4)
+        self.assertEqual(len(tests), 4)
+        self.assertEqual(pages.pulled, 2)  # question 4 is complete once question 5 starts on page 2
+
+    def test_read_pdf_word_budget(self):
+        page = ["soz " * 20] * 5  # 100 words per page
+        pdf = make_pdf([page] * 10)
+        text = file_reader_router.read_pdf(pdf, max_words=250)
+        self.assertEqual(len(text.split()), 300)  # 3 of 10 pages extracted
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+import httpx
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.http_clients import HTTPClientRegistry
+from app.services import notification_service
+from app.services.notification_service import EskizAuth, NotificationService
+
+
+class TestHTTPClientRegistry(unittest.TestCase):
+    def test_client_reused_within_loop_and_closed(self):
+        registry = HTTPClientRegistry()
+
+        async def scenario():
+            first = registry.get("telegram")
+            self.assertIs(registry.get("telegram"), first)
+            self.assertIsNot(registry.get("eskiz"), first)
+            await registry.close()
+            return first
+
+        self.assertTrue(asyncio.run(scenario()).is_closed)
+
+    def test_client_from_previous_loop_is_closed_when_replaced(self):
+        registry = HTTPClientRegistry()
+
+        async def first_loop():
+            return registry.get("telegram")
+
+        async def second_loop():
+            client = registry.get("telegram")
+            await asyncio.sleep(0)  # let the retired client's aclose() run
+            await registry.close()
+            return client
+
+        old = asyncio.run(first_loop())
+        new = asyncio.run(second_loop())
+        self.assertIsNot(new, old)
+        self.assertTrue(old.is_closed)
+
+
+class TestEskizToken(unittest.TestCase):
+    def setUp(self):
+        self.calls = {"login": 0, "send": 0}
+        self.reject_token = None
+
+        def handler(request):
+            if request.url.path.endswith("/auth/login"):
+                self.calls["login"] += 1
+                return httpx.Response(200, json={"data": {"token": f"t{self.calls['login']}"}})
+            self.calls["send"] += 1
+            if request.headers["authorization"] == f"Bearer {self.reject_token}":
+                return httpx.Response(401, text="expired")
+            return httpx.Response(200, json={"status": "waiting"})
+
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        self.patchers = [
+            patch.object(notification_service, 'eskiz_auth', EskizAuth()),
+            patch.object(notification_service.http_clients, 'get', return_value=self.client),
+        ]
+        for p in self.patchers:
+            p.start()
+        self.service = NotificationService(MagicMock())
+
+    def tearDown(self):
+        for p in self.patchers:
+            p.stop()
+
+    def test_token_cached_between_messages(self):
+        async def scenario():
+            return [await self.service.send_sms("+998901234567", "salom") for _ in range(3)]
+
+        self.assertEqual(asyncio.run(scenario()), [True, True, True])
+        self.assertEqual(self.calls, {"login": 1, "send": 3})
+
+    def test_rejected_token_refreshed_once(self):
+        asyncio.run(self.service.send_sms("+998901234567", "salom"))
+        self.reject_token = "t1"
+
+        self.assertTrue(asyncio.run(self.service.send_sms("+998901234567", "salom")))
+        self.assertEqual(self.calls, {"login": 2, "send": 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import sys
+import os
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models import OlympiadStatus, ParticipationStatus
+from app.services.leaderboard import MemoryLeaderboardBackend, leaderboards
+from app.services.olympiad_service import OlympiadService
+from tests.olympiad_fixtures import add_student, create_olympiad, make_session
+
+
+class TestMemoryLeaderboard(unittest.TestCase):
+    def setUp(self):
+        self.board = MemoryLeaderboardBackend()
+
+    def test_updates_keep_order(self):
+        self.board.replace("b", [("a", 10, 0, {"name": "A"}), ("b", 20, 0, {}), ("c", 10, 5, {})])
+        self.assertEqual([e.member for e in self.board.top("b")], ["b", "c", "a"])
+
+        self.board.update("b", "a", 30, info={"streak": 2})
+        self.board.update("b", "d", 15)
+        self.assertEqual([e.member for e in self.board.top("b")], ["a", "b", "d", "c"])
+        self.assertEqual([e.member for e in self.board.top("b", limit=2, offset=1)], ["b", "d"])
+
+        entry = self.board.rank("b", "a")
+        self.assertEqual((entry.rank, entry.score), (1, 30))
+        self.assertEqual(entry.info, {"name": "A", "streak": 2})
+        self.assertEqual(self.board.rank("b", "c").rank, 4)
+        self.assertIsNone(self.board.rank("b", "missing"))
+        self.assertEqual(self.board.size("b"), 4)
+
+    def test_needs_sync(self):
+        self.assertTrue(self.board.needs_sync("b"))
+        self.board.replace("b", [])
+        self.assertFalse(self.board.needs_sync("b"))
+        self.assertFalse(self.board.needs_sync("b", max_age=60))
+        self.assertTrue(self.board.needs_sync("b", max_age=-1))
+        self.board.drop("b")
+        self.assertTrue(self.board.needs_sync("b"))
+
+    def test_reads_do_not_create_boards(self):
+        self.assertEqual(self.board.top("olympiad:x:final"), [])
+        self.assertIsNone(self.board.rank("olympiad:x:final", "a"))
+        self.assertEqual(self.board.size("olympiad:x:final"), 0)
+        self.board.needs_sync("olympiad:x:final")
+        self.assertEqual(self.board.stats()["boards"], 0)
+
+    def test_idle_and_surplus_boards_evicted(self):
+        self.board.MAX_BOARDS = 2
+        self.board.replace("old", [("a", 1, 0, {})])
+        self.board.replace("kept", [("a", 1, 0, {})])
+        self.board.top("old")  # read last: "kept" is now the least recently used
+        self.board.update("new", "a", 1)
+        self.assertEqual(self.board.size("kept"), 0)
+        self.assertTrue(self.board.needs_sync("kept"))
+        self.assertEqual(self.board.size("old"), 1)
+
+        self.board.MAX_BOARDS = 10
+        self.board._boards["new"].used_at -= self.board.IDLE_TTL + 1  # least recently used
+        self.board.replace("newer", [])
+        self.assertEqual(sorted(self.board._boards), ["newer", "old"])
+
+
+class TestOlympiadLeaderboard(unittest.TestCase):
+    def setUp(self):
+        self.db = make_session()
+        self.olympiad = create_olympiad(self.db, status=OlympiadStatus.active)
+
+        # (name, score, time spent, status)
+        results = [("Ali", 10, 100, "completed"), ("Vali", 10, 50, "completed"),
+                   ("Gani", 12, None, "started"), ("Soli", 0, None, "registered")]
+        self.users = {
+            name: add_student(
+                self.db, self.olympiad, first_name=name, total_score=score,
+                time_spent_seconds=spent, status=ParticipationStatus(state)
+            ).user_id
+            for name, score, spent, state in results
+        }
+        self.db.commit()
+        self.service = OlympiadService(self.db)
+
+    def tearDown(self):
+        leaderboards.drop(f"olympiad:{self.olympiad.id}")
+        leaderboards.drop(f"olympiad:{self.olympiad.id}:final")
+        self.db.close()
+
+    def test_live_board_then_final_results(self):
+        live = self.service.get_live_leaderboard(self.olympiad.id)
+        self.assertEqual([r["student_name"] for r in live], ["Gani", "Vali", "Ali"])
+
+        # Score changes are applied to the loaded board without a re-read
+        ali = self.service._get_participant(self.users["Ali"], self.olympiad.id)
+        ali.total_score = 20
+        self.db.commit()
+        self.service._update_leaderboard(ali)
+        self.assertEqual(self.service.get_my_rank(self.users["Ali"], self.olympiad.id)["rank"], 1)
+
+        self.service._calculate_rankings(self.olympiad.id)
+        self.olympiad.status = OlympiadStatus.finished
+        self.db.commit()
+
+        results = self.service.get_olympiad_results(self.olympiad.id)
+        self.assertEqual(
+            [(r["rank"], r["student_name"], r["coins_earned"]) for r in results],
+            [(1, "Ali", 500), (2, "Vali", 300)]
+        )
+        self.assertEqual(len(self.service.get_olympiad_results(self.olympiad.id, limit=1, offset=1)), 1)
+        self.assertEqual(self.service.get_my_rank(self.users["Vali"], self.olympiad.id)["rank"], 2)
+
+        # The live endpoint keeps its row shape after the olympiad finishes
+        final = self.service.get_live_leaderboard(self.olympiad.id)
+        self.assertEqual(set(final[0]), set(live[0]))
+        self.assertEqual([(r["rank"], r["student_name"]) for r in final], [(1, "Ali"), (2, "Vali")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, patch
+import sys
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.harf import router as harf_router
+from app.services.letter_audio import LetterAudioBundle, UZ_LETTERS, RU_LETTERS
+
+
+async def fake_synthesize(ssml):
+    return b"ID3" + ssml.encode("utf-8")
+
+
+class TestLetterAudioBundle(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.bundle = LetterAudioBundle(self.tmpdir.name)
+        self.synthesize = AsyncMock(side_effect=fake_synthesize)
+        with patch('app.services.letter_audio.speech_service.synthesize', new=self.synthesize):
+            self.summary = asyncio.run(self.bundle.build(version="v1"))
+
+        app = FastAPI()
+        app.include_router(harf_router.router, prefix="/harf")
+        self.client = TestClient(app)
+        self.patcher = patch('app.harf.router.letter_audio_bundle', new=self.bundle)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmpdir.cleanup()
+
+    def test_build_renders_unique_variants(self):
+        self.assertEqual(self.summary["clips"], self.synthesize.await_count)
+        self.assertGreater(self.summary["clips"], len(UZ_LETTERS) + len(RU_LETTERS))
+        self.assertEqual(self.bundle.stats()["version"], "v1")
+
+    def test_bundled_letter_served_with_etag(self):
+        with patch('app.harf.router.speech_service.synthesize', new=AsyncMock()) as live:
+            response = self.client.get("/harf/text-to-speech", params={"text": "Sh harfi"})
+            live.assert_not_awaited()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["accept-ranges"], "bytes")
+        etag = response.headers["etag"]
+
+        cached = self.client.get(
+            "/harf/text-to-speech", params={"text": "Sh harfi"}, headers={"If-None-Match": etag}
+        )
+        self.assertEqual(cached.status_code, 304)
+
+    def test_range_request(self):
+        full = self.client.post("/harf/text-to-speech", json={"text": "a"}).content
+        partial = self.client.post(
+            "/harf/text-to-speech", json={"text": "a"}, headers={"Range": "bytes=0-2"}
+        )
+
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial.content, full[:3])
+        self.assertEqual(partial.headers["content-range"], f"bytes 0-2/{len(full)}")
+
+    def test_miss_falls_back_to_azure(self):
+        with patch('app.harf.router.speech_service.synthesize', new=AsyncMock(return_value=b"live")):
+            response = self.client.post("/harf/text-to-speech", json={"text": "Salom dunyo"})
+
+        self.assertEqual(response.content, b"live")
+        self.assertNotIn("etag", response.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
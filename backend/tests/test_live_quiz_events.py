@@ -0,0 +1,99 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+import sys
+import os
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from main import app
+from app.core.errors import ForbiddenError
+from app.middleware.auth import create_access_token
+from app.services.live_quiz_events import LiveQuizHub, live_quiz_hub
+
+
+class TestLiveQuizHub(unittest.TestCase):
+    def test_publish_reaches_subscribers_of_same_code_only(self):
+        hub = LiveQuizHub()
+
+        async def scenario():
+            q1 = hub.subscribe("123456")
+            q2 = hub.subscribe("654321")
+            hub.publish("123456", "question_start", {"question_number": 1})
+            await asyncio.sleep(0)
+            return q1, q2
+
+        q1, q2 = asyncio.run(scenario())
+        self.assertEqual(q1.qsize(), 1)
+        self.assertEqual(q2.qsize(), 0)
+        self.assertEqual(q1.get_nowait()["event"], "question_start")
+
+    def test_slow_subscriber_drops_oldest_event(self):
+        hub = LiveQuizHub()
+        hub.QUEUE_SIZE = 2
+
+        async def scenario():
+            queue = hub.subscribe("123456")
+            for i in range(3):
+                hub.publish("123456", "answer_count", {"answered": i})
+            await asyncio.sleep(0)
+            return queue
+
+        queue = asyncio.run(scenario())
+        answered = [queue.get_nowait()["data"]["answered"] for _ in range(queue.qsize())]
+        self.assertEqual(answered, [1, 2])
+
+    def test_unsubscribe_removes_channel(self):
+        hub = LiveQuizHub()
+
+        async def scenario():
+            queue = hub.subscribe("123456")
+            hub.unsubscribe("123456", queue)
+
+        asyncio.run(scenario())
+        self.assertEqual(hub.subscriber_count("123456"), 0)
+
+
+class TestLiveQuizWebSocket(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.token = create_access_token("00000000-0000-0000-0000-000000000001", "s@test.com", "student")
+
+    def test_rejects_invalid_token(self):
+        with self.assertRaises(Exception):
+            with self.client.websocket_connect("/api/v1/live-quiz/ws/123456?token=bad"):
+                pass
+
+    @patch('app.api.v1.endpoints.live_quiz.SessionLocal', MagicMock())
+    @patch('app.api.v1.endpoints.live_quiz.LiveQuizService')
+    def test_sends_snapshot_then_events(self, MockService):
+        MockService.return_value.get_snapshot.return_value = {"status": "waiting", "participants_count": 0}
+
+        with self.client.websocket_connect(f"/api/v1/live-quiz/ws/123456?token={self.token}") as ws:
+            snapshot = ws.receive_json()
+            self.assertEqual(
+                str(MockService.return_value.get_snapshot.call_args.args[1]),
+                "00000000-0000-0000-0000-000000000001"
+            )
+            self.assertEqual(snapshot["event"], "snapshot")
+            self.assertEqual(snapshot["data"]["status"], "waiting")
+
+            live_quiz_hub.publish("123456", "quiz_end", {"leaderboard": []})
+            message = ws.receive_json()
+            self.assertEqual(message["event"], "quiz_end")
+
+    @patch('app.api.v1.endpoints.live_quiz.SessionLocal', MagicMock())
+    @patch('app.api.v1.endpoints.live_quiz.LiveQuizService')
+    def test_rejects_user_outside_quiz(self, MockService):
+        MockService.return_value.get_snapshot.side_effect = ForbiddenError()
+
+        with self.assertRaises(Exception):
+            with self.client.websocket_connect(f"/api/v1/live-quiz/ws/123456?token={self.token}"):
+                pass
+        self.assertEqual(live_quiz_hub.subscriber_count("123456"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
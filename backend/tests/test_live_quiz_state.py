@@ -0,0 +1,189 @@
+import unittest
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+import sys
+import os
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.database import Base
+from app.core.errors import BadRequestError, NotFoundError
+from app.models import (
+    User, UserRole, StudentProfile, TeacherProfile, LiveQuiz, LiveQuizQuestion,
+    LiveQuizParticipant, LiveQuizAnswer, LiveQuizStatus
+)
+from app.services.leaderboard import leaderboards
+from app.services.live_quiz_service import LiveQuizService
+from app.services.live_quiz_state import LiveQuizSession, LiveQuizStateEngine
+
+
+class TestLiveQuizSession(unittest.TestCase):
+    def setUp(self):
+        quiz = MagicMock(id=uuid4(), join_code="123456", current_question_index=0)
+
+        self.question = MagicMock(
+            id=uuid4(), question_text="2+2?", question_image=None,
+            options=["3", "4"], correct_answer=1, points=100, time_limit=30
+        )
+
+        self.user_id = uuid4()
+        participant = MagicMock(
+            id=uuid4(), display_name="Ali", avatar_emoji="🎮",
+            total_score=0, correct_count=0, wrong_count=0, current_streak=0, best_streak=0
+        )
+
+        self.session = LiveQuizSession(quiz, [self.question], [(participant, self.user_id)])
+
+    def test_correct_answer_scored_and_queued(self):
+        participant = self.session.participant_for(self.user_id)
+        result = self.session.record_answer(participant, self.question.id, 1, 3000)
+
+        self.assertTrue(result["is_correct"])
+        self.assertEqual(result["points_earned"], 90)
+        self.assertEqual(participant.best_streak, 1)
+        self.assertEqual(len(self.session.pending_answers), 1)
+        self.assertEqual(self.session.answered_count(self.question.id), 1)
+
+    def test_duplicate_answer_rejected(self):
+        participant = self.session.participant_for(self.user_id)
+        self.session.record_answer(participant, self.question.id, 0, 1000)
+
+        with self.assertRaises(BadRequestError):
+            self.session.record_answer(participant, self.question.id, 1, 1000)
+        self.assertEqual(participant.wrong_count, 1)
+
+    def test_unknown_participant_and_question(self):
+        with self.assertRaises(NotFoundError):
+            self.session.participant_for(uuid4())
+
+        participant = self.session.participant_for(self.user_id)
+        with self.assertRaises(NotFoundError):
+            self.session.record_answer(participant, uuid4(), 1, 1000)
+
+    def test_answer_to_question_that_is_not_current_rejected(self):
+        participant = self.session.participant_for(self.user_id)
+        self.session.current_index = 1
+
+        with self.assertRaises(BadRequestError):
+            self.session.record_answer(participant, self.question.id, 1, 1000)
+        self.assertEqual(self.session.pending_answers, [])
+
+    def test_rank_of_participant_missing_from_board(self):
+        leaderboards.drop(self.session.board)
+        with patch("app.services.live_quiz_service.live_quiz_state.get_or_load", return_value=self.session):
+            rank = LiveQuizService(MagicMock()).get_student_rank(self.user_id, uuid4())
+
+        self.assertIsNone(rank["rank"])
+        self.assertEqual((rank["display_name"], rank["total_score"], rank["participants_count"]), ("Ali", 0, 1))
+
+    def test_flush_writes_batch_and_clears_pending(self):
+        engine = LiveQuizStateEngine()
+        participant = self.session.participant_for(self.user_id)
+        self.session.record_answer(participant, self.question.id, 1, 1000)
+
+        db = MagicMock()
+        db.identity_map.values.return_value = []
+
+        written = engine.flush(db, self.session)
+
+        self.assertEqual(written, 1)
+        self.assertEqual(db.execute.call_count, 3)  # answers, score deltas, reload
+        self.assertEqual(self.session.pending_answers, [])
+        self.assertFalse(engine.should_flush(self.session))
+
+
+class TestLiveQuizFlushAcrossWorkers(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+
+        teacher = User(email="t@x.com", first_name="T", last_name="T", role=UserRole.teacher)
+        student = User(email="s@x.com", first_name="S", last_name="S", role=UserRole.student)
+        self.db.add_all([teacher, student])
+        self.db.flush()
+        teacher_profile = TeacherProfile(user_id=teacher.id)
+        profile = StudentProfile(user_id=student.id)
+        self.db.add_all([teacher_profile, profile])
+        self.db.flush()
+        self.quiz = LiveQuiz(
+            teacher_id=teacher_profile.id, title="Quiz", join_code="123456", status=LiveQuizStatus.active
+        )
+        self.db.add(self.quiz)
+        self.db.flush()
+        self.questions = [
+            LiveQuizQuestion(quiz_id=self.quiz.id, question_text=f"Q{i}", options=["a", "b"], correct_answer=1, order=i)
+            for i in range(2)
+        ]
+        self.db.add_all(self.questions)
+        self.db.add(LiveQuizParticipant(quiz_id=self.quiz.id, student_id=profile.id, display_name="Ali"))
+        self.db.commit()
+        self.user_id = student.id
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_two_workers_add_up_instead_of_overwriting(self):
+        worker_a, worker_b = LiveQuizStateEngine(), LiveQuizStateEngine()
+        session_a = worker_a.load(self.db, self.quiz)
+        session_b = worker_b.load(self.db, self.quiz)
+
+        first = session_a.record_answer(session_a.participant_for(self.user_id), self.questions[0].id, 1, 0)
+        session_b.current_index = 1  # the teacher moved on before the second answer
+        second = session_b.record_answer(session_b.participant_for(self.user_id), self.questions[1].id, 1, 0)
+        worker_a.flush(self.db, session_a)
+        worker_b.flush(self.db, session_b)
+        self.db.commit()
+
+        expected = first["points_earned"] + second["points_earned"]
+        participant = self.db.query(LiveQuizParticipant).one()
+        self.assertEqual((participant.total_score, participant.correct_count), (expected, 2))
+        # Worker B already sees worker A's points after its flush
+        self.assertEqual(session_b.participant_for(self.user_id).total_score, expected)
+
+    def test_answer_sent_to_two_workers_counted_once(self):
+        worker_a, worker_b = LiveQuizStateEngine(), LiveQuizStateEngine()
+        session_a = worker_a.load(self.db, self.quiz)
+        session_b = worker_b.load(self.db, self.quiz)
+
+        answer = session_a.record_answer(session_a.participant_for(self.user_id), self.questions[0].id, 1, 0)
+        session_b.record_answer(session_b.participant_for(self.user_id), self.questions[0].id, 1, 0)
+        worker_a.flush(self.db, session_a)
+        worker_b.flush(self.db, session_b)
+        self.db.commit()
+
+        participant = self.db.query(LiveQuizParticipant).one()
+        self.assertEqual((participant.total_score, participant.correct_count), (answer["points_earned"], 1))
+        self.assertEqual(self.db.query(LiveQuizAnswer).count(), 1)
+        self.assertEqual(session_b.participant_for(self.user_id).total_score, answer["points_earned"])
+
+    def test_stale_session_follows_database(self):
+        worker = LiveQuizStateEngine()
+        session = worker.load(self.db, self.quiz)
+
+        # The teacher's worker moves to the next question
+        self.quiz.current_question_index = 1
+        self.db.commit()
+        self.assertIs(worker.get_or_load(self.db, self.quiz.id), session)
+        self.assertEqual(session.current_index, 0)  # still within SYNC_INTERVAL
+
+        session.synced_at -= worker.SYNC_INTERVAL
+        self.assertIs(worker.get_or_load(self.db, self.quiz.id), session)
+        self.assertEqual(session.current_index, 1)
+
+        # ... and ends the quiz: this worker stops scoring
+        session.record_answer(session.participant_for(self.user_id), self.questions[1].id, 1, 0)
+        self.quiz.status = LiveQuizStatus.finished
+        self.db.commit()
+        session.synced_at -= worker.SYNC_INTERVAL
+        self.assertIsNone(worker.get_or_load(self.db, self.quiz.id))
+        self.assertIsNone(worker.get(self.quiz.id))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+import sys
+import os
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.errors import ServiceUnavailableError
+from app.models.notification import NotificationType
+from app.services.notification_queue import MemoryJobBackend, NotificationQueue
+
+
+class TestNotificationQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = NotificationQueue()
+        self.delivered = []
+        self.written = []
+
+        async def deliver(job):
+            if job.recipient == "bad":
+                raise Exception("provider down")
+            self.delivered.append(job.recipient)
+
+        self.patchers = [
+            patch.object(self.queue, '_deliver', side_effect=deliver),
+            patch.object(NotificationQueue, '_write_logs', side_effect=lambda rows: self.written.append(rows)),
+            patch('app.services.notification_queue._retry_delay', new_callable=AsyncMock),
+        ]
+        for p in self.patchers:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patchers:
+            p.stop()
+
+    def test_jobs_sent_in_background_and_logged_in_one_batch(self):
+        async def scenario():
+            ids = [
+                await self.queue.enqueue(NotificationType.SMS, f"+99890000000{i}", "salom")
+                for i in range(5)
+            ]
+            ids.append(await self.queue.enqueue(NotificationType.TELEGRAM, "bad", "salom"))
+            await self.queue.stop()
+            return ids
+
+        ids = asyncio.run(scenario())
+
+        self.assertEqual(len(self.delivered), 5)
+        self.assertEqual(len(self.written), 1)
+        rows = {str(row["id"]): row for row in self.written[0]}
+        self.assertEqual(set(rows), set(ids))
+        self.assertEqual(rows[ids[-1]]["status"], "failed")
+        self.assertEqual(self.queue.failed, 1)
+
+    def test_send_now_delivers_before_returning(self):
+        async def scenario():
+            sent = await self.queue.send_now(NotificationType.SMS, "+998900000001", "parol")
+            failed = await self.queue.send_now(NotificationType.SMS, "bad", "parol")
+            delivered = list(self.delivered)
+            await self.queue.stop()
+            return sent, failed, delivered
+
+        sent, failed, delivered = asyncio.run(scenario())
+
+        self.assertTrue(sent)
+        self.assertFalse(failed)
+        self.assertEqual(delivered, ["+998900000001"])
+        self.assertEqual([row["status"] for row in self.written[0]], ["sent", "failed"])
+
+    def test_full_queue_is_rejected_with_503(self):
+        async def scenario():
+            with patch.object(self.queue, '_make_backend', return_value=MemoryJobBackend(maxsize=1)):
+                await self.queue.enqueue(NotificationType.EMAIL, "a@alif24.uz", "salom")
+                with self.assertRaises(ServiceUnavailableError):
+                    await self.queue.enqueue(NotificationType.EMAIL, "b@alif24.uz", "salom")
+            await self.queue.stop()
+
+        asyncio.run(scenario())
+        self.assertEqual(self.delivered, ["a@alif24.uz"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import uuid
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.errors import NotFoundError
+from app.models import Olympiad, OlympiadParticipant
+from app.services.olympiad_paper import OlympiadPaper
+from app.services.olympiad_service import OlympiadService
+
+
+class TestAnswerSheet(unittest.TestCase):
+    def setUp(self):
+        self.questions = [str(uuid.uuid4()) for _ in range(4)]
+        self.paper = OlympiadPaper(
+            olympiad_id="o1", body=b"{}", etag='"x"', duration_minutes=30, questions_count=4,
+            answer_key={q: (1, 5) for q in self.questions}
+        )
+        self.participant = OlympiadParticipant(
+            id=uuid.uuid4(), olympiad=Olympiad(), total_score=5, correct_answers=1, wrong_answers=0
+        )
+        self.db = MagicMock()
+        # First question was already answered one-by-one
+        self.db.query.return_value.filter.return_value = [(uuid.UUID(self.questions[0]),)]
+        self.service = OlympiadService(self.db)
+        self.patchers = [
+            patch.object(OlympiadService, '_get_started_participant', return_value=(self.participant, 42.0)),
+            patch('app.services.olympiad_service.olympiad_papers.get', return_value=self.paper),
+        ]
+        for p in self.patchers:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patchers:
+            p.stop()
+
+    def test_sheet_scored_and_inserted_in_one_statement(self):
+        sheet = [{"question_id": q, "selected_answer": i % 2} for i, q in enumerate(self.questions)]
+        sheet.append({"question_id": self.questions[1], "selected_answer": 0})
+
+        result = self.service.submit_answer_sheet(uuid.uuid4(), uuid.uuid4(), sheet)
+
+        self.assertEqual((result["accepted"], result["skipped"]), (3, 1))
+        self.assertEqual(self.db.execute.call_count, 1)
+        self.assertEqual(len(self.db.execute.call_args[0][1]), 3)
+        self.db.commit.assert_called_once()
+        self.assertEqual(
+            (self.participant.total_score, self.participant.correct_answers, self.participant.wrong_answers),
+            (15, 3, 1)
+        )
+
+    def test_unknown_question_rejects_sheet(self):
+        with self.assertRaises(NotFoundError):
+            self.service.submit_answer_sheet(uuid.uuid4(), uuid.uuid4(), [
+                {"question_id": str(uuid.uuid4()), "selected_answer": 1}
+            ])
+        self.db.execute.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
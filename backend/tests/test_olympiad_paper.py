@@ -0,0 +1,75 @@
+import unittest
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.api.v1.endpoints import olympiad as olympiad_router
+from app.core.database import get_db
+from app.middleware.auth import get_current_user
+from app.models import Olympiad, OlympiadQuestion
+from app.services.olympiad_paper import OlympiadPaperCache
+
+
+class TestOlympiadPaper(unittest.TestCase):
+    def setUp(self):
+        self.olympiad = Olympiad(id=uuid.uuid4(), title="Matematika", duration_minutes=30)
+        questions = [
+            OlympiadQuestion(id=uuid.uuid4(), question_text=f"{i} + 1 = ?", options=["1", "2"],
+                             correct_answer=1, points=5, order=i)
+            for i in range(3)
+        ]
+        self.db = MagicMock()
+        self.db.query.return_value.filter.return_value.order_by.return_value.all.return_value = questions
+        self.papers = OlympiadPaperCache()
+
+    def test_compiled_once_without_answers(self):
+        first = self.papers.get(self.db, self.olympiad)
+        second = self.papers.get(self.db, self.olympiad)
+
+        self.assertIs(first, second)
+        self.assertEqual(self.db.query.call_count, 1)
+        self.assertNotIn(b"correct", first.body)
+
+        self.papers.invalidate(self.olympiad.id)
+        self.papers.get(self.db, self.olympiad)
+        self.assertEqual(self.db.query.call_count, 2)
+
+    def test_recompiled_when_olympiad_changed_in_another_worker(self):
+        first = self.papers.get(self.db, self.olympiad)
+        # add_questions handled by another worker bumps updated_at
+        self.olympiad.updated_at = datetime.now(timezone.utc)
+        second = self.papers.get(self.db, self.olympiad)
+
+        self.assertIsNot(first, second)
+        self.assertEqual(second.updated_at, self.olympiad.updated_at)
+        self.assertIs(self.papers.get(self.db, self.olympiad), second)
+        self.assertEqual(self.db.query.call_count, 2)
+
+    def test_paper_endpoint_honours_etag(self):
+        paper = self.papers.get(self.db, self.olympiad)
+        app = FastAPI()
+        app.include_router(olympiad_router.router)
+        app.dependency_overrides[get_db] = lambda: self.db
+        app.dependency_overrides[get_current_user] = lambda: MagicMock(id=uuid.uuid4())
+        client = TestClient(app)
+
+        with patch.object(olympiad_router.OlympiadService, 'get_paper_for_student', return_value=paper):
+            url = f"/olympiad/{self.olympiad.id}/paper"
+            response = client.get(url)
+            cached = client.get(url, headers={"If-None-Match": paper.etag})
+
+        self.assertEqual(response.content, paper.body)
+        self.assertEqual(response.headers["etag"], paper.etag)
+        self.assertEqual(cached.status_code, 304)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import sys
+import os
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models import (
+    OlympiadParticipant, ParticipationStatus, StudentCoin, CoinTransaction, TransactionType
+)
+from app.services.olympiad_service import OlympiadService
+from tests.olympiad_fixtures import add_student, create_olympiad, make_session
+
+
+class TestOlympiadRankings(unittest.TestCase):
+    def setUp(self):
+        self.db = make_session()
+        self.olympiad = create_olympiad(self.db)
+
+        # (score, time spent, status)
+        results = [(15, 100, "completed"), (15, 100, "completed"), (15, 90, "completed"),
+                   (5, 50, "completed"), (0, 10, "completed"), (20, 10, "started")]
+        self.students = [
+            add_student(
+                self.db, self.olympiad, total_score=score,
+                time_spent_seconds=spent, status=ParticipationStatus(state)
+            ).id
+            for score, spent, state in results
+        ]
+        self.db.add(StudentCoin(student_id=self.students[3], total_earned=7, current_balance=7))
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_dense_ranks_and_bulk_payout(self):
+        OlympiadService(self.db)._calculate_rankings(self.olympiad.id)
+
+        participants = {
+            p.student_id: p for p in self.db.query(OlympiadParticipant).all()
+        }
+        self.assertEqual(
+            [(participants[s].rank, participants[s].coins_earned) for s in self.students],
+            [(2, 300), (2, 300), (1, 500), (3, 100), (4, 10), (None, 0)]
+        )
+
+        balances = {c.student_id: c.current_balance for c in self.db.query(StudentCoin).all()}
+        self.assertEqual(balances[self.students[3]], 107)
+        self.assertNotIn(self.students[5], balances)
+
+        transactions = self.db.query(CoinTransaction).all()
+        self.assertEqual(len(transactions), 5)
+        self.assertEqual(
+            sorted(t.type for t in transactions if t.type != TransactionType.olympiad_second),
+            sorted([TransactionType.olympiad_first, TransactionType.olympiad_third,
+                    TransactionType.olympiad_participation])
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+from sqlalchemy import event
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.errors import BadRequestError
+from app.models import OlympiadStatus, OlympiadParticipant
+from app.services.olympiad_service import OlympiadService, upcoming_olympiads_cache
+from tests.olympiad_fixtures import add_student, create_olympiad, make_session
+
+
+class TestOlympiadRegistration(unittest.TestCase):
+    def setUp(self):
+        self.db = make_session()
+        self.queries = []
+        event.listen(self.db.get_bind(), "before_cursor_execute", lambda *args: self.queries.append(args[2]))
+
+        self.olympiad = create_olympiad(self.db, status=OlympiadStatus.upcoming, max_participants=2)
+        self.students = [add_student(self.db).user_id for _ in range(3)]
+        self.db.commit()
+
+        upcoming_olympiads_cache.clear()
+        self.service = OlympiadService(self.db)
+        patcher = patch.object(OlympiadService, '_check_student_subscription', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        upcoming_olympiads_cache.clear()
+        self.db.close()
+
+    def test_counter_enforces_max_participants(self):
+        self.service.register_student(self.students[0], self.olympiad.id)
+
+        with self.assertRaises(BadRequestError):
+            self.service.register_student(self.students[0], self.olympiad.id)
+
+        self.service.register_student(self.students[1], self.olympiad.id)
+        with self.assertRaises(BadRequestError):
+            self.service.register_student(self.students[2], self.olympiad.id)
+
+        self.db.refresh(self.olympiad)
+        self.assertEqual(self.olympiad.participants_count, 2)
+        self.assertEqual(self.db.query(OlympiadParticipant).count(), 2)
+
+    def test_listing_is_one_query_and_cached(self):
+        self.queries.clear()
+        listing = self.service.get_upcoming_olympiads()
+        self.assertEqual(listing[0]["participants_count"], 0)
+        self.assertEqual(self.service.get_upcoming_olympiads(), listing)
+        self.assertEqual(len(self.queries), 1)
+
+        self.service.register_student(self.students[0], self.olympiad.id)
+        self.assertEqual(self.service.get_upcoming_olympiads()[0]["participants_count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import asyncio
+import hashlib
+import unittest
+import uuid
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.errors import UnauthorizedError
+from app.middleware import auth
+from app.models.rbac_models import AccountStatus, User, UserRole
+
+
+class FakeAsyncSession:
+    """Stands in for async_session(): counts primary-key lookups."""
+
+    def __init__(self, user):
+        self.user = user
+        self.gets = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def get(self, model, ident):
+        self.gets += 1
+        return self.user
+
+
+class TestPrincipalCache(unittest.TestCase):
+    def setUp(self):
+        auth.principal_cache.clear()
+        self.user = User(
+            id=uuid.uuid4(), email="t@x.com", first_name="Ali",
+            role=UserRole.teacher, status=AccountStatus.active, password_hash="hash"
+        )
+        self.db = MagicMock()
+        self.db.merge.side_effect = lambda obj, load: obj
+        self.adb = FakeAsyncSession(self.user)
+        patcher = patch.object(auth, "async_session", return_value=self.adb)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        token = auth.create_access_token(str(self.user.id), self.user.email, "teacher")
+        self.credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    def _authenticate(self):
+        return asyncio.run(auth.get_current_user(self.credentials, self.db))
+
+    def test_second_request_skips_user_query(self):
+        self._authenticate()
+        cached = self._authenticate()
+
+        self.assertEqual(self.adb.gets, 1)
+        self.db.query.assert_not_called()
+        self.assertEqual(cached.id, self.user.id)
+        self.assertEqual(cached.first_name, "Ali")
+        key = (str(self.user.id), hashlib.sha256(self.credentials.credentials.encode()).hexdigest())
+        self.assertNotIn("password_hash", auth.principal_cache.get(key))
+
+    def test_invalidation_rechecks_status(self):
+        self._authenticate()
+        self.user.status = AccountStatus.suspended
+        auth.invalidate_principal(self.user.id)
+
+        with self.assertRaises(UnauthorizedError):
+            self._authenticate()
+        self.assertEqual(self.adb.gets, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from datetime import date, datetime
+import sys
+import os
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.database import Base
+from app.models import User, UserRole, ReadingAnalysis, ReadingDailyStat
+from app.services.reading_stats_service import ReadingStatsService
+
+
+class TestReadingStats(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.user = User(email="s@x.com", first_name="S", last_name="S", role=UserRole.student)
+        self.db.add(self.user)
+        self.db.commit()
+        self.service = ReadingStatsService(self.db)
+
+    def tearDown(self):
+        self.db.close()
+
+    def _save(self, words, errors, comprehension, day=None):
+        analysis = ReadingAnalysis(
+            user_id=self.user.id, total_words_read=words, speech_errors=errors,
+            comprehension_score=comprehension, pronunciation_score=90, session_date=datetime.utcnow()
+        )
+        self.db.add(analysis)
+        self.service.record(analysis, day)
+        self.db.commit()
+
+    def test_same_day_saves_share_one_row(self):
+        self._save(100, 2, 80)
+        self._save(50, 4, 60)
+        self._save(10, 0, 100, day=date(2020, 1, 1))  # outside the window
+
+        rows = self.db.query(ReadingDailyStat).order_by(ReadingDailyStat.day).all()
+        self.assertEqual([r.sessions for r in rows], [1, 2])
+
+        history = self.service.get_history(self.user.id, days=30)
+        self.assertEqual(history["total_sessions"], 2)
+        self.assertEqual(history["total_words"], 150)
+        self.assertEqual(history["avg_comprehension"], 70.0)
+        self.assertEqual(history["total_speech_errors"], 6)
+        self.assertEqual(len(history["daily_stats"]), 1)
+        self.assertEqual(history["daily_stats"][0]["avg_errors"], 3.0)
+        self.assertEqual(len(history["recent_analyses"]), 3)
+
+    def test_backfill_rolls_up_existing_analyses(self):
+        # Analyses saved before the rollup table existed
+        for words, comprehension in [(100, 80), (50, 60)]:
+            self.db.add(ReadingAnalysis(
+                user_id=self.user.id, total_words_read=words, speech_errors=1,
+                comprehension_score=comprehension, session_date=datetime.utcnow()
+            ))
+        self.db.commit()
+
+        self.assertEqual(ReadingStatsService.backfill(self.db.connection()), 1)
+        self.db.commit()
+
+        history = self.service.get_history(self.user.id, days=30)
+        self.assertEqual((history["total_sessions"], history["total_words"]), (2, 150))
+        self.assertEqual(history["avg_comprehension"], 70.0)
+        self.assertEqual(history["daily_stats"][0]["date"], str(datetime.utcnow().date()))
+
+        # Later saves land in the backfilled row
+        self._save(10, 0, 100)
+        self.assertEqual(self.db.query(ReadingDailyStat).one().sessions, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
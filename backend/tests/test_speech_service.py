@@ -0,0 +1,64 @@
+import asyncio
+import tempfile
+import unittest
+import sys
+import os
+
+import httpx
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.cache import DiskCache
+from app.services.speech_service import AzureSpeechService
+
+
+class TestAzureSpeechService(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.calls = {"token": 0, "tts": 0}
+        self.reject_next_tts = False
+
+        def handler(request):
+            if "issueToken" in str(request.url):
+                self.calls["token"] += 1
+                return httpx.Response(200, text=f"token-{self.calls['token']}")
+            self.calls["tts"] += 1
+            if self.reject_next_tts:
+                self.reject_next_tts = False
+                return httpx.Response(401)
+            return httpx.Response(200, content=b"ID3" + request.content[-8:])
+
+        self.service = AzureSpeechService()
+        self.service._disk = DiskCache(self.tmpdir.name, max_bytes=1024 * 1024, suffix=".mp3")
+        self.service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_token_reused_and_audio_cached(self):
+        async def scenario():
+            first = await self.service.generate_speech("a")
+            second = await self.service.generate_speech("a")
+            await self.service.generate_speech("b")
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        self.assertEqual(first, second)
+        self.assertEqual(self.calls, {"token": 1, "tts": 2})
+
+    def test_disk_tier_survives_memory_loss(self):
+        asyncio.run(self.service.generate_speech("sh", rate="-20%"))
+        self.service._memory.clear()
+        asyncio.run(self.service.generate_speech("sh", rate="-20%"))
+        self.assertEqual(self.calls["tts"], 1)
+
+    def test_unauthorized_refreshes_token_once(self):
+        self.reject_next_tts = True
+        audio = asyncio.run(self.service.generate_speech("ch"))
+        self.assertTrue(audio.startswith(b"ID3"))
+        self.assertEqual(self.calls, {"token": 2, "tts": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
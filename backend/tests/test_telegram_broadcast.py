@@ -0,0 +1,109 @@
+import asyncio
+import json
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+import sys
+import os
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.database import Base
+from app.models.quiz import QuizBroadcast, QuizQuestion
+from app.services.telegram_bot_service import TelegramBotService
+from app.services.telegram_broadcast import TelegramBroadcaster
+
+
+class TestTelegramBroadcaster(unittest.TestCase):
+    def setUp(self):
+        self.requests = []
+        self.throttled = set()
+
+        def handler(request):
+            chat_id = json.loads(request.content)["chat_id"]
+            self.requests.append(chat_id)
+            if chat_id == "blocked":
+                return httpx.Response(403, json={"ok": False, "error_code": 403, "description": "Forbidden"})
+            if chat_id == "busy" and chat_id not in self.throttled:
+                self.throttled.add(chat_id)
+                return httpx.Response(429, json={
+                    "ok": False, "error_code": 429, "parameters": {"retry_after": 0}
+                })
+            return httpx.Response(200, json={"ok": True, "result": {}})
+
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    def _broadcast(self, chat_ids):
+        broadcaster = TelegramBroadcaster("https://api.test/botX", client=self.client)
+        return asyncio.run(broadcaster.send_many(
+            ("sendMessage", {"chat_id": chat_id, "text": "salom"}) for chat_id in chat_ids
+        ))
+
+    def test_counts_sent_and_rejected(self):
+        result = self._broadcast(["1", "2", "blocked"])
+        self.assertEqual((result.sent, result.failed, result.blocked), (2, 0, 1))
+
+    def test_retry_after_is_honoured(self):
+        result = self._broadcast(["busy", "3"])
+        self.assertEqual(result.sent, 2)
+        self.assertEqual(self.requests.count("busy"), 2)
+
+    def test_server_errors_give_up_after_retries(self):
+        failing = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(502, json={"ok": False, "error_code": 502})
+        ))
+        broadcaster = TelegramBroadcaster("https://api.test/botX", client=failing)
+
+        with patch('app.services.telegram_broadcast.asyncio.sleep', new=AsyncMock()):
+            result = asyncio.run(broadcaster.send_many([("sendMessage", {"chat_id": "1"})]))
+
+        self.assertEqual(result.failed, 1)
+
+
+class TestDailyQuizBroadcastClaim(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.question = QuizQuestion(question_text="2+2?", options=["3", "4"], correct_option_index=1)
+        self.db.add(self.question)
+        self.db.commit()
+        self.service = TelegramBotService(self.db)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_one_broadcast_per_day(self):
+        asyncio.run(self.service.send_daily_quiz_to_all())
+        asyncio.run(self.service.send_daily_quiz_to_all())
+
+        broadcasts = self.db.query(QuizBroadcast).all()
+        self.assertEqual(len(broadcasts), 1)
+        self.assertEqual(broadcasts[0].status, "completed")
+        self.assertEqual(broadcasts[0].day, datetime.utcnow().date())
+
+    def test_running_broadcast_resumed_only_after_lease(self):
+        broadcast = QuizBroadcast(question_id=self.question.id, updated_at=datetime.utcnow())
+        self.db.add(broadcast)
+        self.db.commit()
+
+        asyncio.run(self.service.send_daily_quiz_to_all())
+        self.db.refresh(broadcast)
+        self.assertEqual(broadcast.status, "running")  # lease still held
+
+        broadcast.updated_at = datetime.utcnow() - timedelta(minutes=5)
+        self.db.commit()
+        asyncio.run(self.service.send_daily_quiz_to_all())
+        self.db.refresh(broadcast)
+        self.assertEqual(broadcast.status, "completed")
+        self.assertEqual(self.db.query(QuizBroadcast).count(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import time
+import unittest
+import sys
+import os
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.testai.parsers import NumberedTestParser, parse_test_pages, parse_tests
+
+
+def make_corpus(n: int, style: str = "key") -> str:
+    """n numbered questions; answers inline ("inline") or in a trailing key ("key")."""
+    letters = "ABCD"
+    lines = ["Test to'plami", ""]
+    for i in range(1, n + 1):
+        lines.append(f"{i}. {i}-savol: {i} + {i} nechiga teng?")
+        lines.extend(f"{letter}) {i * 2 + j}" for j, letter in enumerate(letters))
+        if style == "inline":
+            lines.append(f"To'g'ri javob: {letters[i % 4]}")
+        lines.append("")
+    if style == "key":
+        lines.append("Javoblar: " + " ".join(f"{i} {letters[i % 4].lower()}" for i in range(1, n + 1)))
+    return "\n".join(lines)
+
+
+class TestParseTests(unittest.TestCase):
+    def test_trailing_key(self):
+        tests = parse_tests(make_corpus(12))
+        self.assertEqual(len(tests), 12)
+        self.assertEqual([t["correct_answer"] for t in tests[:4]], ["B", "C", "D", "A"])
+        self.assertEqual(tests[0]["options"], ["2", "3", "4", "5"])
+        self.assertNotIn("_number", tests[0])
+
+    def test_inline_answers_and_mixed_numbering(self):
+        text = (
+            "1) Poytaxt\nqaysi?\na. Toshkent\nb. Samarqand\nc. Buxoro\nd. Xiva\nJavob: A\n"
+            "2 . Eng katta sayyora?\nA) Yer\nB) Mars\nC) Yupiter\nD) Venera\nAnswer: C\n"
+        )
+        tests = parse_tests(text)
+        self.assertEqual([t["question"] for t in tests], ["Poytaxt qaysi?", "Eng katta sayyora?"])
+        self.assertEqual([t["correct_answer"] for t in tests], ["A", "C"])
+
+    def test_flexible_options(self):
+        tests = parse_tests("1. Rang?\nA) Qizil\nYashil\nKo'k\nSariq\n2 - C")
+        self.assertEqual(tests[0]["options"], ["Qizil", "Yashil", "Ko'k", "Sariq"])
+
+    def test_wrapped_lettered_option(self):
+        tests = parse_tests("1. Savol?\nA) uzun variant\ndavomi\nB) b\nC) c\nqator\nD) d")
+        self.assertEqual(tests[0]["options"], ["uzun variant davomi", "b", "c qator", "d"])
+
+    def test_early_stop_still_reads_trailing_key(self):
+        pulled = []
+
+        def pages():
+            for page in ["1. Bir?\nA) a\nB) b\nC) c\nD) d\n2. Ikki?\nA) a\nB) b\nC) c\nD) d",
+                         "3. Uch?\nA) a\nB) b\nC) c\nD) d",
+                         "Javoblar: 1-A, 2-C, 3-B",
+                         "Ilova"]:
+                pulled.append(page)
+                yield page
+
+        tests = parse_test_pages(pages(), max_questions=1)
+        self.assertEqual([t["correct_answer"] for t in tests], ["A"])
+        self.assertEqual(len(pulled), 3)  # stops once the key is found
+
+    def test_special_format(self):
+        tests = parse_tests("Savol?\n====\nBir\n====\n#Ikki\n++++\nYana?\n====\n#Ha\n====\nYo'q")
+        self.assertEqual([t["correct_answer"] for t in tests], ["B", "A"])
+
+    def test_streaming_feed(self):
+        parser = NumberedTestParser()
+        lines = iter(make_corpus(3).splitlines())
+        first = next(parser.feed(lines))  # yielded once question 2 starts
+        self.assertTrue(first["question"].startswith("1-savol"))
+
+    def test_linear_scaling(self):
+        def best_time(n):
+            text = make_corpus(n)
+            runs = []
+            for _ in range(3):
+                started = time.perf_counter()
+                parse_tests(text)
+                runs.append(time.perf_counter() - started)
+            return min(runs)
+
+        small, large = best_time(300), best_time(3000)
+        # 10x the questions: ~10x the time when linear, ~100x when quadratic
+        self.assertLess(large / small, 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+import sys
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.text_store import DiskTextStore, MemoryTextStore
+
+TEXT = "Bir bor ekan, bir yo'q ekan. " * 40
+
+
+class TestTextStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def dir_bytes(self):
+        return sum(e.stat().st_size for e in os.scandir(self.directory))
+
+    def test_memory_store_is_bounded(self):
+        store = MemoryTextStore(maxsize=3, ttl=60)
+        for i in range(10):
+            store.set(f"id{i}", TEXT)
+        self.assertIsNone(store.get("id0"))
+        self.assertEqual(store.get("id9"), TEXT)
+        self.assertEqual(store.stats()["size"], 3)
+
+    def test_disk_store_shared_compressed_and_expiring(self):
+        store = DiskTextStore(self.directory, ttl=60)
+        store.set("abc", TEXT)
+        # Another worker on the same host sees the text
+        self.assertEqual(DiskTextStore(self.directory).get("abc"), TEXT)
+        self.assertLess(self.dir_bytes(), len(TEXT.encode()) // 5)
+        self.assertIsNone(store.get("missing"))
+
+        with patch("app.services.text_store.time.time", return_value=time.time() + 120):
+            self.assertIsNone(store.get("abc"))
+        self.assertEqual(self.dir_bytes(), 0)
+
+    def test_disk_store_stays_within_budget(self):
+        store = DiskTextStore(self.directory, max_bytes=20 * 1024, ttl=60)
+        for i in range(500):
+            store.set(f"id{i}", f"{i} " + os.urandom(200).hex())
+        self.assertLessEqual(self.dir_bytes(), 20 * 1024)
+        self.assertIsNotNone(store.get("id499"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import asyncio
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add backend directory to sys.path to allow imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.process_pool import DocumentPool
+from app.services import upload_cache as upload_cache_module
+from app.services.upload_cache import UploadCache
+
+calls = []
+
+
+def fake_parse(content, limit=None):
+    calls.append(content)
+    time.sleep(0.05)
+    text = content.decode()
+    return [{"question": q} for q in text.split(",")[:limit]] if text else []
+
+
+class TestUploadCache(unittest.TestCase):
+    def setUp(self):
+        calls.clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        pool = DocumentPool(workers=2, max_queue=8, use_processes=False)
+        self.addCleanup(pool.close)
+        patcher = patch.object(upload_cache_module, "document_pool", pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_repeat_uploads_hit_memory_then_disk(self):
+        cache = UploadCache(self.directory)
+
+        async def scenario():
+            first = await cache.run(fake_parse, b"a,b,c")
+            again = await cache.run(fake_parse, b"a,b,c")
+            limited = await cache.run(fake_parse, b"a,b,c", 1)
+            bumped = await cache.run(fake_parse, b"a,b,c", version="2")
+            # Another worker process on the same host: disk hit
+            other = await UploadCache(self.directory).run(fake_parse, b"a,b,c")
+            return first, again, limited, bumped, other
+
+        first, again, limited, bumped, other = asyncio.run(scenario())
+        self.assertEqual(first, again)
+        self.assertEqual(other, first)
+        self.assertEqual(limited, [{"question": "a"}])
+        self.assertEqual(bumped, first)
+        self.assertEqual(len(calls), 3)  # first, limit=1, version 2
+
+    def test_concurrent_uploads_share_one_job_and_empty_is_not_cached(self):
+        cache = UploadCache(self.directory)
+
+        async def scenario():
+            results = await asyncio.gather(*(cache.run(fake_parse, b"x,y") for _ in range(3)))
+            await cache.run(fake_parse, b"")
+            await cache.run(fake_parse, b"")
+            return results
+
+        results = asyncio.run(scenario())
+        self.assertTrue(all(r == results[0] for r in results))
+        self.assertEqual(calls, [b"x,y", b"", b""])
+        self.assertEqual(cache.stats()["coalesced"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()